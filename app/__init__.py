@@ -2,6 +2,7 @@ from flask import Flask
 from flask_cors import CORS
 from app.config import Config
 from app.database import Database
+from app import arquivo_consultas, prazo
 import logging
 
 # Configurar logging
@@ -22,10 +23,18 @@ def create_app():
         r"/*": {
             "origins": "*",
             "methods": ["GET", "POST", "PUT", "DELETE", "PATCH"],
-            "allow_headers": ["Content-Type", "Authorization"]
+            "allow_headers": ["Content-Type", "Authorization", "X-Clinica", "X-Ultima-Escrita"],
+            "expose_headers": ["X-Ultima-Escrita"]
         }
     })
     
+    # Devolver ao pool a conexão da requisição (modo REQUEST_SCOPED_CONNECTION)
+    # e responder 503 enquanto o disjuntor do banco estiver aberto
+    Database.init_app(app)
+    
+    # Prazo por requisição para as operações no banco (503/504 ao estourar)
+    prazo.init_app(app)
+    
     # Inicializar pool de conexões do banco de dados
     try:
         Database.initialize_pool()
@@ -40,9 +49,24 @@ def create_app():
         logger.error(f"✗ Erro ao inicializar banco de dados: {e}")
         logger.warning("⚠ A aplicação continuará sem banco de dados")
     
+    # Estado de saúde do banco em cache, atualizado em segundo plano
+    Database.iniciar_monitor_saude()
+    
+    # Banco recém-criado pelo database.sql: partições anuais de CONSULTA
+    for clinica in Database.clinicas():
+        try:
+            with Database.usar_clinica(clinica):
+                arquivo_consultas.criar_particoes_anuais()
+        except Exception as e:
+            logger.warning(f"⚠ Partições de CONSULTA não criadas na clínica {clinica}: {e}")
+    
     # Importar e registrar rotas
     with app.app_context():
         from app import routes
         logger.info("✓ Rotas da API registradas com sucesso")
+        
+        # Dados de referência (grupos, veterinários, tipos de vacinas) na memória
+        from app import referencia
+        referencia.carregar_todos()
     
     return app
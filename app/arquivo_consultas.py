@@ -0,0 +1,293 @@
+"""
+Arquivo de consultas - anos fechados de CONSULTA em arquivos compactados
+
+CONSULTA guarda só os anos quentes (Config.CONSULTAS_ANOS_QUENTES, o atual
+incluído). No MySQL a tabela é particionada por faixa de DATA_CONSULTA, uma
+partição por ano (p2026 = datas antes de '2027-01-01'), mais a pfuturo
+(MAXVALUE): leituras com filtro de data só abrem as partições da faixa.
+
+O arquivamento (arquivar_consultas.py) leva cada ano fechado para um
+arquivo por clínica e ano, ARQUIVO_CONSULTAS_DIR/<clinica>/consultas_<ano>.zip,
+e remove as linhas do banco; no MySQL as partições que ficam vazias são
+removidas e as dos próximos anos criadas. No SQLite não há partições: a
+tabela só perde as linhas arquivadas.
+
+O arquivo é colunar: um membro JSON compactado por coluna (ID_PET.json,
+DATA_CONSULTA.json...), com as linhas ordenadas por pet e, no pet, da
+consulta mais recente para a mais antiga. O histórico de um pet é uma
+faixa contígua encontrada por busca binária em ID_PET, e só as colunas da
+projeção pedida são descompactadas. Os nomes do pet e do veterinário são
+os da data do arquivamento.
+"""
+
+import json
+import logging
+import os
+import re
+import zipfile
+from bisect import bisect_left, bisect_right
+from datetime import date
+from functools import lru_cache
+
+from app.config import Config
+from app.database import Database
+from app.identificadores import id_binario
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FORMATO = 1
+COLUNAS = ('ID_PROCEDIMENTO', 'DATA_CONSULTA', 'VALOR', 'ID_PET', 'CRMV', 'NOME_PET', 'RACA', 'NOME_VET')
+
+# Arquivos (clínica e ano) mantidos abertos em memória pelas leituras
+ARQUIVOS_EM_MEMORIA = 8
+# Linhas removidas do banco por commit no arquivamento
+LOTE_REMOCAO = 1000
+
+_ARQUIVO = re.compile(r'^consultas_(\d{4})\.zip$')
+_PARTICAO = re.compile(r'^p(\d{4})$')
+
+# Linhas de um ano com os dados do pet e do veterinário (LEFT JOIN: sem FKs
+# na tabela particionada, uma consulta pode apontar para um pet removido)
+SQL_EXPORTAR = """
+    SELECT C.ID_PROCEDIMENTO, C.DATA_CONSULTA, C.VALOR, C.ID_PET, C.CRMV,
+           P.NOME AS NOME_PET, P.RACA, U.NOME_COMPLETO AS NOME_VET
+    FROM CONSULTA C
+    LEFT JOIN PET P ON C.ID_PET = P.ID_PET
+    LEFT JOIN VETERINARIO V ON C.CRMV = V.CRMV
+    LEFT JOIN USUARIO U ON V.ID_USUARIO = U.ID_USUARIO
+    WHERE C.DATA_CONSULTA >= %s AND C.DATA_CONSULTA < %s
+"""
+
+SQL_PARTICOES = """
+    SELECT PARTITION_NAME AS NOME FROM information_schema.PARTITIONS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'CONSULTA' AND PARTITION_NAME IS NOT NULL
+    ORDER BY PARTITION_ORDINAL_POSITION
+"""
+
+
+def inicio_quente(hoje=None):
+    """Primeiro dia dos anos quentes: consultas anteriores são arquivadas"""
+    hoje = hoje or date.today()
+    return date(hoje.year - Config.CONSULTAS_ANOS_QUENTES + 1, 1, 1)
+
+
+def particoes_sql(primeiro, ultimo):
+    """
+    Partições p<primeiro>..p<ultimo> e pfuturo de PARTITION BY RANGE
+    COLUMNS(DATA_CONSULTA); p<primeiro> recebe também os anos anteriores
+    """
+    particoes = [f"PARTITION p{ano} VALUES LESS THAN ('{ano + 1}-01-01')" for ano in range(primeiro, ultimo + 1)]
+    particoes.append("PARTITION pfuturo VALUES LESS THAN (MAXVALUE)")
+    return ', '.join(particoes)
+
+
+# ---------- Leitura ----------
+
+def diretorio(clinica=None):
+    return os.path.join(BASE_DIR, Config.ARQUIVO_CONSULTAS_DIR, clinica or Database.clinica_atual())
+
+
+def caminho(ano, clinica=None):
+    return os.path.join(diretorio(clinica), f"consultas_{ano}.zip")
+
+
+def anos_arquivados(clinica=None):
+    """Anos com arquivo da clínica (padrão: a atual), em ordem decrescente"""
+    try:
+        nomes = os.listdir(diretorio(clinica))
+    except FileNotFoundError:
+        return []
+    anos = (_ARQUIVO.match(nome) for nome in nomes)
+    return sorted((int(encontrado.group(1)) for encontrado in anos if encontrado), reverse=True)
+
+
+class ArquivoAno:
+    """Arquivo de um ano aberto para leitura: ID_PET carregado, demais colunas sob demanda"""
+
+    __slots__ = ('caminho', 'ids_pet', '_colunas')
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._colunas = {}
+        self.ids_pet = self.coluna('ID_PET')
+
+    def coluna(self, nome):
+        valores = self._colunas.get(nome)
+        if valores is None:
+            with zipfile.ZipFile(self.caminho) as arquivo:
+                valores = json.loads(arquivo.read(f"{nome}.json"))
+            if nome == 'DATA_CONSULTA':
+                valores = [date.fromisoformat(valor) for valor in valores]
+            self._colunas[nome] = valores
+        return valores
+
+    def faixa(self, pet_id):
+        """Posições (início, fim) das linhas do pet"""
+        return bisect_left(self.ids_pet, pet_id), bisect_right(self.ids_pet, pet_id)
+
+
+@lru_cache(maxsize=ARQUIVOS_EM_MEMORIA)
+def _abrir(caminho, versao):
+    # versao (mtime, tamanho): um arquivo regravado é aberto de novo
+    return ArquivoAno(caminho)
+
+
+def abrir(caminho):
+    estado = os.stat(caminho)
+    return _abrir(caminho, (estado.st_mtime_ns, estado.st_size))
+
+
+def consultas_do_pet(pet_id, linha, colunas):
+    """
+    Consultas arquivadas do pet na clínica atual, como objetos de `linha`
+    (app/linhas.py) com as `colunas` pedidas, das mais recentes às mais antigas
+    """
+    construir = linha.construtor(colunas)
+    consultas = []
+    for ano in anos_arquivados():
+        try:
+            arquivo = abrir(caminho(ano))
+        except FileNotFoundError:
+            continue  # regravado ou removido durante a leitura
+        inicio, fim = arquivo.faixa(pet_id)
+        if inicio == fim:
+            continue
+        valores = [arquivo.coluna(coluna)[inicio:fim] for coluna in colunas]
+        consultas.extend(construir(linha_arquivo) for linha_arquivo in zip(*valores))
+    return consultas
+
+
+# ---------- Arquivamento ----------
+
+def _ler_arquivo(caminho):
+    """Linhas (dicts) de um arquivo já gravado"""
+    with zipfile.ZipFile(caminho) as arquivo:
+        colunas = json.loads(arquivo.read('meta.json'))['colunas']
+        valores = [json.loads(arquivo.read(f"{coluna}.json")) for coluna in colunas]
+    linhas = [dict(zip(colunas, linha)) for linha in zip(*valores)]
+    for linha in linhas:
+        linha['DATA_CONSULTA'] = date.fromisoformat(linha['DATA_CONSULTA'])
+    return linhas
+
+
+def _gravar_arquivo(caminho, ano, linhas):
+    """Grava o arquivo do ano em um temporário e o troca pelo atual (os.replace)"""
+    linhas.sort(key=lambda linha: linha['DATA_CONSULTA'], reverse=True)
+    linhas.sort(key=lambda linha: linha['ID_PET'])
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.tmp"
+    with zipfile.ZipFile(temporario, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=9) as arquivo:
+        arquivo.writestr('meta.json', json.dumps({
+            'formato': FORMATO, 'ano': ano, 'linhas': len(linhas), 'colunas': COLUNAS
+        }))
+        for coluna in COLUNAS:
+            valores = [linha[coluna] for linha in linhas]
+            if coluna == 'DATA_CONSULTA':
+                valores = [valor.isoformat() for valor in valores]
+            arquivo.writestr(f"{coluna}.json", json.dumps(valores, ensure_ascii=False, separators=(',', ':')))
+    with open(temporario, 'rb+') as f:
+        os.fsync(f.fileno())
+    os.replace(temporario, caminho)
+
+
+def anos_fechados_no_banco(hoje=None):
+    """Anos antes dos quentes que ainda têm consultas no banco da clínica atual"""
+    limite = inicio_quente(hoje)
+    resultado = Database.execute_query(
+        "SELECT MIN(DATA_CONSULTA) AS PRIMEIRA FROM CONSULTA WHERE DATA_CONSULTA < %s", (limite,), fetch_one=True
+    )
+    if not resultado or resultado['PRIMEIRA'] is None:
+        return []
+    primeira = date.fromisoformat(str(resultado['PRIMEIRA']))
+    return [ano for ano in range(primeira.year, limite.year) if Database.execute_query(
+        "SELECT 1 AS OCUPADO FROM CONSULTA WHERE DATA_CONSULTA >= %s AND DATA_CONSULTA < %s LIMIT 1",
+        (date(ano, 1, 1), date(ano + 1, 1, 1)), fetch_one=True
+    )]
+
+
+def arquivar_ano(ano):
+    """
+    Leva as consultas do ano da clínica atual para o arquivo e as remove do
+    banco; retorna quantas foram arquivadas.
+
+    O arquivo é gravado (juntando-se às linhas já arquivadas do ano) antes da
+    remoção, que apaga só as linhas exportadas: uma consulta inserida no ano
+    durante o arquivamento fica no banco para a próxima execução. Se o
+    processo parar entre a gravação e a remoção, a próxima execução regrava
+    o arquivo sem duplicar linhas.
+    """
+    linhas = Database.execute_query(SQL_EXPORTAR, (date(ano, 1, 1), date(ano + 1, 1, 1)), fetch_all=True)
+    if not linhas:
+        return 0
+    # Chave primária (ID_PROCEDIMENTO, DATA_CONSULTA): a data leva à partição
+    chaves = [(id_binario(linha['ID_PROCEDIMENTO']), linha['DATA_CONSULTA']) for linha in linhas]
+    destino = caminho(ano)
+    if os.path.exists(destino):
+        novas = {linha['ID_PROCEDIMENTO'] for linha in linhas}
+        linhas.extend(linha for linha in _ler_arquivo(destino) if linha['ID_PROCEDIMENTO'] not in novas)
+    _gravar_arquivo(destino, ano, linhas)
+    logger.info(f"Consultas de {ano} arquivadas em {destino}")
+
+    for inicio in range(0, len(chaves), LOTE_REMOCAO):
+        Database.execute_many(
+            "DELETE FROM CONSULTA WHERE ID_PROCEDIMENTO = %s AND DATA_CONSULTA = %s",
+            chaves[inicio:inicio + LOTE_REMOCAO]
+        )
+    return len(chaves)
+
+
+def consulta_particionada():
+    """Se CONSULTA é particionada (só no MySQL)"""
+    if Database.backend().nome != 'mysql':
+        return False
+    return bool(Database.execute_query(SQL_PARTICOES, fetch_all=True))
+
+
+def criar_particoes_anuais():
+    """
+    MySQL: CONSULTA recém-criada pelo database.sql (só com a pfuturo)
+    recebe as partições anuais de manter_particoes. Chamado na
+    inicialização da aplicação; com as partições já criadas não faz nada
+    """
+    if Database.backend().nome != 'mysql':
+        return []
+    nomes = [linha['NOME'] for linha in Database.execute_query(SQL_PARTICOES, fetch_all=True)]
+    if nomes != ['pfuturo']:
+        return []
+    return manter_particoes()
+
+
+def manter_particoes(hoje=None):
+    """
+    MySQL: remove as partições vazias de anos fechados e cria as do ano
+    atual e do próximo (dividindo a pfuturo). Retorna os comandos executados.
+    """
+    if not consulta_particionada():
+        return []
+    hoje = hoje or date.today()
+    limite = inicio_quente(hoje)
+    nomes = [linha['NOME'] for linha in Database.execute_query(SQL_PARTICOES, fetch_all=True)]
+    anos = [int(encontrado.group(1)) for encontrado in map(_PARTICAO.match, nomes) if encontrado]
+    comandos = []
+
+    for ano in anos:
+        # p<ano> guarda datas antes de <ano + 1>-01-01
+        if ano + 1 > limite.year:
+            continue
+        ocupada = Database.execute_query(f"SELECT 1 AS OCUPADA FROM CONSULTA PARTITION (p{ano}) LIMIT 1", fetch_one=True)
+        if not ocupada:
+            comandos.append(f"ALTER TABLE CONSULTA DROP PARTITION p{ano}")
+
+    ultimo = max(anos) if anos else limite.year - 1
+    if ultimo < hoje.year + 1 and 'pfuturo' in nomes:
+        comandos.append(
+            "ALTER TABLE CONSULTA REORGANIZE PARTITION pfuturo INTO "
+            f"({particoes_sql(ultimo + 1, hoje.year + 1)})"
+        )
+
+    for comando in comandos:
+        logger.info(f"Partições de CONSULTA: {comando}")
+        Database.execute_query(comando, commit=True)
+    return comandos
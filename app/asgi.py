@@ -0,0 +1,299 @@
+"""
+ASGI - Modo de execução assíncrono (asgi.py na raiz do projeto)
+
+As rotas mais acessadas de leitura são atendidas direto no event loop, com
+o AsyncDatabase: uma requisição esperando o banco não prende uma thread do
+servidor, então um único processo mantém muitas requisições lentas em
+andamento. As demais rotas continuam no Flask, executado em um executor de
+threads (ASGI_WSGI_THREADS) pela ponte WSGI abaixo.
+
+As rotas assíncronas respondem o mesmo JSON das rotas Flask equivalentes
+(app/respostas.py) e seguem as mesmas regras de token, clínica (shard),
+read-your-writes das réplicas, prazo e erros (500 de SQL, 503 do
+disjuntor, 503/504 de prazo).
+"""
+
+import asyncio
+import io
+import logging
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import CookieError, SimpleCookie
+from urllib.parse import parse_qs
+
+from mysql.connector import Error
+
+from app import respostas
+from app.auth import verify_token
+from app.circuito import BancoIndisponivel
+from app.config import Config
+from app.database import COOKIE_ULTIMA_ESCRITA, HEADER_ULTIMA_ESCRITA, Database
+from app.database_async import AsyncDatabase
+from app.models import Consulta, Vacina
+from app.prazo import PrazoEsgotado, definir_prazo, mensagem_prazo_esgotado
+
+logger = logging.getLogger(__name__)
+
+
+class RespostaErro(Exception):
+    """Interrompe a rota assíncrona com uma resposta JSON de erro"""
+
+    def __init__(self, status, mensagem, headers=()):
+        super().__init__(mensagem)
+        self.status = status
+        self.headers = list(headers)
+
+
+class Requisicao:
+    __slots__ = ('metodo', 'caminho', 'headers', 'parametros', 'argumentos', 'cookies')
+
+    def __init__(self, scope, parametros):
+        self.metodo = scope['method']
+        self.caminho = scope['path']
+        self.headers = {nome.decode('latin-1').lower(): valor.decode('latin-1')
+                        for nome, valor in scope['headers']}
+        self.parametros = parametros
+        # Query string, como request.args do Flask (primeiro valor de cada chave)
+        self.argumentos = {nome: valores[0] for nome, valores in
+                           parse_qs(scope.get('query_string', b'').decode('latin-1')).items()}
+        cookies = SimpleCookie()
+        try:
+            cookies.load(self.headers.get('cookie', ''))
+        except CookieError:
+            pass
+        self.cookies = {nome: morsel.value for nome, morsel in cookies.items()}
+
+
+def autenticar(requisicao, roles=None):
+    """Mesmas regras de token_required/role_required (app/auth.py)"""
+    token = None
+    autorizacao = requisicao.headers.get('authorization')
+    if autorizacao:
+        try:
+            token = autorizacao.split(' ')[1]
+        except IndexError:
+            raise RespostaErro(401, 'Token inválido')
+    if not token:
+        raise RespostaErro(401, 'Token não fornecido')
+
+    user_data = verify_token(token)
+    if not user_data:
+        raise RespostaErro(401, 'Token inválido ou expirado')
+    if roles and user_data.get('role') not in roles:
+        raise RespostaErro(403, 'Acesso negado. Permissão insuficiente.')
+    return user_data
+
+
+def clinica_do_token(user_data):
+    """Clínica do token, ou a padrão se ele não tiver (X-Clinica é ignorado, como em vincular_clinica)"""
+    clinica = user_data.get('clinica') or Config.CLINICA_PADRAO
+    if clinica not in Database.clinicas():
+        raise RespostaErro(401, 'Token inválido ou expirado')
+    return clinica
+
+
+# ========== ROTAS ASSÍNCRONAS ==========
+
+async def listar_consultas_pet(requisicao):
+    """GET /consultas/<pet_id> (token; ?historico=completo inclui os anos arquivados)"""
+    user_data = autenticar(requisicao)
+    pet_id = int(requisicao.parametros['pet_id'])
+    historico_completo = requisicao.argumentos.get('historico') == 'completo'
+    with Database.usar_clinica(clinica_do_token(user_data)):
+        try:
+            consultas = await AsyncDatabase.executar(
+                Consulta.find_by_pet, pet_id, respostas.COLUNAS_CONSULTAS_DO_PET, historico_completo=historico_completo
+            )
+        except Error as e:
+            logger.error(f"Erro ao listar consultas: {e}")
+            raise RespostaErro(500, 'Erro ao listar consultas')
+    return respostas.consultas_do_pet(pet_id, consultas)
+
+
+async def listar_vacinas_pet(requisicao):
+    """GET /historico/<pet_id>/vacinas (token)"""
+    user_data = autenticar(requisicao)
+    pet_id = int(requisicao.parametros['pet_id'])
+    with Database.usar_clinica(clinica_do_token(user_data)):
+        try:
+            vacinas = await AsyncDatabase.executar(
+                Vacina.get_historico_pet, pet_id, respostas.COLUNAS_VACINAS_DO_PET
+            )
+        except Error as e:
+            logger.error(f"Erro ao listar vacinas: {e}")
+            raise RespostaErro(500, 'Erro ao listar vacinas')
+    return respostas.vacinas_do_pet(pet_id, vacinas)
+
+
+async def consultas_do_dia(requisicao):
+    """GET /consultas_dia/<data> (VET/ADM, prazo de 5 s)"""
+    user_data = autenticar(requisicao, roles=['ADM', 'VET'])
+    definir_prazo(5.0)
+    data_consulta = requisicao.parametros['data_consulta']
+    with Database.usar_clinica(clinica_do_token(user_data)):
+        try:
+            consultas = await AsyncDatabase.call_procedure('listar_consultas', (data_consulta,))
+        except Error as e:
+            logger.error(f"Erro ao listar consultas do dia: {e}")
+            raise RespostaErro(500, 'Erro ao listar consultas do dia')
+    return respostas.consultas_do_dia(data_consulta, consultas)
+
+
+ROTAS = [
+    ('GET', re.compile(r'^/consultas/(?P<pet_id>\d+)$'), listar_consultas_pet),
+    ('GET', re.compile(r'^/historico/(?P<pet_id>\d+)/vacinas$'), listar_vacinas_pet),
+    ('GET', re.compile(r'^/consultas_dia/(?P<data_consulta>[^/]+)$'), consultas_do_dia),
+]
+
+
+# ========== APLICAÇÃO ASGI ==========
+
+class AppASGI:
+    """Aplicação ASGI: rotas assíncronas primeiro, o Flask para o restante"""
+
+    def __init__(self, app_flask, wsgi_threads=None):
+        self.flask = app_flask
+        self._executor_wsgi = ThreadPoolExecutor(
+            max_workers=wsgi_threads or Config.ASGI_WSGI_THREADS, thread_name_prefix='wsgi'
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        for metodo, padrao, rota in ROTAS:
+            encontrada = padrao.match(scope['path'])
+            if encontrada and scope['method'] == metodo:
+                await self._executar_rota(rota, Requisicao(scope, encontrada.groupdict()), send)
+                return
+        await self._wsgi(scope, receive, send)
+
+    @staticmethod
+    async def _lifespan(receive, send):
+        while True:
+            mensagem = await receive()
+            if mensagem['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif mensagem['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _executar_rota(self, rota, requisicao, send):
+        # Prazo padrão, como o before_request de app/prazo.py (a tarefa tem
+        # o seu próprio contexto, então ele vale só para esta requisição)
+        definir_prazo(Config.REQUEST_DEADLINE)
+        # Última escrita informada pelo cliente (read-your-writes das réplicas,
+        # como nas rotas Flask)
+        Database.escritas_da_requisicao(
+            requisicao.headers.get(HEADER_ULTIMA_ESCRITA.lower())
+            or requisicao.cookies.get(COOKIE_ULTIMA_ESCRITA)
+        )
+        headers = []
+        try:
+            corpo, status = await rota(requisicao), 200
+        except RespostaErro as e:
+            corpo, status, headers = {'message': str(e)}, e.status, e.headers
+        except BancoIndisponivel:
+            corpo, status = {'message': 'Banco de dados temporariamente indisponível'}, 503
+            headers = [('Retry-After', str(int(Config.CIRCUIT_OPEN_SECONDS)))]
+        except PrazoEsgotado as e:
+            corpo, status = {'message': mensagem_prazo_esgotado(e)}, e.status
+        await self._responder_json(send, status, corpo, headers)
+
+    async def _responder_json(self, send, status, corpo, headers=()):
+        # Mesmo JSON do jsonify do Flask
+        conteudo = f"{self.flask.json.dumps(corpo)}\n".encode('utf-8')
+        headers = [
+            ('Content-Type', 'application/json'),
+            ('Content-Length', str(len(conteudo))),
+            ('Access-Control-Allow-Origin', '*'),
+            *headers
+        ]
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(nome.encode('latin-1'), valor.encode('latin-1')) for nome, valor in headers]
+        })
+        await send({'type': 'http.response.body', 'body': conteudo})
+
+    # ---------- Ponte WSGI (rotas Flask) ----------
+
+    async def _wsgi(self, scope, receive, send):
+        corpo = bytearray()
+        while True:
+            mensagem = await receive()
+            if mensagem['type'] == 'http.disconnect':
+                return
+            corpo.extend(mensagem.get('body', b''))
+            if not mensagem.get('more_body'):
+                break
+
+        environ = self._environ(scope, bytes(corpo))
+        loop = asyncio.get_running_loop()
+        status, headers, conteudo = await loop.run_in_executor(self._executor_wsgi, self._chamar_flask, environ)
+
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(nome.encode('latin-1'), valor.encode('latin-1')) for nome, valor in headers]
+        })
+        await send({'type': 'http.response.body', 'body': conteudo})
+
+    @staticmethod
+    def _environ(scope, corpo):
+        servidor = scope.get('server') or ('localhost', 80)
+        cliente = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': servidor[0],
+            'SERVER_PORT': str(servidor[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': cliente[0],
+            'REMOTE_PORT': str(cliente[1]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(corpo),
+            'wsgi.input_terminated': True,  # corpo completo, mesmo sem Content-Length
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for nome, valor in scope['headers']:
+            nome = nome.decode('latin-1').upper().replace('-', '_')
+            valor = valor.decode('latin-1')
+            if nome == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = valor
+            elif nome == 'CONTENT_LENGTH':
+                environ['CONTENT_LENGTH'] = valor
+            else:
+                chave = f'HTTP_{nome}'
+                environ[chave] = f"{environ[chave]},{valor}" if chave in environ else valor
+        return environ
+
+    def _chamar_flask(self, environ):
+        resposta = {}
+
+        def start_response(status, headers, exc_info=None):
+            resposta['status'] = int(status.split(' ', 1)[0])
+            resposta['headers'] = headers
+
+        resultado = self.flask(environ, start_response)
+        try:
+            conteudo = b''.join(resultado)
+        finally:
+            if hasattr(resultado, 'close'):
+                resultado.close()
+        return resposta['status'], resposta['headers'], conteudo
+
+
+def criar_app_asgi(app_flask):
+    """Envolve a aplicação Flask (create_app) no modo ASGI"""
+    return AppASGI(app_flask)
@@ -7,6 +7,7 @@ from flask import request, jsonify
 import jwt
 from datetime import datetime, timedelta
 from app.config import Config
+from app.database import Database, ClinicaDesconhecida
 
 def create_token(user_data):
     """
@@ -23,6 +24,7 @@ def create_token(user_data):
         'email': user_data['EMAIL'],
         'tipo_acesso': user_data['TIPO_ACESSO'],
         'role': user_data['ROLE_MYSQL'],
+        'clinica': Database.clinica_atual(),  # shard onde o usuário está cadastrado
         'exp': datetime.utcnow() + timedelta(days=1)  # Expira em 1 dia
     }
     
@@ -47,6 +49,22 @@ def verify_token(token):
     except jwt.InvalidTokenError:
         return None
 
+def vincular_clinica(user_data):
+    """
+    A clínica do token define o shard usado pela requisição; token sem a
+    clínica usa a padrão. O header X-Clinica vale só para requisições sem
+    token (login e cadastro): aqui ele é sobrescrito
+
+    Returns:
+        bool: False se a clínica do token não estiver mais configurada
+    """
+    clinica = user_data.get('clinica') or Config.CLINICA_PADRAO
+    try:
+        Database.definir_clinica(clinica)
+    except ClinicaDesconhecida:
+        return False
+    return True
+
 def token_required(f):
     """
     Decorator que exige um token JWT válido
@@ -68,7 +86,7 @@ def token_required(f):
         
         # Verificar token
         user_data = verify_token(token)
-        if not user_data:
+        if not user_data or not vincular_clinica(user_data):
             return jsonify({'message': 'Token inválido ou expirado'}), 401
         
         # Adicionar dados do usuário ao request
@@ -101,7 +119,7 @@ def role_required(allowed_roles):
                 return jsonify({'message': 'Token não fornecido'}), 401
             
             user_data = verify_token(token)
-            if not user_data:
+            if not user_data or not vincular_clinica(user_data):
                 return jsonify({'message': 'Token inválido ou expirado'}), 401
             
             # Verificar role
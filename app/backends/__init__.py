@@ -0,0 +1,86 @@
+"""
+Backends - Implementações do acesso ao banco usadas pelo Database
+
+O Database (pool, réplicas, disjuntor, prazos) não conversa direto com um
+driver: ele pede conexões ao backend configurado em DB_BACKEND.
+
+- mysql: o MySQL de produção (mysql-connector)
+- sqlite: SQLite embarcado, em arquivo ou em memória, para rodar a
+  aplicação e os benchmarks sem um servidor MySQL
+
+As conexões dos dois backends têm a mesma interface da conexão do
+mysql-connector usada pelo pool e pelo Database (cursor(dictionary=True),
+cursor(prepared=True), callproc/stored_results, commit/rollback...) e os
+erros são sempre os do mysql.connector, então models e rotas não mudam.
+"""
+
+from abc import ABC, abstractmethod
+
+from app.config import Config
+
+
+class Backend(ABC):
+    """
+    Interface de um backend de banco de dados. Os métodos abstratos são
+    obrigatórios: um backend sem algum deles falha ao ser instanciado
+    """
+
+    nome = None
+
+    @abstractmethod
+    def config_padrao(self):
+        """Configuração de conexão usada quando nenhuma é informada"""
+
+    def configs_replicas(self):
+        """Configurações das réplicas de leitura (nenhuma por padrão)"""
+        return []
+
+    @abstractmethod
+    def config_shard(self, destino):
+        """Configuração de conexão do shard de uma clínica (valor em Config.DB_SHARDS)"""
+
+    @abstractmethod
+    def conectar(self, db_config):
+        """Abre uma conexão nova (usada pelo PoolConexoes)"""
+
+    def limitar_select(self, query, limite_ms):
+        """Aplica o limite de execução ao SELECT; sem suporte, retorna a query intacta"""
+        return query
+
+    def sql_lock_wait(self, segundos):
+        """
+        Comando que limita a espera por locks da sessão a `segundos`
+        (None volta ao padrão), ou None se o backend não tiver equivalente
+        """
+        return None
+
+    def sql_incremento_id(self):
+        """
+        SELECT do passo entre ids de AUTO_INCREMENT consecutivos da sessão,
+        ou None se for sempre 1
+        """
+        return None
+
+    @abstractmethod
+    def sql_indices(self):
+        """SELECT dos nomes (coluna NOME) dos índices de uma tabela (%s)"""
+
+    @abstractmethod
+    def sql_explain(self, query):
+        """Comando que mostra o plano de execução da query"""
+
+    @abstractmethod
+    def varreduras(self, plano):
+        """Tabelas lidas por varredura completa nas linhas do plano (sql_explain)"""
+
+
+def criar_backend(nome=None):
+    """Cria o backend pelo nome (padrão: Config.DB_BACKEND)"""
+    nome = nome or Config.DB_BACKEND
+    if nome == 'mysql':
+        from app.backends.mysql import MySQLBackend
+        return MySQLBackend()
+    if nome == 'sqlite':
+        from app.backends.sqlite import SQLiteBackend
+        return SQLiteBackend(Config.SQLITE_PATH)
+    raise ValueError(f"Backend de banco de dados desconhecido: {nome}")
@@ -0,0 +1,63 @@
+"""
+Backend MySQL (mysql-connector) - o banco de produção
+"""
+
+import mysql.connector
+
+from app.backends import Backend
+from app.config import Config
+
+
+class MySQLBackend(Backend):
+    """Conexões do mysql-connector; function, procedure e triggers vêm do database.sql"""
+
+    nome = 'mysql'
+
+    def config_padrao(self):
+        return Config.get_db_config()
+
+    def configs_replicas(self):
+        return Config.get_replica_configs()
+
+    def config_shard(self, destino):
+        """"host[:porta][/banco]", com o usuário e a senha do primário"""
+        endereco, _, banco = destino.partition('/')
+        host, _, porta = endereco.partition(':')
+        config = Config.get_db_config()
+        config['host'] = host or config['host']
+        config['port'] = int(porta) if porta else config['port']
+        config['database'] = banco or config['database']
+        return config
+
+    def conectar(self, db_config):
+        return mysql.connector.connect(**db_config)
+
+    def limitar_select(self, query, limite_ms):
+        """Adiciona o hint MAX_EXECUTION_TIME a um SELECT (limite aplicado pelo servidor)"""
+        if not limite_ms:
+            return query
+        texto = query.lstrip()
+        if texto[:6].upper() != 'SELECT' or 'MAX_EXECUTION_TIME' in texto:
+            return query
+        return f"SELECT /*+ MAX_EXECUTION_TIME({int(limite_ms)}) */{texto[6:]}"
+
+    def sql_lock_wait(self, segundos):
+        valor = 'DEFAULT' if segundos is None else str(int(segundos))
+        return f"SET SESSION innodb_lock_wait_timeout = {valor}"
+
+    def sql_incremento_id(self):
+        return "SELECT @@SESSION.auto_increment_increment"
+
+    def sql_indices(self):
+        return """
+            SELECT DISTINCT INDEX_NAME AS NOME FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """
+
+    def sql_explain(self, query):
+        return f"EXPLAIN {query}"
+
+    def varreduras(self, plano):
+        # type ALL: todas as linhas lidas (tabelas derivadas <derivedN> ficam de fora)
+        return [linha['table'] for linha in plano
+                if linha.get('type') == 'ALL' and not str(linha.get('table')).startswith('<')]
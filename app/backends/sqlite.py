@@ -0,0 +1,349 @@
+"""
+Backend SQLite - banco embarcado para rodar a aplicação e os benchmarks
+sem um servidor MySQL
+
+O esquema vem de database_sqlite.sql e é criado na primeira conexão. As
+partes que no MySQL são objetos do servidor ficam aqui:
+
+- UUID() e gera_id_dados_criticos() (UUID v7 em BINARY(16)): funções
+  Python registradas na conexão
+- SHA2(texto, bits): hash da senha (usado pelos triggers e pelo login)
+- NOW(): data e hora local, como no MySQL
+- procedure listar_consultas: SELECT equivalente executado por callproc
+
+As queries dos models são traduzidas (placeholders %s, LAST_INSERT_ID() e
+o ON DUPLICATE KEY UPDATE sem efeito do migrador) e cacheadas. Erros do
+sqlite3 viram os erros correspondentes do mysql.connector.
+
+Com caminho ':memory:' o banco fica em um arquivo temporário em /dev/shm
+(memória) quando disponível: cada conexão do pool precisa enxergar o
+mesmo banco, o que um :memory: do SQLite não permite.
+"""
+
+import atexit
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import uuid
+from datetime import date, datetime
+from functools import lru_cache
+
+from mysql.connector import errors
+
+from app.backends import Backend
+from app.identificadores import novo_id
+
+SCHEMA = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                      'database_sqlite.sql')
+
+# Espera padrão por locks de escrita (ms)
+BUSY_TIMEOUT_PADRAO = 5000
+
+# Procedures do database.sql reescritas como SELECT
+PROCEDIMENTOS = {
+    'listar_consultas': """
+        SELECT C.DATA_CONSULTA, P.NOME, P.RACA
+        FROM CONSULTA C
+        INNER JOIN PET P
+        ON C.ID_PET = P.ID_PET
+        WHERE C.DATA_CONSULTA = ?
+    """,
+}
+
+# Tipos DATE/DATETIME voltam como date/datetime, igual ao mysql-connector
+sqlite3.register_adapter(date, lambda d: d.isoformat())
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(' '))
+sqlite3.register_converter('DATE', lambda b: date.fromisoformat(b.decode()))
+sqlite3.register_converter('DATETIME', lambda b: datetime.fromisoformat(b.decode()))
+
+_NO_OP_UPSERT = re.compile(r'ON\s+DUPLICATE\s+KEY\s+UPDATE\s+(\w+)\s*=\s*\1\b', re.IGNORECASE)
+_INSERT = re.compile(r'^\s*INSERT\s+(?:OR\s+\w+\s+)?INTO\s+(\w+)', re.IGNORECASE)
+_VARREDURA = re.compile(r'^SCAN (?:TABLE )?(?!CONSTANT ROW)(\w+)(?: AS \w+)?$')
+
+# Tabela -> True se for WITHOUT ROWID (o INSERT não gera id)
+_SEM_ROWID = {}
+
+
+@lru_cache(maxsize=1024)
+def traduzir(query):
+    """Converte a query escrita para o MySQL no dialeto do SQLite"""
+    query = query.replace('%s', '?')
+    query = query.replace('LAST_INSERT_ID()', 'last_insert_rowid()')
+    return _NO_OP_UPSERT.sub('ON CONFLICT DO NOTHING', query)
+
+
+def _sha2(texto, bits):
+    if texto is None:
+        return None
+    algoritmo = {224: 'sha224', 256: 'sha256', 0: 'sha256', 384: 'sha384', 512: 'sha512'}.get(bits)
+    if algoritmo is None:
+        return None
+    return hashlib.new(algoritmo, str(texto).encode('utf-8')).hexdigest()
+
+
+def _agora():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _uuid():
+    return str(uuid.uuid4())
+
+
+def _id_binario():
+    return novo_id().bytes
+
+
+def converter_erro(e):
+    """Mapeia o erro do sqlite3 para o erro equivalente do mysql.connector"""
+    mensagem = str(e)
+    if isinstance(e, sqlite3.IntegrityError):
+        if 'UNIQUE' in mensagem or 'PRIMARY KEY' in mensagem:
+            return errors.IntegrityError(msg=f"Duplicate entry ({mensagem})", errno=1062)
+        if 'FOREIGN KEY' in mensagem:
+            return errors.IntegrityError(msg=mensagem, errno=1452)
+        return errors.IntegrityError(msg=mensagem, errno=1048)
+    if isinstance(e, sqlite3.OperationalError):
+        if 'locked' in mensagem or 'busy' in mensagem:
+            # Equivalente ao lock wait timeout do InnoDB
+            return errors.DatabaseError(msg=mensagem, errno=1205)
+        if 'no such' in mensagem or 'syntax error' in mensagem:
+            return errors.ProgrammingError(msg=mensagem, errno=1064)
+        return errors.OperationalError(msg=mensagem)
+    if isinstance(e, sqlite3.ProgrammingError):
+        return errors.ProgrammingError(msg=mensagem)
+    return errors.DatabaseError(msg=mensagem)
+
+
+class CursorSQLite:
+    """Cursor com a interface do cursor do mysql-connector"""
+
+    def __init__(self, cnx, dicionario=False):
+        self._cursor = cnx.cursor()
+        self._dicionario = dicionario
+        self._lastrowid = None
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        if self._lastrowid is not None:
+            return self._lastrowid
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def column_names(self):
+        return tuple(coluna[0] for coluna in self._cursor.description or ())
+
+    def _linha(self, linha):
+        if linha is None or not self._dicionario:
+            return linha
+        return dict(zip(self.column_names, linha))
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        self._lastrowid = None
+        try:
+            self._cursor.execute(traduzir(operation), params or ())
+        except sqlite3.Error as e:
+            raise converter_erro(e) from e
+
+    def _gera_rowid(self, operation):
+        encontrada = _INSERT.match(operation)
+        if not encontrada:
+            return False
+        tabela = encontrada.group(1).upper()
+        if tabela not in _SEM_ROWID:
+            linha = self._cursor.connection.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND UPPER(name) = ?", (tabela,)
+            ).fetchone()
+            _SEM_ROWID[tabela] = bool(linha and 'WITHOUT ROWID' in linha[0].upper())
+        return not _SEM_ROWID[tabela]
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        # Como no INSERT de várias linhas do MySQL, lastrowid passa a ser o
+        # id da primeira linha do lote (o sqlite3 não o atualiza)
+        self._lastrowid = 0
+        try:
+            self._cursor.executemany(traduzir(operation), seq_params)
+            if self._cursor.rowcount > 0 and self._gera_rowid(operation):
+                ultimo = self._cursor.connection.execute('SELECT last_insert_rowid()').fetchone()[0]
+                self._lastrowid = ultimo - self._cursor.rowcount + 1
+        except sqlite3.Error as e:
+            raise converter_erro(e) from e
+
+    def callproc(self, procname, args=()):
+        if procname not in PROCEDIMENTOS:
+            raise errors.ProgrammingError(msg=f"PROCEDURE {procname} does not exist", errno=1305)
+        self.execute(PROCEDIMENTOS[procname], args)
+        return args
+
+    def stored_results(self):
+        """O resultado da procedure fica no próprio cursor"""
+        return iter([self])
+
+    def fetchone(self):
+        return self._linha(self._cursor.fetchone())
+
+    def fetchall(self):
+        linhas = self._cursor.fetchall()
+        if not self._dicionario:
+            return linhas
+        colunas = self.column_names
+        return [dict(zip(colunas, linha)) for linha in linhas]
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        self._cursor.close()
+
+
+class ConexaoSQLite:
+    """Conexão SQLite com a interface da conexão do mysql-connector"""
+
+    unread_result = False
+
+    def __init__(self, caminho):
+        try:
+            self._cnx = sqlite3.connect(
+                caminho,
+                timeout=BUSY_TIMEOUT_PADRAO / 1000,
+                detect_types=sqlite3.PARSE_DECLTYPES,
+                check_same_thread=False,  # o pool empresta a conexão a várias threads, uma por vez
+                cached_statements=256
+            )
+            self._cnx.execute('PRAGMA foreign_keys = ON')
+            self._cnx.execute('PRAGMA synchronous = NORMAL')
+        except sqlite3.Error as e:
+            raise converter_erro(e) from e
+        self._cnx.create_function('SHA2', 2, _sha2, deterministic=True)
+        self._cnx.create_function('NOW', 0, _agora)
+        self._cnx.create_function('UUID', 0, _uuid)
+        self._cnx.create_function('gera_id_dados_criticos', 0, _id_binario)
+
+    def cursor(self, dictionary=False, prepared=False, **kwargs):
+        # O sqlite3 já reaproveita statements compilados (cached_statements)
+        return CursorSQLite(self._cnx, dicionario=dictionary)
+
+    @property
+    def in_transaction(self):
+        return self._cnx.in_transaction
+
+    def start_transaction(self):
+        # IMMEDIATE: reserva a escrita já no início e evita deadlock de upgrade
+        try:
+            self._cnx.execute('BEGIN IMMEDIATE')
+        except sqlite3.Error as e:
+            raise converter_erro(e) from e
+
+    def commit(self):
+        try:
+            self._cnx.commit()
+        except sqlite3.Error as e:
+            raise converter_erro(e) from e
+
+    def rollback(self):
+        try:
+            self._cnx.rollback()
+        except sqlite3.Error as e:
+            raise converter_erro(e) from e
+
+    def reset_session(self):
+        # Não há estado de sessão além da transação
+        if self._cnx.in_transaction:
+            self.rollback()
+
+    def ping(self, reconnect=False):
+        try:
+            self._cnx.execute('SELECT 1').fetchone()
+        except sqlite3.Error as e:
+            raise converter_erro(e) from e
+
+    def get_rows(self):
+        return [], None
+
+    def close(self):
+        self._cnx.close()
+
+
+class SQLiteBackend(Backend):
+    """Banco SQLite em arquivo (WAL) ou em memória"""
+
+    nome = 'sqlite'
+
+    def __init__(self, caminho):
+        if caminho == ':memory:':
+            caminho = self._arquivo_em_memoria()
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._preparados = set()
+
+    @staticmethod
+    def _arquivo_em_memoria():
+        diretorio = '/dev/shm' if os.access('/dev/shm', os.W_OK) else None
+        fd, caminho = tempfile.mkstemp(prefix='petcare_', suffix='.db', dir=diretorio)
+        os.close(fd)
+
+        def remover():
+            for sufixo in ('', '-wal', '-shm'):
+                try:
+                    os.remove(caminho + sufixo)
+                except OSError:
+                    pass
+        atexit.register(remover)
+        return caminho
+
+    def config_padrao(self):
+        return {'database': self.caminho}
+
+    def config_shard(self, destino):
+        """Cada clínica é um arquivo próprio (':memory:' cria um temporário)"""
+        if destino == ':memory:':
+            destino = self._arquivo_em_memoria()
+        return {'database': destino}
+
+    def _preparar(self, cnx, caminho):
+        """Ativa WAL e cria o esquema na primeira conexão com cada arquivo"""
+        with self._lock:
+            if caminho in self._preparados:
+                return
+            try:
+                cnx.execute('PRAGMA journal_mode = WAL')
+                existe = cnx.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'USUARIO'"
+                ).fetchone()
+                if not existe:
+                    with open(SCHEMA, 'r', encoding='utf-8') as f:
+                        cnx.executescript(f.read())
+            except sqlite3.Error as e:
+                raise converter_erro(e) from e
+            self._preparados.add(caminho)
+
+    def conectar(self, db_config):
+        caminho = db_config.get('database', self.caminho)
+        conexao = ConexaoSQLite(caminho)
+        self._preparar(conexao._cnx, caminho)
+        return conexao
+
+    def sql_lock_wait(self, segundos):
+        ms = BUSY_TIMEOUT_PADRAO if segundos is None else int(segundos * 1000)
+        return f"PRAGMA busy_timeout = {ms}"
+
+    def sql_indices(self):
+        return "SELECT name AS NOME FROM sqlite_master WHERE type = 'index' AND tbl_name = %s"
+
+    def sql_explain(self, query):
+        return f"EXPLAIN QUERY PLAN {query}"
+
+    def varreduras(self, plano):
+        # "SCAN T" sem índice (SEARCH e SCAN ... USING INDEX usam índice)
+        return [encontrada.group(1) for encontrada in (_VARREDURA.match(linha['detail']) for linha in plano)
+                if encontrada]
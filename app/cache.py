@@ -0,0 +1,184 @@
+"""
+Cache - Cache de resultados de consultas versionado por tabela
+
+Usado por Database.execute_query(..., cache=True). A chave é o SQL
+normalizado mais os parâmetros; cada entrada guarda a versão de cada
+tabela que a consulta lê. Todo commit incrementa a versão das tabelas
+escritas, o que invalida na hora as entradas que dependem delas.
+
+O cache é por processo: escritas feitas por outro processo (outro worker,
+scripts de migração) só são vistas depois de `ttl` segundos. A memória é
+limitada por `max_bytes` (estimativa do tamanho das linhas), com despejo
+LRU.
+"""
+
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from app.linhas import Linha
+
+_LEITURA = re.compile(r'\b(?:FROM|JOIN)\s+`?(\w+)`?', re.IGNORECASE)
+_ESCRITA = re.compile(
+    r'^\s*(?:INSERT\s+(?:IGNORE\s+)?INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM)\s+`?(\w+)`?',
+    re.IGNORECASE
+)
+
+# Retorno de buscar() quando não há resultado válido (None é um resultado)
+AUSENTE = object()
+
+# Views lidas = tabelas de origem (database.sql)
+VIEWS = {
+    'INFO_PET': ('PET', 'USUARIO', 'CLIENTE'),
+    'HISTORICO_VACINA': ('PET_VACINA', 'VACINAS'),
+}
+
+# Escrever na tabela também altera estas (ON DELETE CASCADE)
+CASCATA = {
+    'PRESCRICAO': ('PRESCRICAO_MEDICAMENTO',),
+    'VACINAS': ('PET_VACINA',),
+}
+
+
+@lru_cache(maxsize=1024)
+def normalizar(query):
+    """SQL com espaços colapsados e as tabelas que ele lê (tuple ordenada)"""
+    tabelas = set()
+    for tabela in _LEITURA.findall(query):
+        tabela = tabela.upper()
+        tabelas.update(VIEWS.get(tabela, (tabela,)))
+    return ' '.join(query.split()), tuple(sorted(tabelas))
+
+
+@lru_cache(maxsize=1024)
+def tabelas_escritas(query):
+    """Tabelas alteradas por um INSERT/UPDATE/DELETE (inclui as cascatas)"""
+    encontrada = _ESCRITA.match(query)
+    if not encontrada:
+        return ()
+    tabela = encontrada.group(1).upper()
+    return (tabela,) + CASCATA.get(tabela, ())
+
+
+def _tamanho(valor):
+    """Estimativa (bytes) da memória ocupada por um resultado"""
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(sys.getsizeof(v) for v in valor.values())
+    if isinstance(valor, list):
+        return sys.getsizeof(valor) + sum(_tamanho(v) for v in valor)
+    if isinstance(valor, Linha):
+        return valor.tamanho()
+    return sys.getsizeof(valor)
+
+
+def _copiar(valor):
+    """Cópia rasa das linhas: quem recebe o resultado pode alterá-lo (Linha é imutável)"""
+    if isinstance(valor, list):
+        return [dict(linha) if isinstance(linha, dict) else linha for linha in valor]
+    if isinstance(valor, dict):
+        return dict(valor)
+    return valor
+
+
+class _Entrada:
+    __slots__ = ('resultado', 'tabelas', 'versoes', 'tamanho', 'criada_em')
+
+    def __init__(self, resultado, tabelas, versoes, tamanho):
+        self.resultado = resultado
+        self.tabelas = tabelas
+        self.versoes = versoes
+        self.tamanho = tamanho
+        self.criada_em = time.monotonic()
+
+
+class CacheResultados:
+    """Cache LRU limitado por memória e invalidado por versão de tabela"""
+
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._versoes = {}
+        self._alterada_em = {}
+        self.estatisticas = {'hits': 0, 'misses': 0, 'invalidadas': 0, 'despejadas': 0, 'ignoradas': 0}
+
+    def versoes(self, tabelas):
+        """Versão atual de cada tabela (capturar antes de executar a consulta)"""
+        return tuple(self._versoes.get(t, 0) for t in tabelas)
+
+    def alterada_ha(self, tabelas):
+        """Segundos desde a última escrita em qualquer uma das tabelas"""
+        ultima = max((self._alterada_em.get(t, 0.0) for t in tabelas), default=0.0)
+        return time.monotonic() - ultima
+
+    def buscar(self, chave):
+        """Resultado em cache (cópia) ou AUSENTE"""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self.estatisticas['misses'] += 1
+                return AUSENTE
+            if (entrada.versoes != self.versoes(entrada.tabelas)
+                    or time.monotonic() - entrada.criada_em > self.ttl):
+                self._remover(chave)
+                self.estatisticas['invalidadas'] += 1
+                self.estatisticas['misses'] += 1
+                return AUSENTE
+            self._entradas.move_to_end(chave)
+            self.estatisticas['hits'] += 1
+            return _copiar(entrada.resultado)
+
+    def guardar(self, chave, resultado, tabelas, versoes):
+        tamanho = _tamanho(resultado)
+        # Um resultado enorme despejaria o cache inteiro
+        if tamanho > self.max_bytes // 4:
+            self.estatisticas['ignoradas'] += 1
+            return
+        with self._lock:
+            if versoes != self.versoes(tabelas):
+                # Houve commit durante a consulta: o resultado já nasce velho
+                return
+            if chave in self._entradas:
+                self._remover(chave)
+            self._entradas[chave] = _Entrada(_copiar(resultado), tabelas, versoes, tamanho)
+            self._bytes += tamanho
+            while self._bytes > self.max_bytes:
+                antiga = next(iter(self._entradas))
+                self._remover(antiga)
+                self.estatisticas['despejadas'] += 1
+
+    def _remover(self, chave):
+        entrada = self._entradas.pop(chave)
+        self._bytes -= entrada.tamanho
+
+    def invalidar(self, tabelas):
+        """Incrementa a versão das tabelas (chamado após cada commit)"""
+        if not tabelas:
+            return
+        agora = time.monotonic()
+        with self._lock:
+            for tabela in tabelas:
+                self._versoes[tabela] = self._versoes.get(tabela, 0) + 1
+                self._alterada_em[tabela] = agora
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def status(self):
+        with self._lock:
+            total = self.estatisticas['hits'] + self.estatisticas['misses']
+            return {
+                'entradas': len(self._entradas),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'taxa_acerto': round(self.estatisticas['hits'] / total, 3) if total else None,
+                **self.estatisticas
+            }
@@ -0,0 +1,123 @@
+"""
+Circuito - Disjuntor (circuit breaker) para o acesso ao banco de dados
+
+Depois de `limite_falhas` falhas de conexão seguidas o disjuntor abre e
+todas as operações falham na hora com BancoIndisponivel, em vez de cada
+requisição esperar o timeout de TCP. Passados `tempo_aberto` segundos ele
+fica semiaberto: uma operação de teste por vez é liberada; se ela der
+certo o disjuntor fecha, se falhar ele volta a abrir.
+
+Só erros de conexão (servidor fora do ar, conexão perdida, excesso de
+conexões) contam como falha; erros de SQL e de constraint não.
+"""
+
+import threading
+import time
+import logging
+
+from mysql.connector import Error
+from mysql.connector.errors import PoolError
+
+logger = logging.getLogger(__name__)
+
+FECHADO = 'fechado'
+ABERTO = 'aberto'
+SEMIABERTO = 'semiaberto'
+
+# Códigos do cliente/servidor MySQL que indicam banco inacessível
+ERROS_CONEXAO = {
+    1040,  # ER_CON_COUNT_ERROR (too many connections)
+    2002,  # CR_CONNECTION_ERROR
+    2003,  # CR_CONN_HOST_ERROR
+    2005,  # CR_UNKNOWN_HOST
+    2006,  # CR_SERVER_GONE_ERROR
+    2013,  # CR_SERVER_LOST
+    2055,  # CR_SERVER_LOST_EXTENDED
+}
+
+
+class BancoIndisponivel(Exception):
+    """
+    Levantada quando o disjuntor está aberto. Não herda de mysql Error de
+    propósito: as rotas não a tratam como erro de SQL e o handler registrado
+    em Database.init_app responde 503.
+    """
+
+
+def erro_de_conexao(erro):
+    """True se o erro indica que o banco está inacessível"""
+    if isinstance(erro, PoolError):
+        # Pool esgotado é excesso de carga, não banco fora do ar
+        return False
+    return isinstance(erro, Error) and erro.errno in ERROS_CONEXAO
+
+
+class Disjuntor:
+    """Disjuntor com estados fechado, aberto e semiaberto"""
+
+    def __init__(self, nome, limite_falhas=5, tempo_aberto=10.0):
+        self.nome = nome
+        self.limite_falhas = limite_falhas
+        self.tempo_aberto = tempo_aberto
+
+        self._lock = threading.Lock()
+        self.estado = FECHADO
+        self._falhas = 0
+        self._aberto_em = 0.0
+        self._testando = False
+        self._teste_em = 0.0
+        self.estatisticas = {'aberturas': 0, 'rejeitadas': 0, 'testes': 0}
+
+    def permitir(self):
+        """Libera a operação ou levanta BancoIndisponivel"""
+        if self.estado == FECHADO:
+            return
+        with self._lock:
+            if self.estado == ABERTO and time.monotonic() - self._aberto_em >= self.tempo_aberto:
+                self.estado = SEMIABERTO
+                self._testando = False
+                logger.info(f"Disjuntor {self.nome} semiaberto, testando o banco")
+            # Um teste que não terminou (ex.: exceção fora do banco) não
+            # bloqueia o semiaberto para sempre
+            agora = time.monotonic()
+            if self.estado == SEMIABERTO and (not self._testando or agora - self._teste_em >= self.tempo_aberto):
+                self._testando = True
+                self._teste_em = agora
+                self.estatisticas['testes'] += 1
+                return
+            if self.estado == FECHADO:
+                return
+            self.estatisticas['rejeitadas'] += 1
+        raise BancoIndisponivel(f"Banco de dados indisponível (disjuntor {self.nome} aberto)")
+
+    def registrar_sucesso(self):
+        # Caminho rápido: nada a fazer no estado normal
+        if self.estado == FECHADO and not self._falhas:
+            return
+        with self._lock:
+            if self.estado != FECHADO:
+                logger.info(f"Disjuntor {self.nome} fechado, banco de dados de volta")
+            self.estado = FECHADO
+            self._falhas = 0
+            self._testando = False
+
+    def registrar_falha(self, erro):
+        """Conta a falha se ela for de conexão; abre o disjuntor no limite"""
+        if not erro_de_conexao(erro):
+            # O servidor respondeu (erro de SQL, constraint...): está no ar
+            if not isinstance(erro, PoolError):
+                self.registrar_sucesso()
+            return
+        with self._lock:
+            self._falhas += 1
+            if self.estado == SEMIABERTO or self._falhas >= self.limite_falhas:
+                if self.estado != ABERTO:
+                    self.estatisticas['aberturas'] += 1
+                    logger.warning(f"Disjuntor {self.nome} aberto após {self._falhas} falha(s): {erro}")
+                self.estado = ABERTO
+                self._aberto_em = time.monotonic()
+                self._testando = False
+
+    def status(self):
+        with self._lock:
+            return {'estado': self.estado, 'falhas_seguidas': self._falhas, **self.estatisticas}
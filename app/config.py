@@ -12,6 +12,12 @@ class Config:
     FLASK_ENV = os.getenv('FLASK_ENV', 'development')
     DEBUG = FLASK_ENV == 'development'
     
+    # Backend do banco: 'mysql' (produção) ou 'sqlite' (embarcado, para
+    # benchmarks e ambientes sem servidor MySQL)
+    DB_BACKEND = os.getenv('DB_BACKEND', 'mysql')
+    # Arquivo do banco SQLite; ':memory:' usa um banco temporário em memória
+    SQLITE_PATH = os.getenv('DB_SQLITE_PATH', 'petcare.db')
+    
     # Configurações do banco de dados MySQL
     DB_CONFIG = {
         'host': os.getenv('DB_HOST', 'localhost'),
@@ -22,15 +28,141 @@ class Config:
         'charset': 'utf8mb4',
         'collation': 'utf8mb4_general_ci',
         'autocommit': False,
-        'raise_on_warnings': True
+        'raise_on_warnings': True,
+        # Segundos para desistir de abrir a conexão (servidor fora do ar)
+        'connection_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5))
     }
     
     # Pool de conexões
     POOL_NAME = 'petcare_pool'
-    POOL_SIZE = 5
+    POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', 5))
+    POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 20))
+    # Segundos que um checkout espera por uma conexão quando o pool está no máximo
+    POOL_CHECKOUT_TIMEOUT = float(os.getenv('DB_POOL_CHECKOUT_TIMEOUT', 2.0))
+    # Quantas requisições podem esperar na fila ao mesmo tempo
+    POOL_MAX_WAITERS = int(os.getenv('DB_POOL_MAX_WAITERS', 50))
+    # Conexões além do mínimo ociosas por mais que isso (segundos) são fechadas
+    POOL_IDLE_TIMEOUT = float(os.getenv('DB_POOL_IDLE_TIMEOUT', 60))
+    # Resetar a sessão na devolução ao pool (só quando ela foi alterada)
     POOL_RESET_SESSION = True
+    # Conexões ociosas há mais que isso (segundos) recebem um ping antes do uso
+    POOL_PING_AFTER_IDLE = float(os.getenv('DB_POOL_PING_AFTER_IDLE', 30))
+    # Conexões mais velhas que isso (segundos) são recicladas; 0 desativa
+    POOL_MAX_LIFETIME = float(os.getenv('DB_POOL_MAX_LIFETIME', 3600))
+    # Prepared statements mantidos por conexão (cache LRU)
+    POOL_STATEMENT_CACHE_SIZE = int(os.getenv('DB_POOL_STATEMENT_CACHE_SIZE', 32))
+    
+    # Classes de carga: cada uma tem o próprio pool, para que relatórios e
+    # exportações (batch) nunca ocupem as conexões do tráfego interativo.
+    # O pool interativo usa as configurações DB_POOL_* acima.
+    POOL_INTERATIVO = 'interactive'
+    POOL_BATCH = 'batch'
+    POOL_CLASSES = {
+        POOL_INTERATIVO: {
+            'tamanho_min': POOL_MIN_SIZE,
+            'tamanho_max': POOL_MAX_SIZE,
+            'timeout_checkout': POOL_CHECKOUT_TIMEOUT,
+            'max_espera': POOL_MAX_WAITERS,
+            # Limite de execução de cada SELECT no servidor (ms); 0 desativa
+            'limite_statement_ms': int(os.getenv('DB_POOL_STATEMENT_TIMEOUT_MS', 5000)),
+        },
+        POOL_BATCH: {
+            'tamanho_min': int(os.getenv('DB_POOL_BATCH_MIN_SIZE', 0)),
+            'tamanho_max': int(os.getenv('DB_POOL_BATCH_MAX_SIZE', 3)),
+            'timeout_checkout': float(os.getenv('DB_POOL_BATCH_CHECKOUT_TIMEOUT', 30.0)),
+            'max_espera': int(os.getenv('DB_POOL_BATCH_MAX_WAITERS', 10)),
+            'limite_statement_ms': int(os.getenv('DB_POOL_BATCH_STATEMENT_TIMEOUT_MS', 300000)),
+        },
+    }
+    
+    # Reutilizar uma única conexão do pool durante toda a requisição Flask
+    # (devolvida ao pool no teardown da requisição)
+    REQUEST_SCOPED_CONNECTION = os.getenv('DB_REQUEST_SCOPED_CONNECTION', 'false').lower() == 'true'
+    
+    # Prazo padrão (segundos) de cada requisição para as operações no banco;
+    # rotas podem definir o próprio com @com_prazo. 0 desativa
+    REQUEST_DEADLINE = float(os.getenv('REQUEST_DEADLINE_SECONDS', 10))
+
+    # Disjuntor: abre após N falhas de conexão seguidas e testa o banco de
+    # novo depois de CIRCUIT_OPEN_SECONDS
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('DB_CIRCUIT_FAILURES', 5))
+    CIRCUIT_OPEN_SECONDS = float(os.getenv('DB_CIRCUIT_OPEN_SECONDS', 10))
+    # Intervalo (segundos) da verificação de saúde em segundo plano
+    HEALTH_CHECK_INTERVAL = float(os.getenv('DB_HEALTH_CHECK_INTERVAL', 5))
+
+    # Modo ASGI (asgi.py): threads que executam as operações no banco das
+    # rotas assíncronas (mais que as conexões do pool só ficariam esperando)
+    # e threads da ponte que executa as demais rotas no Flask
+    ASYNC_DB_THREADS = int(os.getenv('ASYNC_DB_THREADS', POOL_MAX_SIZE))
+    ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', 32))
+
+    # Clínicas (shards): a clínica padrão usa o banco acima (DB_CONFIG ou
+    # DB_SQLITE_PATH); cada filial adicional é um par "clinica=destino" em
+    # DB_SHARDS, separados por vírgula. No MySQL o destino é
+    # "host[:porta][/banco]" (mesmo usuário e senha); no SQLite, o caminho
+    # do arquivo (':memory:' para um banco temporário). Todos os shards têm
+    # o mesmo esquema (database.sql): nova filial = nova entrada aqui.
+    CLINICA_PADRAO = os.getenv('DB_CLINICA_PADRAO', 'principal')
+    DB_SHARDS = {
+        clinica.strip(): destino.strip()
+        for clinica, _, destino in (item.partition('=') for item in os.getenv('DB_SHARDS', '').split(','))
+        if clinica.strip() and destino.strip()
+    }
+
+    # Réplicas de leitura: lista "host:porta" separada por vírgulas
+    # (mesmo usuário, senha e banco do primário)
+    DB_REPLICAS = [r.strip() for r in os.getenv('DB_REPLICAS', '').split(',') if r.strip()]
+    # Segundos em que um cliente lê do primário depois de escrever (o momento
+    # da escrita volta no cookie ultima_escrita e no header X-Ultima-Escrita;
+    # clientes sem cookies reenviam o header)
+    READ_YOUR_WRITES_WINDOW = float(os.getenv('DB_READ_YOUR_WRITES_WINDOW', 5))
+
+    # Cache de resultados (execute_query(..., cache=True)): liga/desliga,
+    # memória máxima (bytes) e idade máxima das entradas (s), que limita o
+    # atraso para enxergar escritas feitas por outros processos. Desligado
+    # por padrão: o cache é por processo, e com vários workers uma leitura
+    # logo após a escrita (ex.: consultas do pet após o agendamento) pode
+    # cair em outro worker e ver o resultado antigo por até QUERY_CACHE_TTL.
+    # Ligue com um único processo ou quando esse atraso for aceitável
+    QUERY_CACHE_ENABLED = os.getenv('DB_QUERY_CACHE', 'false').lower() == 'true'
+    QUERY_CACHE_MAX_BYTES = int(os.getenv('DB_QUERY_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+    QUERY_CACHE_TTL = float(os.getenv('DB_QUERY_CACHE_TTL', 30))
+
+    # Write-behind: escritas enfileiradas (Database.enfileirar_escrita) com o
+    # mesmo SQL são gravadas juntas em um executemany, com um commit por lote
+    # de até WRITE_BEHIND_MAX_BATCH escritas ou a cada WRITE_BEHIND_WINDOW s
+    WRITE_BEHIND_ENABLED = os.getenv('DB_WRITE_BEHIND', 'false').lower() == 'true'
+    WRITE_BEHIND_MAX_BATCH = int(os.getenv('DB_WRITE_BEHIND_MAX_BATCH', 100))
+    WRITE_BEHIND_WINDOW = float(os.getenv('DB_WRITE_BEHIND_WINDOW', 0.01))
+
+    # Aplicações (pets x vacinas) aceitas por requisição em POST /vacinas/lote
+    VACINAS_LOTE_MAX = int(os.getenv('VACINAS_LOTE_MAX', 500))
+
+    # Histórico de consultas: CONSULTA guarda os últimos CONSULTAS_ANOS_QUENTES
+    # anos (o atual incluído); os anos anteriores vão para arquivos
+    # compactados em ARQUIVO_CONSULTAS_DIR (arquivar_consultas.py), lidos só
+    # quando o histórico completo é pedido. Caminho relativo à raiz do projeto
+    CONSULTAS_ANOS_QUENTES = max(1, int(os.getenv('CONSULTAS_ANOS_QUENTES', 2)))
+    ARQUIVO_CONSULTAS_DIR = os.getenv('ARQUIVO_CONSULTAS_DIR', 'arquivo_consultas')
+
+    # Dados de referência (app/referencia.py): idade máxima (s) de um catálogo
+    # lido do banco, que limita o atraso para enxergar escritas de outros
+    # processos (as deste processo recarregam o catálogo na hora)
+    REFERENCIA_TTL = float(os.getenv('REFERENCIA_TTL', 60))
 
     @staticmethod
     def get_db_config():
         """Retorna a configuração do banco de dados"""
         return Config.DB_CONFIG.copy()
+
+    @staticmethod
+    def get_replica_configs():
+        """Retorna a configuração de cada réplica de leitura"""
+        configs = []
+        for replica in Config.DB_REPLICAS:
+            host, _, porta = replica.partition(':')
+            config = Config.DB_CONFIG.copy()
+            config['host'] = host
+            config['port'] = int(porta) if porta else Config.DB_CONFIG['port']
+            configs.append(config)
+        return configs
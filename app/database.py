@@ -1,46 +1,645 @@
 import mysql.connector
-from mysql.connector import Error, pooling
+from mysql.connector import Error
+from flask import g, has_request_context, jsonify, request
 from app.config import Config
+from app.pool import PoolConexoes
+from app.backends import criar_backend
+from app.circuito import Disjuntor, BancoIndisponivel
+from app.prazo import PrazoEsgotado, tempo_restante, verificar_prazo
+from app.cache import AUSENTE, CacheResultados, normalizar, tabelas_escritas
+from app.fila_escrita import FilaEscrita
+from app.identificadores import COLUNAS_ID, id_binario, ids_para_texto
+from app.linhas import Linha
+from mysql.connector.errors import PoolError
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from functools import lru_cache
+from contextvars import ContextVar
+import itertools
+import math
+import threading
+import time
 import logging
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Erro do servidor para prepared statement desconhecido (desalocado)
+ER_UNKNOWN_STMT_HANDLER = 1243
+# SELECT interrompido por MAX_EXECUTION_TIME e espera de lock esgotada
+ER_QUERY_TIMEOUT = 3024
+ER_LOCK_WAIT_TIMEOUT = 1205
+
+# Classe de carga (pool) usada pelas operações do contexto atual
+_classe_pool = ContextVar('classe_pool', default=Config.POOL_INTERATIVO)
+
+# Clínica (shard) escolhida com usar_clinica; sem ela vale a da requisição
+_clinica = ContextVar('clinica', default=None)
+
+# Read-your-writes: o momento da última escrita do cliente vai com ele (cookie
+# ou header, em segundos desde a época), então vale em todos os processos e
+# também para quem ainda não tem token (ex.: /cadastro seguido de /login)
+COOKIE_ULTIMA_ESCRITA = 'ultima_escrita'
+HEADER_ULTIMA_ESCRITA = 'X-Ultima-Escrita'
+
+# Read-your-writes fora de uma requisição Flask (rotas assíncronas do modo
+# ASGI): última escrita informada pelo cliente e se a requisição já escreveu.
+# Definido por escritas_da_requisicao (app/asgi.py); nas rotas Flask os
+# mesmos dados ficam no request e em g
+_escritas_requisicao = ContextVar('escritas_requisicao', default=None)
+
+
+class _EscritasRequisicao:
+    __slots__ = ('ultima_escrita', 'escreveu')
+
+    def __init__(self, ultima_escrita):
+        self.ultima_escrita = ultima_escrita
+        self.escreveu = False
+
+
+class ClinicaDesconhecida(ValueError):
+    """Clínica sem shard configurado em Config.CLINICA_PADRAO / DB_SHARDS"""
+
+
 class Database:
-    """Classe para gerenciar conexões com o banco de dados MySQL"""
+    """Classe para gerenciar conexões com o banco de dados (MySQL ou SQLite, ver app/backends)"""
+    
+    # Backend que abre as conexões (Config.DB_BACKEND: mysql ou sqlite)
+    _backend = None
     
+    # Um pool por classe de carga (Config.POOL_CLASSES); _connection_pool
+    # é o pool interativo, usado por padrão
+    _pools = {}
     _connection_pool = None
     
+    # Pools de cada clínica (shard): Config.CLINICA_PADRAO usa os _pools
+    # acima; as demais vêm de Config.DB_SHARDS. _clinica_pools mapeia cada
+    # pool de volta para a clínica, e cada shard tem o seu disjuntor.
+    _shards = {}
+    _clinica_pools = {}
+    _disjuntores = {}
+    _executor_shards = None
+    _lock_shards = threading.Lock()
+    
+    # Réplicas de leitura de cada classe (uma por configuração em
+    # Config.get_replica_configs()); vazio quando não há réplicas
+    _replica_pools = {}
+    _proxima_replica = itertools.count()
+    
+    # Disjuntor do primário: falha rápido enquanto o banco está fora do ar
+    _disjuntor = Disjuntor('primario', Config.CIRCUIT_FAILURE_THRESHOLD, Config.CIRCUIT_OPEN_SECONDS)
+    
+    # Estado de saúde atualizado em segundo plano (servido por /health/ready)
+    _saude = {'status': 'desconhecido', 'verificado_em': None, 'latencia_ms': None, 'erro': None}
+    _monitor_saude = None
+    
+    # Cache de resultados das consultas marcadas com cache=True, invalidado
+    # pelos commits deste processo (ver app/cache.py)
+    _cache = CacheResultados(Config.QUERY_CACHE_MAX_BYTES, Config.QUERY_CACHE_TTL)
+    
+    # Fila write-behind (Config.WRITE_BEHIND_ENABLED), criada no primeiro uso
+    _fila_escrita = None
+    _lock_fila = threading.Lock()
+    
+    # Contadores usados pelos benchmarks
+    estatisticas = {'checkouts': 0, 'consultas': 0, 'commits': 0, 'leituras_replica': 0}
+    
+    @classmethod
+    def _criar_pool(cls, nome, db_config, classe=Config.POOL_INTERATIVO):
+        limites = Config.POOL_CLASSES[classe]
+        return PoolConexoes(
+            nome=nome,
+            db_config=db_config,
+            tamanho_min=limites['tamanho_min'],
+            tamanho_max=limites['tamanho_max'],
+            timeout_checkout=limites['timeout_checkout'],
+            max_espera=limites['max_espera'],
+            tempo_ocioso=Config.POOL_IDLE_TIMEOUT,
+            reset_session=Config.POOL_RESET_SESSION,
+            ping_apos_ocioso=Config.POOL_PING_AFTER_IDLE,
+            idade_maxima=Config.POOL_MAX_LIFETIME,
+            cache_statements=Config.POOL_STATEMENT_CACHE_SIZE,
+            backend=cls._backend
+        )
+    
+    @classmethod
+    def backend(cls):
+        """Backend em uso (app/backends), criado na primeira chamada"""
+        if cls._backend is None:
+            cls._backend = criar_backend()
+        return cls._backend
+    
     @classmethod
-    def initialize_pool(cls):
-        """Inicializa o pool de conexões"""
+    def initialize_pool(cls, db_config=None, replica_configs=None):
+        """
+        Inicializa os pools de cada classe de carga no primário e nas réplicas
+        
+        Args:
+            db_config (dict): Configuração do primário (padrão: a do backend,
+                Config.DB_CONFIG no MySQL)
+            replica_configs (list): Configurações das réplicas
+                (padrão: Config.get_replica_configs(); o SQLite não tem réplicas)
+        """
+        cls.backend()
         try:
-            if cls._connection_pool is None:
-                cls._connection_pool = pooling.MySQLConnectionPool(
-                    pool_name=Config.POOL_NAME,
-                    pool_size=Config.POOL_SIZE,
-                    pool_reset_session=Config.POOL_RESET_SESSION,
-                    **Config.get_db_config()
-                )
-                logger.info("Pool de conexões MySQL criado com sucesso")
+            for classe in Config.POOL_CLASSES:
+                if classe not in cls._pools:
+                    cls._pools[classe] = cls._criar_pool(
+                        f"{Config.POOL_NAME}_{classe}", db_config or cls._backend.config_padrao(), classe
+                    )
+                    logger.info(f"Pool de conexões {cls._backend.nome} '{classe}' criado com sucesso")
+            cls._connection_pool = cls._pools[Config.POOL_INTERATIVO]
         except Error as e:
-            logger.error(f"Erro ao criar pool de conexões MySQL: {e}")
+            logger.error(f"Erro ao criar pool de conexões {cls._backend.nome}: {e}")
             raise
+        cls._registrar_shard(Config.CLINICA_PADRAO, cls._pools, cls._disjuntor)
+        
+        # Um shard fora do ar não impede a aplicação de subir: só as
+        # requisições da clínica dele falham
+        for clinica, destino in Config.DB_SHARDS.items():
+            if clinica in cls._shards:
+                continue
+            try:
+                shard_config = cls._backend.config_shard(destino)
+                pools = {
+                    classe: cls._criar_pool(f"{Config.POOL_NAME}_{clinica}_{classe}", shard_config, classe)
+                    for classe in Config.POOL_CLASSES
+                }
+            except Error as e:
+                logger.error(f"Erro ao criar pools do shard '{clinica}' ({destino}): {e}")
+                continue
+            disjuntor = Disjuntor(f'shard_{clinica}', Config.CIRCUIT_FAILURE_THRESHOLD, Config.CIRCUIT_OPEN_SECONDS)
+            cls._registrar_shard(clinica, pools, disjuntor)
+            logger.info(f"Shard da clínica '{clinica}' criado ({destino})")
+        
+        if replica_configs is None:
+            replica_configs = cls._backend.configs_replicas()
+        
+        # Uma réplica fora do ar não impede a aplicação de subir: as leituras
+        # vão para as demais réplicas ou para o primário
+        for i, replica_config in enumerate(replica_configs):
+            for classe in Config.POOL_CLASSES:
+                try:
+                    pool = cls._criar_pool(f"{Config.POOL_NAME}_{classe}_replica{i}", replica_config, classe)
+                    cls._replica_pools.setdefault(classe, []).append(pool)
+                    logger.info(f"Pool '{classe}' da réplica {replica_config['host']}:{replica_config['port']} criado")
+                except Error as e:
+                    logger.error(f"Erro ao criar pool da réplica {replica_config['host']}:{replica_config['port']}: {e}")
+    
+    @classmethod
+    def _registrar_shard(cls, clinica, pools, disjuntor):
+        cls._shards[clinica] = pools
+        cls._disjuntores[clinica] = disjuntor
+        for pool in pools.values():
+            cls._clinica_pools[pool] = clinica
     
     @classmethod
-    def get_connection(cls):
-        """Obtém uma conexão do pool"""
+    def get_connection(cls, classe=None, timeout=None):
+        """
+        Obtém uma conexão do pool da classe de carga (padrão: a do contexto
+        atual) no shard da clínica atual, esperando no máximo `timeout`
+        segundos se o pool estiver cheio
+        """
+        classe = classe or _classe_pool.get()
         try:
             if cls._connection_pool is None:
                 cls.initialize_pool()
-            return cls._connection_pool.get_connection()
+            return cls._pools_clinica()[classe].get_connection(timeout)
         except Error as e:
-            logger.error(f"Erro ao obter conexão do pool: {e}")
+            logger.error(f"Erro ao obter conexão do pool '{classe}': {e}")
             raise
     
     @classmethod
-    def execute_query(cls, query, params=None, fetch_one=False, fetch_all=False, commit=False):
+    @contextmanager
+    def usar_pool(cls, classe):
+        """
+        Faz as operações do bloco usarem o pool da classe de carga indicada.
+        Serve também como decorator de métodos dos models e de rotas:
+        
+            @Database.usar_pool(Config.POOL_BATCH)
+            def relatorio(): ...
+        """
+        if classe not in Config.POOL_CLASSES:
+            raise ValueError(f"Classe de pool desconhecida: {classe}")
+        token = _classe_pool.set(classe)
+        try:
+            yield
+        finally:
+            _classe_pool.reset(token)
+    
+    @staticmethod
+    def classe_atual():
+        """Classe de carga usada pelas operações do contexto atual"""
+        return _classe_pool.get()
+    
+    # ---------- Clínicas (shards) ----------
+    
+    @staticmethod
+    def clinicas():
+        """Clínicas configuradas: a padrão seguida das de Config.DB_SHARDS"""
+        return [Config.CLINICA_PADRAO] + [c for c in Config.DB_SHARDS if c != Config.CLINICA_PADRAO]
+    
+    @staticmethod
+    def clinica_atual():
+        """
+        Clínica das operações do contexto atual: a de usar_clinica, senão a
+        da requisição (token ou header X-Clinica), senão Config.CLINICA_PADRAO
+        """
+        clinica = _clinica.get()
+        if clinica is None and has_request_context():
+            clinica = g.get('_clinica')
+        return clinica or Config.CLINICA_PADRAO
+    
+    @classmethod
+    def _validar_clinica(cls, clinica):
+        if clinica not in cls.clinicas():
+            raise ClinicaDesconhecida(f"Clínica desconhecida: {clinica}")
+    
+    @classmethod
+    def definir_clinica(cls, clinica):
+        """Define a clínica da requisição atual (usado pelos decorators de auth)"""
+        cls._validar_clinica(clinica)
+        g._clinica = clinica
+    
+    @classmethod
+    @contextmanager
+    def usar_clinica(cls, clinica):
+        """
+        Faz as operações do bloco usarem o shard da clínica indicada.
+        Serve também como decorator, como usar_pool.
+        """
+        cls._validar_clinica(clinica)
+        token = _clinica.set(clinica)
+        try:
+            yield
+        finally:
+            _clinica.reset(token)
+    
+    @classmethod
+    def _pools_clinica(cls):
+        clinica = cls.clinica_atual()
+        pools = cls._shards.get(clinica)
+        if pools is None:
+            cls._validar_clinica(clinica)
+            # Configurada, mas o shard não pôde ser criado na inicialização
+            raise BancoIndisponivel(f"Shard da clínica '{clinica}' indisponível")
+        return pools
+    
+    @classmethod
+    def _disjuntor_de(cls, connection=None):
+        """Disjuntor do shard da conexão (ou da clínica atual)"""
+        if connection is not None:
+            clinica = cls._clinica_pools.get(connection.pool)
+        else:
+            clinica = cls.clinica_atual()
+        return cls._disjuntores.get(clinica, cls._disjuntor)
+    
+    @classmethod
+    def em_todas_clinicas(cls, funcao, *args, **kwargs):
+        """
+        Executa `funcao` (ex.: um método de model) no shard de cada clínica,
+        em paralelo, e junta os resultados em uma lista. Cada linha recebe a
+        chave CLINICA. Usado pelas consultas administrativas entre clínicas.
+        
+        Respeita o prazo da requisição; o erro de qualquer shard é propagado.
+        """
+        if cls._executor_shards is None:
+            with cls._lock_shards:
+                if cls._executor_shards is None:
+                    cls._executor_shards = ThreadPoolExecutor(
+                        max_workers=max(4, 2 * len(cls.clinicas())), thread_name_prefix='shards'
+                    )
+        
+        classe = _classe_pool.get()
+        
+        def executar(clinica):
+            with cls.usar_clinica(clinica), cls.usar_pool(classe):
+                return funcao(*args, **kwargs)
+        
+        futuros = {clinica: cls._executor_shards.submit(executar, clinica) for clinica in cls.clinicas()}
+        _, pendentes = wait(futuros.values(), timeout=tempo_restante())
+        if pendentes:
+            raise PrazoEsgotado("Prazo esgotado aguardando os shards")
+        
+        resultados = []
+        for clinica, futuro in futuros.items():
+            resultado = futuro.result()
+            if resultado is None:
+                continue
+            for linha in resultado if isinstance(resultado, list) else [resultado]:
+                if isinstance(linha, Linha):
+                    resultados.append(linha.com(CLINICA=clinica))
+                else:
+                    resultados.append(dict(linha, CLINICA=clinica))
+        return resultados
+    
+    @classmethod
+    def pool_status(cls):
+        """Tamanho atual de cada pool e contadores de esgotamento/timeout"""
+        if cls._connection_pool is None:
+            return None
+        status = {}
+        for classe, pool in cls._pools.items():
+            status[classe] = pool.status()
+            status[classe]['replicas'] = [replica.status() for replica in cls._replica_pools.get(classe, [])]
+            status[classe]['shards'] = {
+                clinica: pools[classe].status()
+                for clinica, pools in cls._shards.items() if clinica != Config.CLINICA_PADRAO
+            }
+        return status
+    
+    @classmethod
+    def cache_status(cls):
+        """Entradas, memória usada e acertos/erros do cache de resultados"""
+        return cls._cache.status()
+    
+    @classmethod
+    def versoes_tabelas(cls, tabelas):
+        """
+        Versão de cada tabela no cache de resultados: muda a cada commit
+        deste processo que escreve nela (usado por app/referencia.py)
+        """
+        return cls._cache.versoes(tabelas)
+    
+    @classmethod
+    def fila_status(cls):
+        """Escritas pendentes e lotes gravados pela fila write-behind"""
+        if cls._fila_escrita is None:
+            return None
+        return cls._fila_escrita.status()
+    
+    @classmethod
+    def init_app(cls, app):
+        """
+        Registra o teardown que devolve a conexão da requisição ao pool, a
+        resposta 503 para operações recusadas pelo disjuntor, a escolha da
+        clínica (shard) pelo header X-Clinica e o cookie/header da última
+        escrita (read-your-writes das réplicas)
+        """
+        app.before_request(cls._clinica_do_header)
+        app.after_request(cls._anotar_ultima_escrita)
+        app.teardown_request(cls._liberar_conexao_requisicao)
+        app.register_error_handler(BancoIndisponivel, cls._responder_indisponivel)
+    
+    @classmethod
+    def _clinica_do_header(cls):
+        """Requisições sem token escolhem a clínica pelo header X-Clinica"""
+        clinica = request.headers.get('X-Clinica')
+        if not clinica:
+            return None
+        try:
+            cls.definir_clinica(clinica)
+        except ClinicaDesconhecida as e:
+            return jsonify({'message': str(e)}), 400
+        return None
+    
+    @staticmethod
+    def _responder_indisponivel(e):
+        resposta = jsonify({'message': 'Banco de dados temporariamente indisponível'})
+        resposta.headers['Retry-After'] = str(int(Config.CIRCUIT_OPEN_SECONDS))
+        return resposta, 503
+    
+    @classmethod
+    def _usa_conexao_requisicao(cls):
+        return Config.REQUEST_SCOPED_CONNECTION and has_request_context()
+    
+    # ---------- Roteamento de leituras para réplicas ----------
+    
+    @staticmethod
+    def escritas_da_requisicao(ultima_escrita):
+        """
+        Última escrita informada pelo cliente (cookie ou header) na requisição
+        atual fora do Flask (rotas assíncronas), para as mesmas regras de
+        read-your-writes das rotas Flask
+        """
+        _escritas_requisicao.set(_EscritasRequisicao(ultima_escrita))
+    
+    @staticmethod
+    def _ultima_escrita_cliente():
+        """Momento da última escrita informado pelo cliente da requisição atual, ou None"""
+        if has_request_context():
+            valor = request.headers.get(HEADER_ULTIMA_ESCRITA) or request.cookies.get(COOKIE_ULTIMA_ESCRITA)
+        else:
+            estado = _escritas_requisicao.get()
+            valor = estado.ultima_escrita if estado else None
+        try:
+            return float(valor) if valor else None
+        except ValueError:
+            return None
+    
+    @classmethod
+    def _registrar_escrita(cls, *queries):
+        """
+        Após o commit das queries: invalida o cache das tabelas escritas e
+        marca a requisição, cuja resposta leva ao cliente o momento da escrita
+        (_anotar_ultima_escrita) para ele ler do primário por
+        READ_YOUR_WRITES_WINDOW
+        """
+        if queries:
+            cls.estatisticas['commits'] += 1
+        for query in queries:
+            cls._cache.invalidar(tabelas_escritas(query))
+        if not cls._replica_pools:
+            return
+        if has_request_context():
+            g._db_escreveu = True
+        else:
+            estado = _escritas_requisicao.get()
+            if estado is not None:
+                estado.escreveu = True
+    
+    @classmethod
+    def _anotar_ultima_escrita(cls, resposta):
+        """after_request: se a requisição escreveu, devolve o momento da escrita em cookie e header"""
+        if g.get('_db_escreveu'):
+            agora = f"{time.time():.3f}"
+            resposta.headers[HEADER_ULTIMA_ESCRITA] = agora
+            resposta.set_cookie(
+                COOKIE_ULTIMA_ESCRITA, agora, max_age=math.ceil(Config.READ_YOUR_WRITES_WINDOW),
+                httponly=True, samesite='Lax'
+            )
+        return resposta
+    
+    @classmethod
+    def _pode_ler_da_replica(cls):
+        # As réplicas são do shard da clínica padrão
+        if not cls._replica_pools.get(_classe_pool.get()) or cls.clinica_atual() != Config.CLINICA_PADRAO:
+            return False
+        if has_request_context():
+            escreveu = g.get('_db_escreveu')
+        else:
+            estado = _escritas_requisicao.get()
+            if estado is None:
+                return True
+            escreveu = estado.escreveu
+        if escreveu:
+            return False
+        # Valores no futuro (relógios de hosts diferentes) também contam, mas
+        # nunca prendem o cliente ao primário por mais de uma janela
+        ultima = cls._ultima_escrita_cliente()
+        if ultima is not None and abs(time.time() - ultima) < Config.READ_YOUR_WRITES_WINDOW:
+            return False
+        return True
+    
+    @classmethod
+    def _conexao_replica(cls):
+        """Round-robin entre as réplicas; None se nenhuma tiver conexão disponível"""
+        pools = cls._replica_pools[_classe_pool.get()]
+        total = len(pools)
+        inicio = next(cls._proxima_replica)
+        for i in range(total):
+            pool = pools[(inicio + i) % total]
+            try:
+                connection = pool.get_connection(timeout=0)
+            except Error as e:
+                logger.warning(f"Réplica {pool.nome} indisponível: {e}")
+                continue
+            cls.estatisticas['checkouts'] += 1
+            cls.estatisticas['leituras_replica'] += 1
+            return connection
+        return None
+    
+    @classmethod
+    def _obter_conexao(cls, leitura=False):
+        """
+        Obtém a conexão para uma operação. Leituras vão para uma réplica
+        quando houver (respeitando read-your-writes). No modo
+        REQUEST_SCOPED_CONNECTION a mesma conexão do primário é reutilizada
+        por todas as chamadas interativas da requisição; operações batch
+        sempre usam uma conexão própria do pool batch.
+        """
+        if leitura and cls._pode_ler_da_replica():
+            connection = cls._conexao_replica()
+            if connection is not None:
+                return connection
+        
+        # Com o disjuntor aberto a operação falha na hora (leituras em
+        # réplicas continuam funcionando)
+        cls._disjuntor_de().permitir()
+        
+        if cls._usa_conexao_requisicao() and _classe_pool.get() == Config.POOL_INTERATIVO:
+            connection = g.get('_db_conexao')
+            if connection is None:
+                connection = cls._checkout()
+                g._db_conexao = connection
+                g._db_conexao_clinica = cls.clinica_atual()
+            if g._db_conexao_clinica == cls.clinica_atual():
+                return connection
+            # Operação em outra clínica (usar_clinica): conexão própria
+        
+        return cls._checkout()
+    
+    @classmethod
+    def _checkout(cls):
+        """Checkout no primário com a espera limitada pelo prazo da requisição"""
+        restante = tempo_restante()
+        if restante is None:
+            connection = cls.get_connection()
+        else:
+            if restante <= 0:
+                raise PrazoEsgotado("Prazo esgotado antes de obter conexão", status=503)
+            limite_pool = Config.POOL_CLASSES[_classe_pool.get()]['timeout_checkout']
+            try:
+                connection = cls.get_connection(timeout=min(restante, limite_pool))
+            except PoolError as e:
+                if restante < limite_pool:
+                    raise PrazoEsgotado("Prazo esgotado aguardando conexão do pool", status=503) from e
+                raise
+        cls.estatisticas['checkouts'] += 1
+        return connection
+    
+    # ---------- Limites de tempo (classe do pool e prazo da requisição) ----------
+    
+    @staticmethod
+    def _limite_select_ms():
+        """
+        MAX_EXECUTION_TIME dos SELECTs: o menor entre o limite da classe do
+        pool e o tempo restante do prazo. O restante é arredondado para baixo
+        em potência de 2 (ms), mínimo 1, para não gerar um prepared statement
+        por valor sem passar do prazo.
+        """
+        limite = Config.POOL_CLASSES[_classe_pool.get()]['limite_statement_ms']
+        restante = tempo_restante()
+        if restante is None:
+            return limite
+        restante_ms = 1 << math.floor(math.log2(max(restante * 1000, 1)))
+        return min(limite, restante_ms) if limite else restante_ms
+    
+    @staticmethod
+    def _limitar_escrita(connection):
+        """Limita a espera por locks das escritas ao tempo restante do prazo"""
+        if not hasattr(connection, 'ajustar_lock_wait'):
+            return
+        restante = tempo_restante()
+        connection.ajustar_lock_wait(None if restante is None else max(1, math.ceil(restante)))
+    
+    @staticmethod
+    def _converter_erro_prazo(erro):
+        """Consulta interrompida por causa do prazo da requisição vira PrazoEsgotado (504)"""
+        if erro.errno in (ER_QUERY_TIMEOUT, ER_LOCK_WAIT_TIMEOUT) and tempo_restante() is not None:
+            raise PrazoEsgotado("Consulta interrompida pelo prazo da requisição") from erro
+    
+    @classmethod
+    def _primaria(cls, connection):
+        """True se a conexão veio do primário de um shard (ou ainda não foi obtida)"""
+        return connection is None or connection.pool in cls._clinica_pools
+    
+    @classmethod
+    def _contar_consulta(cls, connection):
+        cls.estatisticas['consultas'] += 1
+        if cls._primaria(connection):
+            cls._disjuntor_de(connection).registrar_sucesso()
+    
+    @classmethod
+    def _registrar_falha(cls, connection, erro):
+        # Falhas nas réplicas não abrem o disjuntor do primário
+        if cls._primaria(connection):
+            cls._disjuntor_de(connection).registrar_falha(erro)
+    
+    @classmethod
+    def _pode_guardar(cls, connection, tabelas):
+        """
+        Se o resultado lido nesta conexão pode ir para o cache: não quando a
+        leitura usa um snapshot antigo (transação já aberta na conexão da
+        requisição) nem quando vem de uma réplica que pode ainda não ter
+        recebido uma escrita recente nas tabelas
+        """
+        if connection.in_transaction:
+            return False
+        if not cls._primaria(connection):
+            return cls._cache.alterada_ha(tabelas) > Config.READ_YOUR_WRITES_WINDOW
+        return True
+    
+    @classmethod
+    def _devolver_conexao(cls, connection):
+        """Devolve a conexão ao pool, exceto quando ela pertence à requisição"""
+        if connection is None:
+            return
+        if has_request_context() and g.get('_db_conexao') is connection:
+            return
+        connection.close()
+    
+    @classmethod
+    def _liberar_conexao_requisicao(cls, exc=None):
+        """
+        Teardown da requisição: desfaz qualquer trabalho não confirmado
+        (ou todo ele, se a requisição falhou) e devolve a conexão ao pool
+        """
+        connection = g.pop('_db_conexao', None)
+        if connection is None:
+            return
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+        except Error as e:
+            logger.error(f"Erro ao desfazer transação da requisição: {e}")
+        finally:
+            connection.close()
+    
+    @classmethod
+    def execute_query(cls, query, params=None, fetch_one=False, fetch_all=False, commit=False,
+                      prepared=False, cache=False, linha=None):
         """
         Executa uma query no banco de dados
         
@@ -50,47 +649,134 @@ class Database:
             fetch_one (bool): Se True, retorna apenas um resultado
             fetch_all (bool): Se True, retorna todos os resultados
             commit (bool): Se True, faz commit da transação
+            prepared (bool): Se True, usa um prepared statement do servidor
+                (cacheado por conexão). Indicado para queries fixas e frequentes.
+            cache (bool): Se True, guarda o resultado no cache de resultados
+                até um commit alterar uma das tabelas lidas (ou QUERY_CACHE_TTL)
+            linha (type): Subclasse de Linha (app/linhas.py): as linhas vêm
+                de um cursor de tuplas como objetos dessa classe, não dicts
+        
+        SELECTs recebem o limite de execução da classe de pool em uso
+        (ver usar_pool), reduzido ao tempo restante do prazo da requisição.
         
         Returns:
             dict: Resultado da query ou None
         """
+        leitura = (fetch_one or fetch_all) and not commit
+        chave = versoes = None
+        if cache and leitura and Config.QUERY_CACHE_ENABLED:
+            sql, tabelas = normalizar(query)
+            if tabelas:
+                chave = (cls.clinica_atual(), sql, tuple(params) if params else None, fetch_one)
+                result = cls._cache.buscar(chave)
+                if result is not AUSENTE:
+                    return result
+                # Versões de antes da consulta: um commit concorrente
+                # impede que o resultado seja guardado
+                versoes = cls._cache.versoes(tabelas)
+        
         connection = None
         cursor = None
         try:
-            connection = cls.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            if params:
-                cursor.execute(query, params)
+            connection = cls._obter_conexao(leitura=leitura)
+            if leitura:
+                query = cls._backend.limitar_select(query, cls._limite_select_ms())
             else:
-                cursor.execute(query)
-            
-            if commit:
-                connection.commit()
-                return {'affected_rows': cursor.rowcount, 'last_insert_id': cursor.lastrowid}
-            
-            if fetch_one:
-                result = cursor.fetchone()
-                return result
+                cls._limitar_escrita(connection)
+            if versoes is not None and not cls._pode_guardar(connection, tabelas):
+                versoes = None
             
-            if fetch_all:
-                results = cursor.fetchall()
-                return results
+            if prepared and hasattr(connection, 'cursor_preparado'):
+                result = cls._execute_prepared(connection, query, params, fetch_one, fetch_all, commit, linha)
+            else:
+                cursor = connection.cursor(dictionary=linha is None)
+                
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                cls._contar_consulta(connection)
+                
+                if commit:
+                    connection.commit()
+                    cls._registrar_escrita(query)
+                    return {'affected_rows': cursor.rowcount, 'last_insert_id': cursor.lastrowid}
+                
+                if fetch_one:
+                    result = cursor.fetchone()
+                elif fetch_all:
+                    result = cursor.fetchall()
+                else:
+                    return {'affected_rows': cursor.rowcount}
+                if linha is not None:
+                    result = cls._montar_linhas(linha, cursor.column_names, result, fetch_one)
             
-            return {'affected_rows': cursor.rowcount}
+            # Ids BINARY(16) voltam em texto (ver app/identificadores.py);
+            # nas linhas de Linha, a conversão já foi feita ao montá-las
+            if linha is None:
+                result = ids_para_texto(result)
+            if versoes is not None:
+                cls._cache.guardar(chave, result, tabelas, versoes)
+            return result
             
         except Error as e:
+            cls._registrar_falha(connection, e)
             if connection:
                 connection.rollback()
             logger.error(f"Erro ao executar consulta SQL: {e}")
             logger.error(f"Consulta: {query}")
             logger.error(f"Parâmetros: {params}")
+            cls._converter_erro_prazo(e)
             raise
         finally:
             if cursor:
                 cursor.close()
-            if connection:
-                connection.close()
+            cls._devolver_conexao(connection)
+    
+    @staticmethod
+    def _montar_linhas(linha, colunas, result, fetch_one):
+        """Tupla(s) do cursor -> objeto(s) da classe de linha"""
+        construir = linha.construtor(colunas)
+        if fetch_one:
+            return construir(result) if result is not None else None
+        return [construir(valores) for valores in result]
+    
+    @classmethod
+    def _execute_prepared(cls, connection, query, params, fetch_one, fetch_all, commit, linha=None):
+        """
+        Executa a query com o cursor preparado da conexão e devolve linhas
+        no mesmo formato de dicionário do cursor(dictionary=True), ou
+        objetos de `linha`
+        """
+        for tentativa in range(2):
+            cursor = connection.cursor_preparado(query)
+            try:
+                cursor.execute(query, params or ())
+                break
+            except Error as e:
+                connection.descartar_statement(query)
+                # Statement desalocado no servidor (ex.: após reset): prepara de novo
+                if e.errno != ER_UNKNOWN_STMT_HANDLER or tentativa:
+                    raise
+        cls._contar_consulta(connection)
+        
+        if commit:
+            connection.commit()
+            cls._registrar_escrita(query)
+            return {'affected_rows': cursor.rowcount, 'last_insert_id': cursor.lastrowid}
+        
+        if not (fetch_one or fetch_all):
+            return {'affected_rows': cursor.rowcount}
+        
+        # O cursor fica no cache: todas as linhas são lidas para liberar a conexão
+        colunas = cursor.column_names
+        if linha is not None:
+            linhas = cls._montar_linhas(linha, colunas, cursor.fetchall(), False)
+        else:
+            linhas = [dict(zip(colunas, valores)) for valores in cursor.fetchall()]
+        if fetch_one:
+            return linhas[0] if linhas else None
+        return linhas
     
     @classmethod
     def execute_many(cls, query, params_list):
@@ -102,29 +788,78 @@ class Database:
             params_list (list): Lista de tuplas com parâmetros
         
         Returns:
-            dict: Informações sobre a execução
+            dict: 'affected_rows', 'last_insert_id' (id da primeira linha
+            inserida) e 'incremento_id' (passo até o id da próxima)
         """
         connection = None
         cursor = None
         try:
-            connection = cls.get_connection()
+            connection = cls._obter_conexao()
+            cls._limitar_escrita(connection)
             cursor = connection.cursor()
             
             cursor.executemany(query, params_list)
+            cls._contar_consulta(connection)
             connection.commit()
+            cls._registrar_escrita(query)
             
-            return {'affected_rows': cursor.rowcount}
+            return {
+                'affected_rows': cursor.rowcount,
+                'last_insert_id': cursor.lastrowid,
+                # Passo entre os ids das linhas de um INSERT de várias linhas
+                'incremento_id': connection.incremento_id() if hasattr(connection, 'incremento_id') else 1
+            }
             
         except Error as e:
+            cls._registrar_falha(connection, e)
             if connection:
                 connection.rollback()
             logger.error(f"Erro ao executar múltiplas consultas: {e}")
+            cls._converter_erro_prazo(e)
             raise
         finally:
             if cursor:
                 cursor.close()
-            if connection:
-                connection.close()
+            cls._devolver_conexao(connection)
+    
+    @classmethod
+    def enfileirar_escrita(cls, query, params):
+        """
+        Executa uma escrita com commit pela fila write-behind: escritas
+        concorrentes com o mesmo SQL são gravadas em um único executemany.
+        Retorna quando o lote que contém a escrita tiver sido confirmado.
+        Sem WRITE_BEHIND_ENABLED equivale a execute_query(commit=True).
+        
+        Args:
+            query (str): INSERT/UPDATE independente das demais escritas
+            params (tuple): Parâmetros da query
+        
+        Returns:
+            dict: 'affected_rows' e 'last_insert_id' (id da linha inserida)
+        """
+        if not Config.WRITE_BEHIND_ENABLED:
+            return cls.execute_query(query, params, commit=True)
+        if cls._fila_escrita is None:
+            with cls._lock_fila:
+                if cls._fila_escrita is None:
+                    cls._fila_escrita = FilaEscrita(
+                        cls._executar_lote, Config.WRITE_BEHIND_MAX_BATCH, Config.WRITE_BEHIND_WINDOW
+                    )
+        verificar_prazo()
+        resultado = cls._fila_escrita.submeter(
+            query, params, (cls.clinica_atual(), _classe_pool.get()), timeout=tempo_restante()
+        )
+        # O lote é gravado fora da requisição: o read-your-writes do usuário
+        # é registrado aqui (o cache já foi invalidado no commit do lote)
+        cls._registrar_escrita()
+        return resultado
+    
+    @classmethod
+    def _executar_lote(cls, query, params_list, destino):
+        """Grava um lote da fila write-behind no shard e pool de quem o enfileirou"""
+        clinica, classe = destino
+        with cls.usar_clinica(clinica), cls.usar_pool(classe):
+            return cls.execute_many(query, params_list)
     
     @classmethod
     def call_procedure(cls, procedure_name, args=None):
@@ -141,29 +876,32 @@ class Database:
         connection = None
         cursor = None
         try:
-            connection = cls.get_connection()
+            connection = cls._obter_conexao()
+            cls._limitar_escrita(connection)
             cursor = connection.cursor(dictionary=True)
             
             if args:
                 cursor.callproc(procedure_name, args)
             else:
                 cursor.callproc(procedure_name)
+            cls._contar_consulta(connection)
             
             # Recuperar todos os result sets
             results = []
             for result in cursor.stored_results():
                 results.extend(result.fetchall())
             
-            return results
+            return ids_para_texto(results)
             
         except Error as e:
+            cls._registrar_falha(connection, e)
             logger.error(f"Erro ao chamar procedimento armazenado {procedure_name}: {e}")
+            cls._converter_erro_prazo(e)
             raise
         finally:
             if cursor:
                 cursor.close()
-            if connection:
-                connection.close()
+            cls._devolver_conexao(connection)
     
     @classmethod
     def execute_transaction(cls, queries):
@@ -179,14 +917,23 @@ class Database:
         connection = None
         cursor = None
         try:
-            connection = cls.get_connection()
+            connection = cls._obter_conexao()
+            cls._limitar_escrita(connection)
             cursor = connection.cursor(dictionary=True)
             
+            # Leituras anteriores na mesma conexão da requisição deixam um
+            # snapshot aberto; ele é descartado antes de iniciar a transação
+            if connection.in_transaction:
+                connection.rollback()
+            
             # Iniciar transação
             connection.start_transaction()
             
             results = []
             for query_info in queries:
+                # Não começa um novo comando com o prazo já esgotado; a
+                # transação aberta é desfeita na devolução da conexão
+                verificar_prazo()
                 query = query_info['query']
                 params = query_info.get('params')
                 
@@ -194,6 +941,7 @@ class Database:
                     cursor.execute(query, params)
                 else:
                     cursor.execute(query)
+                cls._contar_consulta(connection)
                 
                 results.append({
                     'affected_rows': cursor.rowcount,
@@ -202,83 +950,241 @@ class Database:
             
             # Commit da transação
             connection.commit()
+            cls._registrar_escrita(*(query_info['query'] for query_info in queries))
             return {'success': True, 'results': results}
             
         except Error as e:
+            cls._registrar_falha(connection, e)
             if connection:
                 connection.rollback()
             logger.error(f"Erro na transação: {e}")
+            cls._converter_erro_prazo(e)
             raise
         finally:
             if cursor:
                 cursor.close()
-            if connection:
-                connection.close()
+            cls._devolver_conexao(connection)
     
     @classmethod
     def test_connection(cls):
         """Testa a conexão com o banco de dados"""
+        connection = None
         try:
-            connection = cls.get_connection()
+            connection = cls._obter_conexao()
             cursor = connection.cursor()
             cursor.execute("SELECT 1")
             cursor.fetchone()
             cursor.close()
-            connection.close()
+            cls._disjuntor_de(connection).registrar_sucesso()
             logger.info("Conexão com banco de dados testada com sucesso")
             return True
+        except BancoIndisponivel as e:
+            logger.warning(f"Teste de conexão não executado: {e}")
+            return False
         except Error as e:
+            cls._disjuntor_de(connection).registrar_falha(e)
             logger.error(f"Erro ao testar conexão: {e}")
             return False
+        finally:
+            cls._devolver_conexao(connection)
+    
+    # ---------- Saúde (liveness/readiness) ----------
+    
+    @classmethod
+    def verificar_saude(cls):
+        """Executa um SELECT 1 e atualiza o estado de saúde em cache"""
+        inicio = time.monotonic()
+        ok = cls.test_connection()
+        cls._saude = {
+            'status': 'ok' if ok else 'indisponivel',
+            'verificado_em': time.time(),
+            'latencia_ms': round((time.monotonic() - inicio) * 1000, 1),
+            'erro': None if ok else 'Falha ao executar SELECT 1'
+        }
+        return cls._saude
+    
+    @classmethod
+    def iniciar_monitor_saude(cls, intervalo=None):
+        """Atualiza o estado de saúde a cada `intervalo` segundos em uma thread"""
+        if cls._monitor_saude is not None:
+            return
+        intervalo = intervalo or Config.HEALTH_CHECK_INTERVAL
+        
+        def loop():
+            while True:
+                try:
+                    cls.verificar_saude()
+                except Exception as e:
+                    logger.error(f"Erro no monitor de saúde do banco: {e}")
+                time.sleep(intervalo)
+        
+        cls._monitor_saude = threading.Thread(target=loop, name='monitor-saude-db', daemon=True)
+        cls._monitor_saude.start()
+    
+    @classmethod
+    def saude(cls):
+        """Último estado de saúde (sem tocar no banco) mais o estado do disjuntor"""
+        saude = dict(cls._saude)
+        saude['disjuntor'] = cls._disjuntor.status()
+        saude['shards'] = {
+            clinica: disjuntor.status()['estado']
+            for clinica, disjuntor in cls._disjuntores.items() if clinica != Config.CLINICA_PADRAO
+        }
+        saude['pronto'] = saude['status'] == 'ok' and saude['disjuntor']['estado'] != 'aberto'
+        return saude
+
+# ---------- Compilador de statements dos helpers de CRUD ----------
+
+# Colunas de cada tabela (espelha o database.sql). Só estas colunas podem
+# chegar ao banco pelos helpers abaixo.
+ESQUEMA = {
+    'GRUPO_USUARIO': ('ID_ACESSO', 'ROLE_MYSQL', 'TIPO_ACESSO', 'DESCRICAO'),
+    'USUARIO': ('ID_USUARIO', 'NOME_COMPLETO', 'EMAIL', 'SENHA', 'GRUPO_USUARIO'),
+    'CLIENTE': ('ID_USUARIO', 'TELEFONE', 'BAIRRO', 'RUA', 'CIDADE', 'CPF', 'ID_PET'),
+    'PET': ('ID_PET', 'NOME', 'RACA', 'IDADE', 'OBSERVACOES', 'ID_VACINAS'),
+    'VACINAS': ('ID_VAC', 'NOME', 'DOSE', 'DATA_APLICADO'),
+    'PET_VACINA': ('ID_PET', 'ID_VAC', 'DATA_APLICADO'),
+    'VETERINARIO': ('CRMV', 'ID_USUARIO', 'SALARIO', 'TURNO'),
+    'CONSULTA': ('ID_PROCEDIMENTO', 'DATA_CONSULTA', 'VALOR', 'ID_PET', 'CRMV'),
+    'PRESCRICAO': ('ID_PRESCRICAO', 'ID_PET', 'CPF_CLIENTE', 'VETERINARIO', 'ID_VETERINARIO',
+                   'DATA_CONSULTA', 'DIAGNOSTICO', 'ORIENTACOES_GERAIS', 'RETORNO', 'STATUS',
+                   'CREATED_AT', 'UPDATED_AT'),
+    'PRESCRICAO_MEDICAMENTO': ('ID_PRESCRICAO', 'ORDEM', 'NOME', 'NOME_NORMALIZADO', 'DOSAGEM',
+                               'FREQUENCIA', 'DURACAO', 'OBSERVACOES'),
+}
+
+_COLUNAS = {tabela: {coluna.upper(): coluna for coluna in colunas} for tabela, colunas in ESQUEMA.items()}
+
+
+class ColunaDesconhecida(ValueError):
+    """Tabela ou coluna fora do ESQUEMA (ex.: campo inválido vindo do cliente)"""
+
+
+def _coluna(tabela, nome):
+    """Nome canônico da coluna (sem diferenciar maiúsculas) ou ColunaDesconhecida"""
+    colunas = _COLUNAS.get(tabela)
+    if colunas is None:
+        raise ColunaDesconhecida(f"Tabela desconhecida: {tabela}")
+    coluna = colunas.get(str(nome).upper())
+    if coluna is None:
+        raise ColunaDesconhecida(f"Coluna desconhecida em {tabela}: {nome}")
+    return coluna
+
+
+def _ordenacao(tabela, order_by):
+    """Valida 'COLUNA [ASC|DESC], ...' contra o esquema"""
+    partes = []
+    for item in order_by.split(','):
+        termos = item.split()
+        if not termos or len(termos) > 2 or (len(termos) == 2 and termos[1].upper() not in ('ASC', 'DESC')):
+            raise ColunaDesconhecida(f"Ordenação inválida: {order_by}")
+        partes.append(' '.join([_coluna(tabela, termos[0])] + [t.upper() for t in termos[1:]]))
+    return ', '.join(partes)
+
+
+@lru_cache(maxsize=512)
+def compilar(operacao, tabela, colunas=(), coluna_id=None, order_by=None, limit=None):
+    """
+    Monta (e memoriza) o statement de um formato de chamada: a mesma
+    operação, tabela e conjunto de colunas reutiliza a string já pronta.
+    Colunas fora do ESQUEMA levantam ColunaDesconhecida.
+    """
+    canonicas = tuple(_coluna(tabela, c) for c in colunas)
+    if coluna_id is not None:
+        coluna_id = _coluna(tabela, coluna_id)
+    
+    if operacao == 'insert':
+        query = f"INSERT INTO {tabela} ({', '.join(canonicas)}) VALUES ({', '.join(['%s'] * len(canonicas))})"
+    elif operacao == 'update':
+        if not canonicas:
+            raise ColunaDesconhecida("Nenhuma coluna para atualizar")
+        query = f"UPDATE {tabela} SET {', '.join(f'{c} = %s' for c in canonicas)} WHERE {coluna_id} = %s"
+    elif operacao == 'delete':
+        query = f"DELETE FROM {tabela} WHERE {coluna_id} = %s"
+    elif operacao == 'select':
+        query = f"SELECT * FROM {tabela}"
+        if coluna_id is not None:
+            query += f" WHERE {coluna_id} = %s"
+        elif canonicas:
+            query += f" WHERE {' AND '.join(f'{c} = %s' for c in canonicas)}"
+        if order_by:
+            query += f" ORDER BY {_ordenacao(tabela, order_by)}"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+    else:
+        raise ValueError(f"Operação desconhecida: {operacao}")
+    return query
+
+
+class Projecao:
+    """
+    SELECT de uma leitura de model com as colunas escolhidas por quem chama.
+    `modelo` tem {colunas} no lugar da lista do SELECT; `expressoes` diz
+    como ler cada coluna da linha (ex.: 'NOME_VET': 'U.NOME_COMPLETO'). O
+    SQL de cada projeção é montado uma vez e reaproveitado; sem projeção,
+    valem todas as colunas de `expressoes`.
+    """
+    
+    __slots__ = ('linha', 'expressoes', 'modelo', '_sqls')
+    
+    def __init__(self, linha, expressoes, modelo):
+        self.linha = linha
+        self.expressoes = expressoes
+        self.modelo = modelo
+        self._sqls = {}
+    
+    def sql(self, colunas=None):
+        colunas = tuple(self.expressoes) if colunas is None else tuple(colunas)
+        sql = self._sqls.get(colunas)
+        if sql is None:
+            desconhecidas = [c for c in colunas if c not in self.expressoes]
+            if desconhecidas or not colunas:
+                raise ColunaDesconhecida(f"Projeção inválida para {self.linha.__name__}: {desconhecidas or colunas}")
+            lista = ', '.join(f"{self.expressoes[c]} AS {c}" for c in colunas)
+            sql = self._sqls[colunas] = self.modelo.replace('{colunas}', lista)
+        return sql
+    
+    def ler(self, params, colunas=None, **opcoes):
+        """execute_query com a projeção, devolvendo objetos de `linha`"""
+        return Database.execute_query(self.sql(colunas), params, linha=self.linha, **opcoes)
+
+
+def _valores(tabela, colunas, valores):
+    """Parâmetros dos helpers: ids em texto viram BINARY(16) nas colunas de COLUNAS_ID"""
+    return tuple(
+        id_binario(valor) if _coluna(tabela, coluna) in COLUNAS_ID else valor
+        for coluna, valor in zip(colunas, valores)
+    )
 
-# Função auxiliar para gerar UUID (usar a function do MySQL)
-def gerar_uuid():
-    """Retorna UUID gerado pela function do MySQL"""
-    result = Database.execute_query("SELECT gera_id_dados_criticos() as uuid", fetch_one=True)
-    return result['uuid'] if result else None
 
 # Funções auxiliares para queries comuns
 def insert_and_get_id(table, data):
     """Insere dados e retorna o ID inserido"""
-    columns = ', '.join(data.keys())
-    placeholders = ', '.join(['%s'] * len(data))
-    query = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
-    
-    result = Database.execute_query(query, tuple(data.values()), commit=True)
+    query = compilar('insert', table, tuple(data))
+    result = Database.execute_query(query, _valores(table, data, data.values()), commit=True)
     return result['last_insert_id']
 
 def update_by_id(table, id_column, id_value, data):
-    """Atualiza registro por ID"""
-    set_clause = ', '.join([f"{k} = %s" for k in data.keys()])
-    query = f"UPDATE {table} SET {set_clause} WHERE {id_column} = %s"
-    params = tuple(data.values()) + (id_value,)
+    """Atualiza registro por ID (só colunas conhecidas; ver ESQUEMA)"""
+    query = compilar('update', table, tuple(data), id_column)
+    params = _valores(table, (*data, id_column), (*data.values(), id_value))
     
     return Database.execute_query(query, params, commit=True)
 
 def delete_by_id(table, id_column, id_value):
     """Deleta registro por ID"""
-    query = f"DELETE FROM {table} WHERE {id_column} = %s"
-    return Database.execute_query(query, (id_value,), commit=True)
+    query = compilar('delete', table, coluna_id=id_column)
+    return Database.execute_query(query, _valores(table, (id_column,), (id_value,)), commit=True)
 
 def find_by_id(table, id_column, id_value):
     """Busca registro por ID"""
-    query = f"SELECT * FROM {table} WHERE {id_column} = %s"
-    return Database.execute_query(query, (id_value,), fetch_one=True)
+    query = compilar('select', table, coluna_id=id_column)
+    return Database.execute_query(query, _valores(table, (id_column,), (id_value,)), fetch_one=True, prepared=True)
 
 def find_all(table, conditions=None, order_by=None, limit=None):
     """Busca todos os registros com filtros opcionais"""
-    query = f"SELECT * FROM {table}"
-    params = []
-    
-    if conditions:
-        where_clause = ' AND '.join([f"{k} = %s" for k in conditions.keys()])
-        query += f" WHERE {where_clause}"
-        params = list(conditions.values())
-    
-    if order_by:
-        query += f" ORDER BY {order_by}"
-    
-    if limit:
-        query += f" LIMIT {limit}"
+    conditions = conditions or {}
+    query = compilar('select', table, tuple(conditions), order_by=order_by, limit=limit)
+    params = _valores(table, conditions, conditions.values())
     
-    return Database.execute_query(query, tuple(params) if params else None, fetch_all=True)
+    return Database.execute_query(query, params or None, fetch_all=True)
@@ -0,0 +1,73 @@
+"""
+AsyncDatabase - API assíncrona do Database para as rotas do modo ASGI
+
+As operações rodam no Database síncrono (pool, réplicas, shards, disjuntor,
+cache e prazos continuam valendo) em um executor de threads limitado a
+ASYNC_DB_THREADS. O event loop mantém quantas requisições forem preciso em
+andamento; só as que estão de fato falando com o banco ocupam uma thread,
+e nunca mais threads do que conexões no pool.
+
+Cada chamada roda com uma cópia do contexto de quem a fez, então a clínica
+(usar_clinica), a classe de pool (usar_pool) e o prazo da requisição
+(app.prazo) são os da tarefa assíncrona.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import Config
+from app.database import Database
+
+
+class AsyncDatabase:
+    """Fachada assíncrona: mesmos métodos e retornos do Database"""
+
+    _executor = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _obter_executor(cls):
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=Config.ASYNC_DB_THREADS, thread_name_prefix='db-async'
+                    )
+        return cls._executor
+
+    @classmethod
+    async def executar(cls, funcao, *args, **kwargs):
+        """
+        Executa qualquer função síncrona de acesso ao banco (ex.: um método
+        de model) no executor, sem bloquear o event loop
+        """
+        contexto = contextvars.copy_context()
+        chamada = functools.partial(contexto.run, funcao, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(cls._obter_executor(), chamada)
+
+    @classmethod
+    async def execute_query(cls, query, params=None, fetch_one=False, fetch_all=False, commit=False,
+                            prepared=False, cache=False, linha=None):
+        """Versão assíncrona de Database.execute_query"""
+        return await cls.executar(
+            Database.execute_query, query, params, fetch_one=fetch_one, fetch_all=fetch_all,
+            commit=commit, prepared=prepared, cache=cache, linha=linha
+        )
+
+    @classmethod
+    async def call_procedure(cls, procedure_name, args=None):
+        """Versão assíncrona de Database.call_procedure"""
+        return await cls.executar(Database.call_procedure, procedure_name, args)
+
+    @classmethod
+    async def execute_transaction(cls, queries):
+        """Versão assíncrona de Database.execute_transaction"""
+        return await cls.executar(Database.execute_transaction, queries)
+
+    @classmethod
+    async def execute_many(cls, query, params_list):
+        """Versão assíncrona de Database.execute_many"""
+        return await cls.executar(Database.execute_many, query, params_list)
@@ -0,0 +1,161 @@
+"""
+Fila de escrita (write-behind) - agrupa INSERTs/UPDATEs compatíveis em lotes
+
+Usada por Database.enfileirar_escrita quando WRITE_BEHIND_ENABLED está
+ligado. Escritas com o mesmo SQL e o mesmo destino (clínica e classe de
+pool de quem as enfileirou) que chegam dentro da janela viram um único
+executemany (INSERT de várias linhas no MySQL) e um único commit. Cada
+chamador fica bloqueado até o commit do lote que contém a sua escrita:
+nada é confirmado antes de estar no banco, então uma queda do processo não
+perde escritas já respondidas.
+
+Só devem passar pela fila escritas independentes entre si: lotes de SQLs
+diferentes podem ser gravados em qualquer ordem.
+"""
+
+import os
+import threading
+import time
+import logging
+
+from mysql.connector.errors import DataError, IntegrityError
+
+from app.prazo import PrazoEsgotado
+
+logger = logging.getLogger(__name__)
+
+
+class _Pendente:
+    """Escrita aguardando o próximo lote"""
+
+    __slots__ = ('query', 'params', 'destino', 'evento', 'resultado', 'erro')
+
+    def __init__(self, query, params, destino):
+        self.query = query
+        self.params = params
+        self.destino = destino
+        self.evento = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+class FilaEscrita:
+    """Coalesce escritas em lotes gravados por uma thread escritora"""
+
+    def __init__(self, executar_lote, max_lote, janela):
+        """
+        Args:
+            executar_lote: função (query, lista de params, destino) -> dict
+                com 'affected_rows' e 'last_insert_id' (Database.execute_many)
+            max_lote (int): grava assim que um SQL acumula max_lote escritas
+            janela (float): espera máxima (s) por outras escritas do lote
+        """
+        self._executar_lote = executar_lote
+        self.max_lote = max_lote
+        self.janela = janela
+        self._cond = threading.Condition()
+        self._fila = []
+        self._escritor = None
+        self._escritor_pid = None
+        self.estatisticas = {'escritas': 0, 'lotes': 0, 'reexecutadas': 0}
+
+    def submeter(self, query, params, destino=None, timeout=None):
+        """
+        Enfileira uma escrita e aguarda o commit do lote que a contém.
+        Retorna {'affected_rows', 'last_insert_id'} como execute_query(commit=True);
+        em UPDATE/DELETE, affected_rows é o total do lote.
+        
+        Passados `timeout` segundos (o restante do prazo da requisição)
+        levanta PrazoEsgotado: a escrita sai da fila se ainda não estiver
+        em um lote; se já estiver sendo gravada, pode ter sido confirmada.
+        """
+        pendente = _Pendente(query, params, destino)
+        with self._cond:
+            if self._escritor is None or self._escritor_pid != os.getpid():
+                self._escritor = threading.Thread(
+                    target=self._loop_escritor, name='escritor-write-behind', daemon=True
+                )
+                self._escritor_pid = os.getpid()
+                self._escritor.start()
+            self._fila.append(pendente)
+            self._cond.notify_all()
+        if not pendente.evento.wait(None if timeout is None else max(timeout, 0)):
+            with self._cond:
+                retirada = pendente in self._fila
+                if retirada:
+                    self._fila.remove(pendente)
+            if retirada:
+                raise PrazoEsgotado("Prazo da requisição esgotado na fila de escrita")
+            raise PrazoEsgotado("Prazo da requisição esgotado durante a gravação do lote (a escrita pode ter sido gravada)")
+        if pendente.erro:
+            raise pendente.erro
+        return pendente.resultado
+
+    def _maior_grupo(self):
+        contagem = {}
+        for pendente in self._fila:
+            chave = (pendente.query, pendente.destino)
+            contagem[chave] = contagem.get(chave, 0) + 1
+        return max(contagem.values())
+
+    def _loop_escritor(self):
+        while True:
+            with self._cond:
+                while not self._fila:
+                    self._cond.wait()
+                # Aguarda a janela para que escritas concorrentes entrem no lote
+                limite = time.monotonic() + self.janela
+                while self._maior_grupo() < self.max_lote:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._cond.wait(restante)
+                pendentes = self._fila
+                self._fila = []
+
+            grupos = {}
+            for pendente in pendentes:
+                grupos.setdefault((pendente.query, pendente.destino), []).append(pendente)
+            for grupo in grupos.values():
+                for inicio in range(0, len(grupo), self.max_lote):
+                    self._gravar(grupo[inicio:inicio + self.max_lote])
+
+    def _gravar(self, lote):
+        try:
+            self._commit(lote)
+        except (IntegrityError, DataError) as e:
+            if len(lote) == 1:
+                lote[0].erro = e
+            else:
+                # Uma linha inválida desfaz o lote inteiro: grava uma a uma
+                # para que só o seu chamador receba o erro
+                self.estatisticas['reexecutadas'] += 1
+                for pendente in lote:
+                    self._gravar([pendente])
+        except Exception as e:
+            logger.error(f"Erro ao gravar lote de escritas: {e}")
+            for pendente in lote:
+                pendente.erro = e
+        finally:
+            for pendente in lote:
+                pendente.evento.set()
+
+    def _commit(self, lote):
+        resultado = self._executar_lote(lote[0].query, [pendente.params for pendente in lote], lote[0].destino)
+        # INSERT de várias linhas: o InnoDB (e o SQLite, sob a trava de
+        # escrita) gera os ids em sequência a partir de last_insert_id, com
+        # passo auto_increment_increment (1, salvo em multi-primário)
+        primeiro_id = resultado.get('last_insert_id')
+        passo = resultado.get('incremento_id', 1)
+        for i, pendente in enumerate(lote):
+            pendente.resultado = {
+                'affected_rows': 1 if primeiro_id else resultado['affected_rows'],
+                'last_insert_id': primeiro_id + i * passo if primeiro_id else None
+            }
+        self.estatisticas['escritas'] += len(lote)
+        self.estatisticas['lotes'] += 1
+
+    def status(self):
+        with self._cond:
+            pendentes = len(self._fila)
+        return {'pendentes': pendentes, **self.estatisticas}
@@ -0,0 +1,85 @@
+"""
+Identificadores - UUIDs ordenados por tempo gerados na aplicação
+
+As chaves GRUPO_USUARIO.ID_ACESSO, USUARIO.ID_USUARIO e
+CONSULTA.ID_PROCEDIMENTO (e as colunas que as referenciam) são UUIDs
+versão 7 gravados como BINARY(16). Os 48 bits iniciais são o instante em
+milissegundos: o InnoDB agrupa a tabela pela chave primária, então ids
+novos entram no fim do índice em vez de páginas aleatórias, e cada chave
+ocupa 16 bytes (e não 36) na tabela, nos índices secundários e em quem a
+referencia. O id é gerado aqui, sem o SELECT gera_id_dados_criticos().
+
+Na aplicação, nos tokens e na API os ids continuam em texto
+('0190f3c2-...'): os models passam id_binario(...) nos parâmetros e o
+Database converte de volta para texto as colunas de COLUNAS_ID das linhas
+lidas (ids_para_texto).
+"""
+
+import os
+import threading
+import time
+import uuid
+
+# Colunas com ids BINARY(16), convertidas para texto nas linhas lidas
+COLUNAS_ID = frozenset({'ID_ACESSO', 'ID_USUARIO', 'GRUPO_USUARIO', 'ID_PROCEDIMENTO', 'ID_VETERINARIO'})
+
+_lock = threading.Lock()
+_ultimo_ms = 0
+_sequencia = 0
+
+
+def novo_id():
+    """
+    Novo UUID v7 (uuid.UUID): .bytes para o banco, str() para a API.
+    Ids gerados pelo processo são estritamente crescentes: no mesmo
+    milissegundo (ou se o relógio voltar) um contador de 12 bits desempata.
+    """
+    global _ultimo_ms, _sequencia
+    with _lock:
+        agora = time.time_ns() // 1_000_000
+        if agora > _ultimo_ms:
+            _ultimo_ms = agora
+            # Começa na metade inferior: sobra espaço para o contador
+            _sequencia = int.from_bytes(os.urandom(2), 'big') & 0x7FF
+        else:
+            _sequencia += 1
+            if _sequencia > 0xFFF:
+                _ultimo_ms += 1
+                _sequencia = 0
+        ms, sequencia = _ultimo_ms, _sequencia
+
+    aleatorio = int.from_bytes(os.urandom(8), 'big') & 0x3FFF_FFFF_FFFF_FFFF
+    valor = (ms & 0xFFFF_FFFF_FFFF) << 80 | 0x7 << 76 | sequencia << 64 | 0b10 << 62 | aleatorio
+    return uuid.UUID(int=valor)
+
+
+def id_binario(valor):
+    """
+    Id em texto (ou uuid.UUID) -> 16 bytes para parâmetros de query.
+    None e bytes passam direto; texto que não é UUID levanta ValueError.
+    """
+    if valor is None or isinstance(valor, (bytes, bytearray)):
+        return valor
+    if isinstance(valor, uuid.UUID):
+        return valor.bytes
+    return uuid.UUID(str(valor)).bytes
+
+
+def id_texto(valor):
+    """16 bytes lidos do banco -> id em texto (outros valores passam direto)"""
+    if isinstance(valor, (bytes, bytearray)) and len(valor) == 16:
+        return str(uuid.UUID(bytes=bytes(valor)))
+    return valor
+
+
+def ids_para_texto(resultado):
+    """Converte, no lugar, as colunas de COLUNAS_ID de uma linha ou lista de linhas"""
+    linhas = resultado if isinstance(resultado, list) else [resultado]
+    if not linhas or not isinstance(linhas[0], dict):
+        return resultado
+    colunas = COLUNAS_ID.intersection(linhas[0])
+    if colunas:
+        for linha in linhas:
+            for coluna in colunas:
+                linha[coluna] = id_texto(linha[coluna])
+    return resultado
@@ -0,0 +1,90 @@
+"""
+Linhas - objetos de linha com __slots__ para as leituras dos models
+
+As leituras de Pet, Consulta, Vacina, Cliente e Veterinario devolvem, em
+vez de um dict por linha (cursor(dictionary=True)), objetos de uma
+subclasse de Linha montados direto da tupla do cursor: um atributo por
+coluna, sem o dict de cada linha e as suas chaves.
+
+Cada leitura recebe uma projeção (tupla de colunas, ver Projecao em
+app/database.py): só essas colunas vão para o SELECT e só elas são
+preenchidas. Ler uma coluna fora da projeção levanta AttributeError, em
+vez de devolver o valor de outra tabela (como com C.* e V.* no mesmo
+SELECT, em que colunas de mesmo nome se sobrescreviam).
+
+As linhas são imutáveis: o cache de resultados as compartilha sem cópia.
+"""
+
+import sys
+from functools import lru_cache
+
+from app.identificadores import COLUNAS_ID, id_texto
+
+
+class Linha:
+    """Base das linhas: as subclasses declaram as colunas em __slots__"""
+
+    __slots__ = ()
+
+    @classmethod
+    def construtor(cls, colunas):
+        """Função que monta uma linha a partir de uma tupla do cursor com estas colunas"""
+        return _construtor(cls, tuple(colunas))
+
+    def colunas(self):
+        """Colunas preenchidas (as da projeção da leitura)"""
+        return tuple(coluna for coluna in self.__slots__ if hasattr(self, coluna))
+
+    def como_dict(self):
+        """Colunas preenchidas em um dict (ex.: para jsonify)"""
+        return {coluna: getattr(self, coluna) for coluna in self.colunas()}
+
+    def com(self, **valores):
+        """Cópia da linha com colunas a mais ou alteradas (ex.: CLINICA)"""
+        dados = self.como_dict()
+        dados.update(valores)
+        return _construtor(type(self), tuple(dados))(tuple(dados.values()))
+
+    def tamanho(self):
+        """Memória (bytes) da linha e dos seus valores, para o cache de resultados"""
+        return sys.getsizeof(self) + sum(sys.getsizeof(getattr(self, c)) for c in self.colunas())
+
+    def __setattr__(self, nome, valor):
+        raise AttributeError(f"{type(self).__name__} é imutável")
+
+    def __delattr__(self, nome):
+        raise AttributeError(f"{type(self).__name__} é imutável")
+
+    def __eq__(self, outra):
+        return type(self) is type(outra) and self.como_dict() == outra.como_dict()
+
+    __hash__ = None
+
+    def __repr__(self):
+        valores = ', '.join(f"{coluna}={getattr(self, coluna)!r}" for coluna in self.colunas())
+        return f"{type(self).__name__}({valores})"
+
+
+@lru_cache(maxsize=512)
+def _construtor(classe, colunas):
+    # Descritores dos slots: preenchem a linha sem passar pelo __setattr__
+    definir = []
+    for coluna in colunas:
+        if coluna not in classe.__slots__:
+            raise AttributeError(f"{classe.__name__} não tem a coluna {coluna}")
+        definir.append(getattr(classe, coluna).__set__)
+    # Ids BINARY(16) voltam em texto (ver app/identificadores.py)
+    ids = [i for i, coluna in enumerate(colunas) if coluna in COLUNAS_ID]
+    nova = object.__new__
+
+    def construir(valores):
+        if ids:
+            valores = list(valores)
+            for i in ids:
+                valores[i] = id_texto(valores[i])
+        linha = nova(classe)
+        for definir_coluna, valor in zip(definir, valores):
+            definir_coluna(linha, valor)
+        return linha
+
+    return construir
@@ -0,0 +1,281 @@
+"""
+Migrações - mudanças de esquema versionadas, aplicadas só para frente
+
+O database.sql cria bancos novos já na versão mais recente. Bancos
+existentes recebem as mudanças pelas migrações abaixo (migrar_schema.py),
+na ordem da versão; a tabela SCHEMA_VERSAO guarda as já aplicadas.
+
+Regras para uma nova migração:
+- só para frente: nada de desfazer; corrigir é uma nova versão
+- um único comando DDL (ou um único INSERT ... SELECT, para copiar dados)
+  por migração, para que ela seja atômica também no MySQL (onde DDL faz
+  commit implícito). No SQLite o DDL é transacional: a migração pode ser
+  uma lista de comandos (ex.: DROP VIEW + CREATE VIEW, sem OR REPLACE)
+- no MySQL, ALGORITHM=INPLACE, LOCK=NONE: o índice é criado com a tabela
+  aceitando leituras e escritas, e a migração falha em vez de bloquear a
+  tabela se o servidor não conseguir fazê-la online. Mudanças que só
+  existem copiando a tabela (ex.: particionar) dizem isso na descrição
+- `aplicada` diz se o esquema já tem a mudança (banco criado por um
+  database.sql mais novo); nesse caso a versão só é registrada. Migrações
+  que podem ser repetidas sem efeito (IF NOT EXISTS, INSERT IGNORE, view
+  recriada) usam `nunca`
+- DDL None: a mudança não existe naquele backend (ex.: partições, só no
+  MySQL) e a versão só é registrada
+"""
+
+import logging
+from datetime import date
+
+from app import arquivo_consultas
+from app.database import Database
+
+logger = logging.getLogger(__name__)
+
+SQL_TABELA_VERSAO = """
+    CREATE TABLE IF NOT EXISTS SCHEMA_VERSAO(
+        VERSAO INT PRIMARY KEY NOT NULL,
+        DESCRICAO VARCHAR(250) NOT NULL,
+        APLICADA_EM DATETIME NOT NULL
+    )
+"""
+
+# Espera máxima (s) pelo metadata lock da tabela: com uma transação longa
+# aberta, a migração desiste em vez de enfileirar as consultas atrás dela
+LOCK_WAIT_MIGRACAO = 10
+
+
+def indice_existe(tabela, indice):
+    indices = Database.execute_query(Database.backend().sql_indices(), (tabela,), fetch_all=True)
+    return any(linha['NOME'] == indice for linha in indices)
+
+
+def fk_existe(tabela, fk):
+    """Só no MySQL (o SQLite não dá nome às FKs)"""
+    return Database.execute_query("""
+        SELECT 1 AS EXISTE FROM information_schema.TABLE_CONSTRAINTS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND CONSTRAINT_NAME = %s
+        AND CONSTRAINT_TYPE = 'FOREIGN KEY'
+    """, (tabela, fk), fetch_one=True) is not None
+
+
+def sem_rowid(tabela):
+    """Só no SQLite: a tabela foi criada WITHOUT ROWID"""
+    linha = Database.execute_query(
+        "SELECT sql AS DDL FROM sqlite_master WHERE type = 'table' AND name = %s", (tabela,), fetch_one=True
+    )
+    return linha is not None and 'WITHOUT ROWID' in linha['DDL'].upper()
+
+
+def nunca():
+    return False
+
+
+class Migracao:
+    """Uma versão do esquema: o DDL de cada backend e como reconhecê-la já aplicada"""
+
+    __slots__ = ('versao', 'descricao', 'ddl', 'aplicada')
+
+    def __init__(self, versao, descricao, mysql, sqlite, aplicada):
+        self.versao = versao
+        self.descricao = descricao
+        self.ddl = {'mysql': mysql, 'sqlite': sqlite}
+        self.aplicada = aplicada
+
+
+MIGRACOES = [
+    Migracao(
+        1, 'Índice de VETERINARIO.ID_USUARIO (login e agendamento do veterinário)',
+        mysql="ALTER TABLE VETERINARIO ADD INDEX IDX_VETERINARIO_USUARIO (ID_USUARIO), "
+              "ALGORITHM=INPLACE, LOCK=NONE",
+        sqlite="CREATE INDEX IDX_VETERINARIO_USUARIO ON VETERINARIO(ID_USUARIO)",
+        aplicada=lambda: indice_existe('VETERINARIO', 'IDX_VETERINARIO_USUARIO')
+    ),
+    Migracao(
+        2, 'Índice de CONSULTA(CRMV, DATA_CONSULTA) (agenda do dia do veterinário)',
+        mysql="ALTER TABLE CONSULTA ADD INDEX IDX_CONSULTA_CRMV_DATA (CRMV, DATA_CONSULTA), "
+              "ALGORITHM=INPLACE, LOCK=NONE",
+        sqlite="CREATE INDEX IDX_CONSULTA_CRMV_DATA ON CONSULTA(CRMV, DATA_CONSULTA)",
+        aplicada=lambda: indice_existe('CONSULTA', 'IDX_CONSULTA_CRMV_DATA')
+    ),
+    Migracao(
+        3, 'Índice único de USUARIO.EMAIL (falha se houver emails repetidos: remova-os antes)',
+        mysql="ALTER TABLE USUARIO ADD UNIQUE INDEX UK_USUARIO_EMAIL (EMAIL), ALGORITHM=INPLACE, LOCK=NONE",
+        sqlite="CREATE UNIQUE INDEX UK_USUARIO_EMAIL ON USUARIO(EMAIL)",
+        aplicada=lambda: indice_existe('USUARIO', 'UK_USUARIO_EMAIL')
+    ),
+    Migracao(
+        4, 'Remove IDX_USUARIO_EMAIL (substituído por UK_USUARIO_EMAIL)',
+        mysql="ALTER TABLE USUARIO DROP INDEX IDX_USUARIO_EMAIL, ALGORITHM=INPLACE, LOCK=NONE",
+        sqlite="DROP INDEX IDX_USUARIO_EMAIL",
+        aplicada=lambda: not indice_existe('USUARIO', 'IDX_USUARIO_EMAIL')
+    ),
+    Migracao(
+        5, 'Índice de CLIENTE.ID_PET (tutor do pet)',
+        mysql="ALTER TABLE CLIENTE ADD INDEX IDX_CLIENTE_PET (ID_PET), ALGORITHM=INPLACE, LOCK=NONE",
+        sqlite="CREATE INDEX IDX_CLIENTE_PET ON CLIENTE(ID_PET)",
+        # No MySQL a FK_ID_PET já criou um índice em ID_PET
+        aplicada=lambda: indice_existe('CLIENTE', 'IDX_CLIENTE_PET') or indice_existe('CLIENTE', 'FK_ID_PET')
+    ),
+    Migracao(
+        6, 'Tabela PET_VACINA (vacinas aplicadas em cada pet)',
+        # Tabela nova: criada já com o índice do histórico e as FKs
+        mysql="""
+            CREATE TABLE IF NOT EXISTS PET_VACINA(
+                ID_PET INT NOT NULL,
+                ID_VAC INT NOT NULL,
+                DATA_APLICADO DATE,
+                PRIMARY KEY (ID_PET, ID_VAC),
+                INDEX IDX_PET_VACINA_DATA (ID_PET, DATA_APLICADO),
+                CONSTRAINT FK_PET_VACINA_PET FOREIGN KEY (ID_PET) REFERENCES PET(ID_PET),
+                CONSTRAINT FK_PET_VACINA_VACINA FOREIGN KEY (ID_VAC) REFERENCES VACINAS(ID_VAC)
+                    ON DELETE CASCADE
+            )
+        """,
+        sqlite="""
+            CREATE TABLE IF NOT EXISTS PET_VACINA(
+                ID_PET INT NOT NULL REFERENCES PET(ID_PET),
+                ID_VAC INT NOT NULL REFERENCES VACINAS(ID_VAC) ON DELETE CASCADE,
+                DATA_APLICADO DATE,
+                PRIMARY KEY (ID_PET, ID_VAC)
+            )
+        """,
+        aplicada=nunca
+    ),
+    Migracao(
+        7, 'Índice de PET_VACINA(ID_PET, DATA_APLICADO) (histórico de vacinas do pet)',
+        mysql="ALTER TABLE PET_VACINA ADD INDEX IDX_PET_VACINA_DATA (ID_PET, DATA_APLICADO), "
+              "ALGORITHM=INPLACE, LOCK=NONE",
+        sqlite="CREATE INDEX IDX_PET_VACINA_DATA ON PET_VACINA(ID_PET, DATA_APLICADO)",
+        aplicada=lambda: indice_existe('PET_VACINA', 'IDX_PET_VACINA_DATA')
+    ),
+    Migracao(
+        8, 'Copia a vacina de PET.ID_VACINAS para PET_VACINA',
+        mysql="""
+            INSERT IGNORE INTO PET_VACINA (ID_PET, ID_VAC, DATA_APLICADO)
+            SELECT P.ID_PET, V.ID_VAC, V.DATA_APLICADO
+            FROM PET P INNER JOIN VACINAS V ON V.ID_VAC = P.ID_VACINAS
+        """,
+        sqlite="""
+            INSERT OR IGNORE INTO PET_VACINA (ID_PET, ID_VAC, DATA_APLICADO)
+            SELECT P.ID_PET, V.ID_VAC, V.DATA_APLICADO
+            FROM PET P INNER JOIN VACINAS V ON V.ID_VAC = P.ID_VACINAS
+        """,
+        aplicada=nunca
+    ),
+    Migracao(
+        9, 'View HISTORICO_VACINA lê PET_VACINA',
+        mysql="""
+            CREATE OR REPLACE VIEW HISTORICO_VACINA AS
+            SELECT PV.ID_PET, V.NOME, V.DOSE, PV.DATA_APLICADO
+            FROM PET_VACINA PV INNER JOIN VACINAS V ON V.ID_VAC = PV.ID_VAC
+        """,
+        sqlite=[
+            "DROP VIEW IF EXISTS HISTORICO_VACINA",
+            """
+            CREATE VIEW HISTORICO_VACINA AS
+            SELECT PV.ID_PET, V.NOME, V.DOSE, PV.DATA_APLICADO
+            FROM PET_VACINA PV INNER JOIN VACINAS V ON V.ID_VAC = PV.ID_VAC
+            """,
+        ],
+        aplicada=nunca
+    ),
+    Migracao(
+        10, 'Índice de CONSULTA(ID_PET, DATA_CONSULTA) (consultas do pet, já na ordem da data)',
+        mysql="ALTER TABLE CONSULTA ADD INDEX IDX_CONSULTA_PET_DATA (ID_PET, DATA_CONSULTA), "
+              "ALGORITHM=INPLACE, LOCK=NONE",
+        sqlite="CREATE INDEX IDX_CONSULTA_PET_DATA ON CONSULTA(ID_PET, DATA_CONSULTA)",
+        aplicada=lambda: indice_existe('CONSULTA', 'IDX_CONSULTA_PET_DATA')
+    ),
+    Migracao(
+        11, 'Remove as FKs de CONSULTA (o MySQL não particiona tabelas com FK; Consulta.create valida)',
+        mysql="ALTER TABLE CONSULTA DROP FOREIGN KEY FK_CONSULTA_PET, DROP FOREIGN KEY FK_CRMV, "
+              "ALGORITHM=INPLACE, LOCK=NONE",
+        sqlite=None,
+        aplicada=lambda: not fk_existe('CONSULTA', 'FK_CONSULTA_PET')
+    ),
+    Migracao(
+        12, 'Remove os índices das antigas FKs de CONSULTA (cobertos por IDX_CONSULTA_PET_DATA e IDX_CONSULTA_CRMV_DATA)',
+        mysql="ALTER TABLE CONSULTA DROP INDEX FK_CONSULTA_PET, DROP INDEX FK_CRMV, ALGORITHM=INPLACE, LOCK=NONE",
+        sqlite=None,
+        aplicada=lambda: not indice_existe('CONSULTA', 'FK_CONSULTA_PET')
+    ),
+    Migracao(
+        13, 'Particiona CONSULTA por ano de DATA_CONSULTA (copia a tabela, bloqueando escritas: '
+            'rode fora do horário de atendimento e sem DATA_CONSULTA nula)',
+        # Toda chave única de tabela particionada inclui a coluna da partição
+        mysql=f"""
+            ALTER TABLE CONSULTA
+                MODIFY DATA_CONSULTA DATE NOT NULL,
+                DROP PRIMARY KEY, ADD PRIMARY KEY (ID_PROCEDIMENTO, DATA_CONSULTA),
+                ALGORITHM=COPY, LOCK=SHARED
+            PARTITION BY RANGE COLUMNS(DATA_CONSULTA) (
+                {arquivo_consultas.particoes_sql(arquivo_consultas.inicio_quente().year - 1, date.today().year + 1)}
+            )
+        """,
+        sqlite=None,
+        aplicada=arquivo_consultas.consulta_particionada
+    ),
+    Migracao(
+        14, 'Recria PET_VACINA sem rowid no SQLite (LAST_INSERT_ID() de Vacina.registrar_lote)',
+        # No MySQL PET_VACINA não tem AUTO_INCREMENT: LAST_INSERT_ID() já não muda
+        mysql=None,
+        sqlite=[
+            "DROP VIEW IF EXISTS HISTORICO_VACINA",
+            """
+            CREATE TABLE PET_VACINA_NOVA(
+                ID_PET INT NOT NULL REFERENCES PET(ID_PET),
+                ID_VAC INT NOT NULL REFERENCES VACINAS(ID_VAC) ON DELETE CASCADE,
+                DATA_APLICADO DATE,
+                PRIMARY KEY (ID_PET, ID_VAC)
+            ) WITHOUT ROWID
+            """,
+            "INSERT INTO PET_VACINA_NOVA (ID_PET, ID_VAC, DATA_APLICADO) "
+            "SELECT ID_PET, ID_VAC, DATA_APLICADO FROM PET_VACINA",
+            "DROP TABLE PET_VACINA",
+            "ALTER TABLE PET_VACINA_NOVA RENAME TO PET_VACINA",
+            "CREATE INDEX IDX_PET_VACINA_DATA ON PET_VACINA(ID_PET, DATA_APLICADO)",
+            """
+            CREATE VIEW HISTORICO_VACINA AS
+            SELECT PV.ID_PET, V.NOME, V.DOSE, PV.DATA_APLICADO
+            FROM PET_VACINA PV INNER JOIN VACINAS V ON V.ID_VAC = PV.ID_VAC
+            """,
+        ],
+        aplicada=lambda: sem_rowid('PET_VACINA')
+    ),
+]
+
+
+def versoes_aplicadas():
+    """Versões registradas em SCHEMA_VERSAO do banco (clínica) atual"""
+    Database.execute_query(SQL_TABELA_VERSAO, commit=True)
+    linhas = Database.execute_query("SELECT VERSAO FROM SCHEMA_VERSAO", fetch_all=True)
+    return {linha['VERSAO'] for linha in linhas}
+
+
+def pendentes():
+    """Migrações ainda não registradas, em ordem de versão"""
+    aplicadas = versoes_aplicadas()
+    return [m for m in sorted(MIGRACOES, key=lambda m: m.versao) if m.versao not in aplicadas]
+
+
+def aplicar(migracao):
+    """
+    Aplica uma migração (se o esquema ainda não a tiver) e registra a versão.
+    Retorna True se o DDL foi executado, False se a versão só foi registrada.
+    """
+    backend = Database.backend()
+    ddl = migracao.ddl[backend.nome]
+    executada = ddl is not None and not migracao.aplicada()
+    if executada:
+        logger.info(f"Aplicando migração {migracao.versao}: {migracao.descricao}")
+        queries = [{'query': comando} for comando in ([ddl] if isinstance(ddl, str) else ddl)]
+        if backend.nome == 'mysql':
+            # O pool reseta a sessão na devolução (SET altera a sessão)
+            queries.insert(0, {'query': f"SET SESSION lock_wait_timeout = {LOCK_WAIT_MIGRACAO}"})
+        Database.execute_transaction(queries)
+    Database.execute_query(
+        "INSERT INTO SCHEMA_VERSAO (VERSAO, DESCRICAO, APLICADA_EM) VALUES (%s, %s, NOW())",
+        (migracao.versao, migracao.descricao), commit=True
+    )
+    return executada
+
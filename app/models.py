@@ -2,8 +2,63 @@
 Models - Classes de modelo para as tabelas do banco de dados petCare
 """
 
-from app.database import Database, gerar_uuid, find_by_id, find_all, insert_and_get_id, update_by_id, delete_by_id
+from app import arquivo_consultas
+from app.config import Config
+from app.identificadores import novo_id, id_binario
+from app.database import Database, Projecao, find_by_id, find_all, insert_and_get_id, update_by_id, delete_by_id
+from app.linhas import Linha
+from app.referencia import Catalogo
 from datetime import datetime
+from mysql.connector.errors import IntegrityError
+import unicodedata
+
+class RegistroDuplicado(ValueError):
+    """Email, CPF ou CRMV já cadastrado (violação de chave única no cadastro)"""
+
+    def __init__(self, campo):
+        super().__init__(f"{campo} já cadastrado")
+        self.campo = campo
+
+
+def _inserir_usuario(nome_completo, email, senha, grupo_usuario_id):
+    """
+    Query de INSERT do usuário para execute_transaction e o seu id
+    (uuid.UUID; ver app/identificadores.py)
+    """
+    usuario_id = novo_id()
+    return usuario_id, {
+        'query': """
+            INSERT INTO USUARIO (ID_USUARIO, NOME_COMPLETO, EMAIL, SENHA, GRUPO_USUARIO)
+            VALUES (%s, %s, %s, %s, %s)
+        """,
+        'params': (usuario_id.bytes, nome_completo, email, senha, id_binario(grupo_usuario_id))
+    }
+
+
+def _cadastrar(queries, campo_chave):
+    """
+    Executa o cadastro em uma transação. A chave única violada (UK_USUARIO_EMAIL,
+    CPF do cliente ou CRMV) vira RegistroDuplicado; campo_chave é o campo da
+    outra chave única da tabela do cadastro
+    """
+    try:
+        return Database.execute_transaction(queries)
+    except IntegrityError as e:
+        if e.errno != 1062:
+            raise
+        # MySQL: "... for key 'USUARIO.UK_USUARIO_EMAIL'"; SQLite: "... USUARIO.EMAIL"
+        mensagem = str(e).upper()
+        email = 'UK_USUARIO_EMAIL' in mensagem or 'USUARIO.EMAIL' in mensagem
+        raise RegistroDuplicado('Email' if email else campo_chave) from e
+
+
+class VacinacaoInvalida(ValueError):
+    """Lote de vacinação com um pet que não existe"""
+
+
+def _colunas(alias, *colunas):
+    """Expressões de uma Projecao para colunas lidas com o próprio nome (ex.: P.NOME)"""
+    return {coluna: f"{alias}.{coluna}" for coluna in colunas}
 
 # ========== GRUPO_USUARIO ==========
 
@@ -14,16 +69,22 @@ class GrupoUsuario:
     TIPO_VET = 'Veterinario'
     TIPO_CLIENTE = 'Cliente'
     
+    # Três linhas que não mudam: carregadas na inicialização (app/referencia.py)
+    _CATALOGO = Catalogo(
+        'grupos_usuario',
+        lambda: Database.execute_query("SELECT * FROM GRUPO_USUARIO", fetch_all=True),
+        chave='TIPO_ACESSO', tabelas=('GRUPO_USUARIO',)
+    )
+    
     @staticmethod
     def find_by_tipo(tipo_acesso):
-        """Busca grupo de usuário por tipo"""
-        query = "SELECT * FROM GRUPO_USUARIO WHERE TIPO_ACESSO = %s"
-        return Database.execute_query(query, (tipo_acesso,), fetch_one=True)
+        """Busca grupo de usuário por tipo (da memória)"""
+        return GrupoUsuario._CATALOGO.buscar(tipo_acesso)
     
     @staticmethod
     def get_all():
-        """Retorna todos os grupos de usuário"""
-        return find_all('GRUPO_USUARIO')
+        """Retorna todos os grupos de usuário (da memória)"""
+        return GrupoUsuario._CATALOGO.linhas()
 
 # ========== USUARIO ==========
 
@@ -36,24 +97,25 @@ class Usuario:
         Cria um novo usuário
         O trigger hash_senha automaticamente faz o hash da senha
         """
-        usuario_id = gerar_uuid()
+        usuario_id = novo_id()
         query = """
             INSERT INTO USUARIO (ID_USUARIO, NOME_COMPLETO, EMAIL, SENHA, GRUPO_USUARIO)
             VALUES (%s, %s, %s, %s, %s)
         """
-        Database.execute_query(query, (usuario_id, nome_completo, email, senha, grupo_usuario_id), commit=True)
-        return usuario_id
+        Database.execute_query(query, (usuario_id.bytes, nome_completo, email, senha,
+                                       id_binario(grupo_usuario_id)), commit=True)
+        return str(usuario_id)
     
     @staticmethod
     def find_by_email(email):
-        """Busca usuário por email (usa index USUARIO_EMAIL)"""
+        """Busca usuário por email (usa o índice único UK_USUARIO_EMAIL)"""
         query = """
             SELECT U.*, G.TIPO_ACESSO, G.ROLE_MYSQL
             FROM USUARIO U
             INNER JOIN GRUPO_USUARIO G ON U.GRUPO_USUARIO = G.ID_ACESSO
             WHERE U.EMAIL = %s
         """
-        return Database.execute_query(query, (email,), fetch_one=True)
+        return Database.execute_query(query, (email,), fetch_one=True, prepared=True)
     
     @staticmethod
     def find_by_id(usuario_id):
@@ -64,7 +126,7 @@ class Usuario:
             INNER JOIN GRUPO_USUARIO G ON U.GRUPO_USUARIO = G.ID_ACESSO
             WHERE U.ID_USUARIO = %s
         """
-        return Database.execute_query(query, (usuario_id,), fetch_one=True)
+        return Database.execute_query(query, (id_binario(usuario_id),), fetch_one=True, prepared=True)
     
     @staticmethod
     def authenticate(email, senha):
@@ -77,7 +139,7 @@ class Usuario:
             INNER JOIN GRUPO_USUARIO G ON U.GRUPO_USUARIO = G.ID_ACESSO
             WHERE U.EMAIL = %s AND U.SENHA = SHA2(%s, 256)
         """
-        return Database.execute_query(query, (email, senha), fetch_one=True)
+        return Database.execute_query(query, (email, senha), fetch_one=True, prepared=True)
     
     @staticmethod
     def update_password(email, nova_senha):
@@ -92,14 +154,32 @@ class Usuario:
     def exists(email):
         """Verifica se email já está cadastrado"""
         query = "SELECT COUNT(*) as count FROM USUARIO WHERE EMAIL = %s"
-        result = Database.execute_query(query, (email,), fetch_one=True)
+        result = Database.execute_query(query, (email,), fetch_one=True, prepared=True)
         return result['count'] > 0
 
 # ========== PET ==========
 
+class LinhaPet(Linha):
+    """Linha de PET; NOME_TUTOR vem de get_info_with_owner"""
+    __slots__ = ('ID_PET', 'NOME', 'RACA', 'IDADE', 'OBSERVACOES', 'NOME_TUTOR')
+
+_COLUNAS_PET = ('ID_PET', 'NOME', 'RACA', 'IDADE', 'OBSERVACOES')
+
 class Pet:
     """Modelo para tabela PET"""
     
+    _POR_ID = Projecao(LinhaPet, _colunas('P', *_COLUNAS_PET), """
+        SELECT {colunas} FROM PET P WHERE P.ID_PET = %s
+    """)
+    
+    _COM_TUTOR = Projecao(LinhaPet, dict(_colunas('P', *_COLUNAS_PET), NOME_TUTOR='U.NOME_COMPLETO'), """
+        SELECT {colunas}
+        FROM PET P
+        INNER JOIN CLIENTE C ON P.ID_PET = C.ID_PET
+        INNER JOIN USUARIO U ON C.ID_USUARIO = U.ID_USUARIO
+        WHERE P.ID_PET = %s
+    """)
+    
     @staticmethod
     def create(nome, raca, idade, observacoes=None):
         """Cria um novo pet"""
@@ -111,9 +191,9 @@ class Pet:
         return result['last_insert_id']
     
     @staticmethod
-    def find_by_id(pet_id):
-        """Busca pet por ID"""
-        return find_by_id('PET', 'ID_PET', pet_id)
+    def find_by_id(pet_id, colunas=None):
+        """Busca pet por ID (LinhaPet com as colunas pedidas)"""
+        return Pet._POR_ID.ler((pet_id,), colunas, fetch_one=True, prepared=True)
     
     @staticmethod
     def update(pet_id, data):
@@ -121,28 +201,52 @@ class Pet:
         return update_by_id('PET', 'ID_PET', pet_id, data)
     
     @staticmethod
-    def get_info_with_owner(pet_id):
-        """Usa a VIEW INFO_PET para obter informações do pet com tutor"""
-        query = """
-            SELECT P.*, U.NOME_COMPLETO as NOME_TUTOR
-            FROM PET P
-            INNER JOIN CLIENTE C ON P.ID_PET = C.ID_PET
-            INNER JOIN USUARIO U ON C.ID_USUARIO = U.ID_USUARIO
-            WHERE P.ID_PET = %s
-        """
-        return Database.execute_query(query, (pet_id,), fetch_one=True)
+    def get_info_with_owner(pet_id, colunas=None):
+        """Informações do pet com o nome do tutor (NOME_TUTOR)"""
+        return Pet._COM_TUTOR.ler((pet_id,), colunas, fetch_one=True)
     
     @staticmethod
-    def add_vacina(pet_id, vacina_id):
-        """Adiciona vacina ao pet"""
-        query = "UPDATE PET SET ID_VACINAS = %s WHERE ID_PET = %s"
-        return Database.execute_query(query, (vacina_id, pet_id), commit=True)
+    def add_vacina(pet_id, vacina_id, data_aplicado):
+        """Adiciona vacina ao histórico do pet (PET_VACINA)"""
+        query = "INSERT INTO PET_VACINA (ID_PET, ID_VAC, DATA_APLICADO) VALUES (%s, %s, %s)"
+        return Database.enfileirar_escrita(query, (pet_id, vacina_id, data_aplicado))
 
 # ========== CLIENTE ==========
 
+class LinhaCliente(Linha):
+    """Linha de CLIENTE; NOME_COMPLETO, EMAIL e NOME_PET vêm de find_by_cpf"""
+    __slots__ = ('ID_USUARIO', 'TELEFONE', 'BAIRRO', 'RUA', 'CIDADE', 'CPF', 'ID_PET',
+                 'NOME_COMPLETO', 'EMAIL', 'NOME_PET')
+
+_COLUNAS_CLIENTE = ('ID_USUARIO', 'TELEFONE', 'BAIRRO', 'RUA', 'CIDADE', 'CPF', 'ID_PET')
+
 class Cliente:
     """Modelo para tabela CLIENTE"""
     
+    _POR_ID = Projecao(LinhaCliente, _colunas('C', *_COLUNAS_CLIENTE), """
+        SELECT {colunas} FROM CLIENTE C WHERE C.ID_USUARIO = %s
+    """)
+    
+    _POR_CPF = Projecao(
+        LinhaCliente,
+        dict(_colunas('C', *_COLUNAS_CLIENTE), NOME_COMPLETO='U.NOME_COMPLETO', EMAIL='U.EMAIL',
+             NOME_PET='P.NOME'),
+        """
+        SELECT {colunas}
+        FROM CLIENTE C
+        INNER JOIN USUARIO U ON C.ID_USUARIO = U.ID_USUARIO
+        LEFT JOIN PET P ON C.ID_PET = P.ID_PET
+        WHERE C.CPF = %s
+        """
+    )
+    
+    _PET = Projecao(LinhaPet, _colunas('P', *_COLUNAS_PET), """
+        SELECT {colunas}
+        FROM PET P
+        INNER JOIN CLIENTE C ON P.ID_PET = C.ID_PET
+        WHERE C.ID_USUARIO = %s
+    """)
+    
     @staticmethod
     def create(usuario_id, telefone, cpf, id_pet, bairro=None, rua=None, cidade=None):
         """Cria um novo cliente"""
@@ -150,47 +254,108 @@ class Cliente:
             INSERT INTO CLIENTE (ID_USUARIO, TELEFONE, CPF, ID_PET, BAIRRO, RUA, CIDADE)
             VALUES (%s, %s, %s, %s, %s, %s, %s)
         """
-        Database.execute_query(query, (usuario_id, telefone, cpf, id_pet, bairro, rua, cidade), commit=True)
+        Database.execute_query(query, (id_binario(usuario_id), telefone, cpf, id_pet, bairro, rua, cidade),
+                               commit=True)
         return usuario_id
     
     @staticmethod
-    def find_by_id(usuario_id):
-        """Busca cliente por ID"""
-        return find_by_id('CLIENTE', 'ID_USUARIO', usuario_id)
+    def find_by_id(usuario_id, colunas=None):
+        """Busca cliente por ID (LinhaCliente com as colunas pedidas)"""
+        return Cliente._POR_ID.ler((id_binario(usuario_id),), colunas, fetch_one=True, prepared=True)
     
     @staticmethod
-    def find_by_cpf(cpf):
-        """Busca cliente por CPF"""
-        query = """
-            SELECT C.*, U.NOME_COMPLETO, U.EMAIL, P.NOME as NOME_PET
-            FROM CLIENTE C
-            INNER JOIN USUARIO U ON C.ID_USUARIO = U.ID_USUARIO
-            LEFT JOIN PET P ON C.ID_PET = P.ID_PET
-            WHERE C.CPF = %s
-        """
-        return Database.execute_query(query, (cpf,), fetch_one=True)
+    def find_by_cpf(cpf, colunas=None):
+        """Busca cliente por CPF, com nome e email do usuário e nome do pet"""
+        return Cliente._POR_CPF.ler((cpf,), colunas, fetch_one=True, prepared=True)
     
     @staticmethod
-    def get_pet(usuario_id):
-        """Retorna o pet do cliente"""
-        query = """
-            SELECT P.*
-            FROM PET P
-            INNER JOIN CLIENTE C ON P.ID_PET = C.ID_PET
-            WHERE C.ID_USUARIO = %s
-        """
-        return Database.execute_query(query, (usuario_id,), fetch_one=True)
+    def get_pet(usuario_id, colunas=None):
+        """Retorna o pet do cliente (LinhaPet)"""
+        return Cliente._PET.ler((id_binario(usuario_id),), colunas, fetch_one=True, prepared=True)
     
     @staticmethod
     def update(usuario_id, data):
         """Atualiza dados do cliente"""
         return update_by_id('CLIENTE', 'ID_USUARIO', usuario_id, data)
+    
+    @staticmethod
+    def cadastrar(nome_completo, email, senha, grupo_usuario_id, cpf, telefone,
+                  nome_pet, raca_pet, idade_pet, observacoes_pet=None):
+        """
+        Cadastra usuário, pet e cliente em uma única transação (um checkout
+        e um commit). LAST_INSERT_ID() liga o cliente ao pet recém-criado.
+        Email ou CPF repetidos levantam RegistroDuplicado.
+        
+        Returns:
+            tuple: (usuario_id, pet_id)
+        """
+        usuario_id, inserir_usuario = _inserir_usuario(nome_completo, email, senha, grupo_usuario_id)
+        queries = [
+            inserir_usuario,
+            {
+                'query': """
+                    INSERT INTO PET (NOME, RACA, IDADE, OBSERVACOES)
+                    VALUES (%s, %s, %s, %s)
+                """,
+                'params': (nome_pet, raca_pet, idade_pet, observacoes_pet)
+            },
+            {
+                'query': """
+                    INSERT INTO CLIENTE (ID_USUARIO, TELEFONE, CPF, ID_PET)
+                    VALUES (%s, %s, %s, LAST_INSERT_ID())
+                """,
+                'params': (usuario_id.bytes, telefone, cpf)
+            }
+        ]
+        result = _cadastrar(queries, 'CPF')
+        return str(usuario_id), result['results'][1]['last_insert_id']
 
 # ========== VETERINARIO ==========
 
+class LinhaVeterinario(Linha):
+    """Linha de VETERINARIO com nome e email do usuário; CLINICA nas consultas entre clínicas"""
+    __slots__ = ('CRMV', 'ID_USUARIO', 'SALARIO', 'TURNO', 'NOME_COMPLETO', 'EMAIL', 'CLINICA')
+
+_EXPRESSOES_VETERINARIO = dict(_colunas('V', 'CRMV', 'ID_USUARIO', 'SALARIO', 'TURNO'),
+                               NOME_COMPLETO='U.NOME_COMPLETO', EMAIL='U.EMAIL')
+
 class Veterinario:
     """Modelo para tabela VETERINARIO"""
     
+    _POR_CRMV = Projecao(LinhaVeterinario, _EXPRESSOES_VETERINARIO, """
+        SELECT {colunas}
+        FROM VETERINARIO V
+        INNER JOIN USUARIO U ON V.ID_USUARIO = U.ID_USUARIO
+        WHERE V.CRMV = %s
+    """)
+    
+    _POR_USUARIO = Projecao(LinhaVeterinario, _EXPRESSOES_VETERINARIO, """
+        SELECT {colunas}
+        FROM VETERINARIO V
+        INNER JOIN USUARIO U ON V.ID_USUARIO = U.ID_USUARIO
+        WHERE V.ID_USUARIO = %s
+    """)
+    
+    _TODOS = Projecao(LinhaVeterinario, _EXPRESSOES_VETERINARIO, """
+        SELECT {colunas}
+        FROM VETERINARIO V
+        INNER JOIN USUARIO U ON V.ID_USUARIO = U.ID_USUARIO
+    """)
+    
+    # Diretório de veterinários da clínica, em memória (app/referencia.py):
+    # GET /veterinarios e get_all com estas colunas não vão ao banco
+    COLUNAS_DIRETORIO = ('CRMV', 'NOME_COMPLETO', 'EMAIL', 'TURNO')
+    _DIRETORIO = Catalogo(
+        'veterinarios',
+        lambda: sorted(Veterinario._TODOS.ler(None, Veterinario.COLUNAS_DIRETORIO, fetch_all=True, prepared=True),
+                       key=lambda vet: vet.NOME_COMPLETO or ''),
+        chave='CRMV', tabelas=('VETERINARIO', 'USUARIO'),
+        serializar=lambda vets: {
+            'total': len(vets),
+            'veterinarios': [{'crmv': vet.CRMV, 'nome': vet.NOME_COMPLETO, 'turno': vet.TURNO} for vet in vets]
+        }
+    )
+    
     @staticmethod
     def create(crmv, usuario_id, salario=None, turno=None):
         """Cria um novo veterinário"""
@@ -198,53 +363,97 @@ class Veterinario:
             INSERT INTO VETERINARIO (CRMV, ID_USUARIO, SALARIO, TURNO)
             VALUES (%s, %s, %s, %s)
         """
-        Database.execute_query(query, (crmv, usuario_id, salario, turno), commit=True)
+        Database.execute_query(query, (crmv, id_binario(usuario_id), salario, turno), commit=True)
         return crmv
     
     @staticmethod
-    def find_by_crmv(crmv):
+    def find_by_crmv(crmv, colunas=None):
         """Busca veterinário por CRMV"""
-        query = """
-            SELECT V.*, U.NOME_COMPLETO, U.EMAIL
-            FROM VETERINARIO V
-            INNER JOIN USUARIO U ON V.ID_USUARIO = U.ID_USUARIO
-            WHERE V.CRMV = %s
-        """
-        return Database.execute_query(query, (crmv,), fetch_one=True)
+        return Veterinario._POR_CRMV.ler((crmv,), colunas, fetch_one=True, prepared=True)
     
     @staticmethod
-    def find_by_usuario_id(usuario_id):
+    def find_by_usuario_id(usuario_id, colunas=None):
         """Busca veterinário por ID do usuário"""
-        query = """
-            SELECT V.*, U.NOME_COMPLETO, U.EMAIL
-            FROM VETERINARIO V
-            INNER JOIN USUARIO U ON V.ID_USUARIO = U.ID_USUARIO
-            WHERE V.ID_USUARIO = %s
+        return Veterinario._POR_USUARIO.ler((id_binario(usuario_id),), colunas, fetch_one=True, prepared=True)
+    
+    @staticmethod
+    def cadastrar(nome_completo, email, senha, grupo_usuario_id, crmv, salario=None, turno=None):
         """
-        return Database.execute_query(query, (usuario_id,), fetch_one=True)
+        Cadastra usuário e veterinário em uma única transação.
+        Email ou CRMV repetidos levantam RegistroDuplicado.
+        
+        Returns:
+            str: ID do usuário criado
+        """
+        usuario_id, inserir_usuario = _inserir_usuario(nome_completo, email, senha, grupo_usuario_id)
+        queries = [
+            inserir_usuario,
+            {
+                'query': """
+                    INSERT INTO VETERINARIO (CRMV, ID_USUARIO, SALARIO, TURNO)
+                    VALUES (%s, %s, %s, %s)
+                """,
+                'params': (crmv, usuario_id.bytes, salario, turno)
+            }
+        ]
+        _cadastrar(queries, 'CRMV')
+        return str(usuario_id)
     
     @staticmethod
     def listar_consultas_dia(crmv, data_consulta):
         """
-        Usa a PROCEDURE listar_consultas para obter consultas do dia
+        Agenda do dia do veterinário (mesmas colunas da PROCEDURE
+        listar_consultas, usa o índice IDX_CONSULTA_CRMV_DATA)
+        """
+        query = """
+            SELECT C.DATA_CONSULTA, P.NOME, P.RACA
+            FROM CONSULTA C
+            INNER JOIN PET P ON C.ID_PET = P.ID_PET
+            WHERE C.CRMV = %s AND C.DATA_CONSULTA = %s
         """
-        return Database.call_procedure('listar_consultas', (data_consulta,))
+        return Database.execute_query(query, (crmv, data_consulta), fetch_all=True, prepared=True)
     
     @staticmethod
-    def get_all():
-        """Lista todos os veterinários"""
-        query = """
-            SELECT V.*, U.NOME_COMPLETO, U.EMAIL
-            FROM VETERINARIO V
-            INNER JOIN USUARIO U ON V.ID_USUARIO = U.ID_USUARIO
+    def get_all(colunas=None):
+        """
+        Lista todos os veterinários. Com as colunas de COLUNAS_DIRETORIO
+        vem do diretório em memória; outras projeções leem o banco
         """
-        return Database.execute_query(query, fetch_all=True)
+        if colunas is not None and tuple(colunas) == Veterinario.COLUNAS_DIRETORIO:
+            return Veterinario._DIRETORIO.linhas()
+        return Veterinario._TODOS.ler(None, colunas, fetch_all=True, prepared=True, cache=True)
+    
+    @staticmethod
+    def get_all_todas_clinicas(colunas=None):
+        """Veterinários de todas as clínicas (cada linha com a CLINICA)"""
+        return Database.em_todas_clinicas(Veterinario.get_all, colunas)
 
 # ========== VACINAS ==========
 
+class LinhaVacina(Linha):
+    """Linha de VACINAS (no histórico do pet, DATA_APLICADO vem de PET_VACINA)"""
+    __slots__ = ('ID_VAC', 'NOME', 'DOSE', 'DATA_APLICADO')
+
 class Vacina:
     """Modelo para tabela VACINAS"""
     
+    _POR_ID = Projecao(LinhaVacina, _colunas('V', 'ID_VAC', 'NOME', 'DOSE', 'DATA_APLICADO'), """
+        SELECT {colunas} FROM VACINAS V WHERE V.ID_VAC = %s
+    """)
+    
+    # Leitura por faixa do IDX_PET_VACINA_DATA, já na ordem da data
+    _HISTORICO = Projecao(
+        LinhaVacina,
+        dict(_colunas('V', 'ID_VAC', 'NOME', 'DOSE'), DATA_APLICADO='PV.DATA_APLICADO'),
+        """
+        SELECT {colunas}
+        FROM PET_VACINA PV
+        INNER JOIN VACINAS V ON V.ID_VAC = PV.ID_VAC
+        WHERE PV.ID_PET = %s
+        ORDER BY PV.DATA_APLICADO DESC
+        """
+    )
+    
     @staticmethod
     def create(nome, dose, data_aplicado):
         """Cria um novo registro de vacina"""
@@ -252,27 +461,58 @@ class Vacina:
             INSERT INTO VACINAS (NOME, DOSE, DATA_APLICADO)
             VALUES (%s, %s, %s)
         """
-        result = Database.execute_query(query, (nome, dose, data_aplicado), commit=True)
+        result = Database.enfileirar_escrita(query, (nome, dose, data_aplicado))
         return result['last_insert_id']
     
     @staticmethod
-    def find_by_id(vacina_id):
+    def find_by_id(vacina_id, colunas=None):
         """Busca vacina por ID"""
-        return find_by_id('VACINAS', 'ID_VAC', vacina_id)
+        return Vacina._POR_ID.ler((vacina_id,), colunas, fetch_one=True, prepared=True)
     
     @staticmethod
-    def get_historico_pet(pet_id):
-        """
-        Usa a VIEW HISTORICO_VACINA para obter histórico de vacinas do pet
+    def get_historico_pet(pet_id, colunas=None):
+        """Histórico de vacinas do pet, da mais recente para a mais antiga"""
+        return Vacina._HISTORICO.ler((pet_id,), colunas, fetch_all=True, prepared=True, cache=True)
+    
+    @staticmethod
+    def registrar_lote(vacinas):
         """
-        query = """
-            SELECT V.NOME, V.DOSE, V.DATA_APLICADO
-            FROM VACINAS V
-            INNER JOIN PET P ON V.ID_VAC = P.ID_VACINAS
-            WHERE P.ID_PET = %s
-            ORDER BY V.DATA_APLICADO DESC
+        Registra vacinas aplicadas em vários pets (ex.: dia de campanha)
+        
+        Cria um registro em VACINAS por vacina/dose/data e as aplicações em
+        PET_VACINA em uma única transação (LAST_INSERT_ID() liga as
+        aplicações de cada vacina ao registro recém-criado): ou o lote
+        inteiro entra no histórico, ou nada é gravado.
+        
+        Args:
+            vacinas (list): dicts com 'nome', 'dose', 'data_aplicado' e 'pet_ids'
+        
+        Returns:
+            dict: 'vacinas' (ids criados em VACINAS) e 'aplicacoes' (linhas gravadas)
         """
-        return Database.execute_query(query, (pet_id,), fetch_all=True)
+        queries = []
+        for vacina in vacinas:
+            pet_ids = list(dict.fromkeys(vacina['pet_ids']))
+            queries.append({
+                'query': "INSERT INTO VACINAS (NOME, DOSE, DATA_APLICADO) VALUES (%s, %s, %s)",
+                'params': (vacina['nome'], vacina['dose'], vacina['data_aplicado'])
+            })
+            valores = ', '.join(['(%s, LAST_INSERT_ID(), %s)'] * len(pet_ids))
+            queries.append({
+                'query': f"INSERT INTO PET_VACINA (ID_PET, ID_VAC, DATA_APLICADO) VALUES {valores}",
+                'params': tuple(param for pet_id in pet_ids for param in (pet_id, vacina['data_aplicado']))
+            })
+        try:
+            result = Database.execute_transaction(queries)
+        except IntegrityError as e:
+            if e.errno == 1452:
+                raise VacinacaoInvalida('Pet não encontrado no lote') from e
+            raise
+        resultados = result['results']
+        return {
+            'vacinas': [item['last_insert_id'] for item in resultados[0::2]],
+            'aplicacoes': sum(item['affected_rows'] for item in resultados[1::2])
+        }
     
     @staticmethod
     def update(vacina_id, data):
@@ -286,59 +526,111 @@ class Vacina:
 
 # ========== CONSULTA ==========
 
+class LinhaConsulta(Linha):
+    """Linha de CONSULTA com dados do pet e do veterinário; CLINICA entre clínicas"""
+    __slots__ = ('ID_PROCEDIMENTO', 'DATA_CONSULTA', 'VALOR', 'ID_PET', 'CRMV',
+                 'NOME_PET', 'RACA', 'NOME_VET', 'CLINICA')
+
+_EXPRESSOES_CONSULTA = _colunas('C', 'ID_PROCEDIMENTO', 'DATA_CONSULTA', 'VALOR', 'ID_PET', 'CRMV')
+
 class Consulta:
     """Modelo para tabela CONSULTA"""
     
+    _POR_ID = Projecao(
+        LinhaConsulta,
+        dict(_EXPRESSOES_CONSULTA, NOME_PET='P.NOME', RACA='P.RACA', NOME_VET='U.NOME_COMPLETO'),
+        """
+        SELECT {colunas}
+        FROM CONSULTA C
+        INNER JOIN PET P ON C.ID_PET = P.ID_PET
+        INNER JOIN VETERINARIO V ON C.CRMV = V.CRMV
+        INNER JOIN USUARIO U ON V.ID_USUARIO = U.ID_USUARIO
+        WHERE C.ID_PROCEDIMENTO = %s
+        """
+    )
+    
+    # Todas as linhas do pet no banco: os anos fechados saem de CONSULTA só
+    # quando arquivados (arquivar_consultas.py), não pela data
+    _POR_PET = Projecao(LinhaConsulta, dict(_EXPRESSOES_CONSULTA, NOME_VET='U.NOME_COMPLETO'), """
+        SELECT {colunas}
+        FROM CONSULTA C
+        INNER JOIN VETERINARIO V ON C.CRMV = V.CRMV
+        INNER JOIN USUARIO U ON V.ID_USUARIO = U.ID_USUARIO
+        WHERE C.ID_PET = %s
+        ORDER BY C.DATA_CONSULTA DESC
+    """)
+    
+    _POR_DATA = Projecao(
+        LinhaConsulta,
+        dict(_EXPRESSOES_CONSULTA, NOME_PET='P.NOME', RACA='P.RACA', NOME_VET='U.NOME_COMPLETO'),
+        """
+        SELECT {colunas}
+        FROM CONSULTA C
+        INNER JOIN PET P ON C.ID_PET = P.ID_PET
+        INNER JOIN VETERINARIO V ON C.CRMV = V.CRMV
+        INNER JOIN USUARIO U ON V.ID_USUARIO = U.ID_USUARIO
+        WHERE C.DATA_CONSULTA = %s
+        ORDER BY C.DATA_CONSULTA
+        """
+    )
+    
     @staticmethod
     def create(data_consulta, valor, id_pet, crmv):
-        """Cria uma nova consulta"""
-        consulta_id = gerar_uuid()
+        """
+        Cria uma nova consulta. No MySQL a CONSULTA particionada não tem FKs:
+        o INSERT ... SELECT só grava se o pet e o veterinário existirem, e
+        senão levanta o mesmo erro da FK (1452)
+        """
+        consulta_id = novo_id()
         query = """
             INSERT INTO CONSULTA (ID_PROCEDIMENTO, DATA_CONSULTA, VALOR, ID_PET, CRMV)
-            VALUES (%s, %s, %s, %s, %s)
+            SELECT %s, %s, %s, P.ID_PET, V.CRMV
+            FROM PET P INNER JOIN VETERINARIO V ON V.CRMV = %s
+            WHERE P.ID_PET = %s
         """
-        Database.execute_query(query, (consulta_id, data_consulta, valor, id_pet, crmv), commit=True)
-        return consulta_id
+        result = Database.execute_query(query, (consulta_id.bytes, data_consulta, valor, crmv, id_pet), commit=True)
+        if not result['affected_rows']:
+            raise IntegrityError(msg=f"Pet {id_pet} ou veterinário {crmv} inexistente", errno=1452)
+        return str(consulta_id)
     
     @staticmethod
-    def find_by_id(consulta_id):
+    def find_by_id(consulta_id, colunas=None):
         """Busca consulta por ID"""
-        query = """
-            SELECT C.*, P.NOME as NOME_PET, P.RACA, V.*, U.NOME_COMPLETO as NOME_VET
-            FROM CONSULTA C
-            INNER JOIN PET P ON C.ID_PET = P.ID_PET
-            INNER JOIN VETERINARIO V ON C.CRMV = V.CRMV
-            INNER JOIN USUARIO U ON V.ID_USUARIO = U.ID_USUARIO
-            WHERE C.ID_PROCEDIMENTO = %s
-        """
-        return Database.execute_query(query, (consulta_id,), fetch_one=True)
+        return Consulta._POR_ID.ler((id_binario(consulta_id),), colunas, fetch_one=True, prepared=True)
     
     @staticmethod
-    def find_by_pet(pet_id):
-        """Lista consultas de um pet (usa index DATA_CONSULTA)"""
-        query = """
-            SELECT C.*, U.NOME_COMPLETO as NOME_VET, V.CRMV
-            FROM CONSULTA C
-            INNER JOIN VETERINARIO V ON C.CRMV = V.CRMV
-            INNER JOIN USUARIO U ON V.ID_USUARIO = U.ID_USUARIO
-            WHERE C.ID_PET = %s
-            ORDER BY C.DATA_CONSULTA DESC
+    def find_by_pet(pet_id, colunas=None, historico_completo=False):
+        """
+        Lista consultas de um pet, da mais recente para a mais antiga (usa
+        index IDX_CONSULTA_PET_DATA). Por padrão as que estão em CONSULTA;
+        com historico_completo, também as já arquivadas
+        (app/arquivo_consultas.py). Nesse caso as linhas trazem ainda
+        ID_PROCEDIMENTO e DATA_CONSULTA, usadas para juntar as duas origens
         """
-        return Database.execute_query(query, (pet_id,), fetch_all=True)
+        if not historico_completo:
+            return Consulta._POR_PET.ler((pet_id,), colunas, fetch_all=True, prepared=True, cache=True)
+        colunas = tuple(dict.fromkeys(('ID_PROCEDIMENTO', 'DATA_CONSULTA') + tuple(colunas or Consulta._POR_PET.expressoes)))
+        consultas = Consulta._POR_PET.ler((pet_id,), colunas, fetch_all=True, prepared=True)
+        # Linhas arquivadas ainda no banco (arquivamento interrompido) vêm só do banco
+        no_banco = {consulta.ID_PROCEDIMENTO for consulta in consultas}
+        consultas.extend(consulta for consulta in arquivo_consultas.consultas_do_pet(pet_id, LinhaConsulta, colunas)
+                         if consulta.ID_PROCEDIMENTO not in no_banco)
+        consultas.sort(key=lambda consulta: consulta.DATA_CONSULTA, reverse=True)
+        return consultas
+    
+    @staticmethod
+    def find_by_data(data_consulta, colunas=None):
+        """Lista consultas de uma data específica (usa index DATA_CONSULTA)"""
+        return Consulta._POR_DATA.ler((data_consulta,), colunas, fetch_all=True, prepared=True)
     
     @staticmethod
-    def find_by_data(data_consulta):
-        """Lista consultas de uma data específica (usa index DATA_CONSULTA)"""
-        query = """
-            SELECT C.*, P.NOME as NOME_PET, P.RACA, U.NOME_COMPLETO as NOME_VET
-            FROM CONSULTA C
-            INNER JOIN PET P ON C.ID_PET = P.ID_PET
-            INNER JOIN VETERINARIO V ON C.CRMV = V.CRMV
-            INNER JOIN USUARIO U ON V.ID_USUARIO = U.ID_USUARIO
-            WHERE C.DATA_CONSULTA = %s
-            ORDER BY C.DATA_CONSULTA
+    def find_by_data_todas_clinicas(data_consulta, colunas=None):
+        """
+        Consultas de uma data em todas as clínicas (cada linha com a CLINICA),
+        ordenadas por clínica e veterinário: a projeção precisa de NOME_VET
         """
-        return Database.execute_query(query, (data_consulta,), fetch_all=True)
+        consultas = Database.em_todas_clinicas(Consulta.find_by_data, data_consulta, colunas)
+        return sorted(consultas, key=lambda c: (c.CLINICA, c.NOME_VET or ''))
     
     @staticmethod
     def update(consulta_id, data):
@@ -350,6 +642,141 @@ class Consulta:
         """Deleta consulta"""
         return delete_by_id('CONSULTA', 'ID_PROCEDIMENTO', consulta_id)
 
+# ========== PRESCRICAO ==========
+
+def normalizar_medicamento(nome):
+    """
+    Normaliza o nome do medicamento para o índice invertido:
+    sem acentos, minúsculo e com espaços simples ("Amoxicilina  500mg" == "amoxicilina 500MG")
+    """
+    sem_acentos = unicodedata.normalize('NFKD', nome or '')
+    sem_acentos = ''.join(c for c in sem_acentos if not unicodedata.combining(c))
+    return ' '.join(sem_acentos.lower().split())
+
+class Prescricao:
+    """Modelo para tabelas PRESCRICAO e PRESCRICAO_MEDICAMENTO"""
+
+    STATUS_ATIVA = 'ativa'
+    STATUS_FINALIZADA = 'finalizada'
+
+    @staticmethod
+    def create(id_pet, cpf_cliente, veterinario, id_veterinario, data_consulta, diagnostico,
+               medicamentos, orientacoes_gerais='', retorno=None):
+        """
+        Cria a prescrição e seus medicamentos em uma única transação
+        (LAST_INSERT_ID() liga os medicamentos à prescrição recém-criada)
+        """
+        queries = [{
+            'query': """
+                INSERT INTO PRESCRICAO (ID_PET, CPF_CLIENTE, VETERINARIO, ID_VETERINARIO,
+                                        DATA_CONSULTA, DIAGNOSTICO, ORIENTACOES_GERAIS, RETORNO)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            'params': (id_pet, cpf_cliente, veterinario, id_binario(id_veterinario),
+                       data_consulta, diagnostico, orientacoes_gerais, retorno)
+        }]
+
+        valores = ', '.join(['(LAST_INSERT_ID(), %s, %s, %s, %s, %s, %s, %s)'] * len(medicamentos))
+        params = []
+        for ordem, med in enumerate(medicamentos):
+            params.extend((ordem, med.get('nome'), normalizar_medicamento(med.get('nome')),
+                           med.get('dosagem'), med.get('frequencia'), med.get('duracao'),
+                           med.get('observacoes')))
+        queries.append({
+            'query': f"""
+                INSERT INTO PRESCRICAO_MEDICAMENTO
+                    (ID_PRESCRICAO, ORDEM, NOME, NOME_NORMALIZADO, DOSAGEM, FREQUENCIA, DURACAO, OBSERVACOES)
+                VALUES {valores}
+            """,
+            'params': tuple(params)
+        })
+
+        result = Database.execute_transaction(queries)
+        return result['results'][0]['last_insert_id']
+
+    @staticmethod
+    def find_by_id(prescricao_id):
+        """Busca prescrição por ID"""
+        return find_by_id('PRESCRICAO', 'ID_PRESCRICAO', prescricao_id)
+
+    @staticmethod
+    def get_medicamentos(prescricao_id):
+        """Lista os medicamentos da prescrição na ordem em que foram prescritos"""
+        query = """
+            SELECT NOME, DOSAGEM, FREQUENCIA, DURACAO, OBSERVACOES
+            FROM PRESCRICAO_MEDICAMENTO
+            WHERE ID_PRESCRICAO = %s
+            ORDER BY ORDEM
+        """
+        return Database.execute_query(query, (prescricao_id,), fetch_all=True, prepared=True)
+
+    @staticmethod
+    def find_by_pet(pet_id):
+        """Lista prescrições de um pet (usa index IDX_PRESCRICAO_PET)"""
+        query = """
+            SELECT P.*,
+                   (SELECT COUNT(*) FROM PRESCRICAO_MEDICAMENTO M
+                    WHERE M.ID_PRESCRICAO = P.ID_PRESCRICAO) as TOTAL_MEDICAMENTOS
+            FROM PRESCRICAO P
+            WHERE P.ID_PET = %s
+            ORDER BY P.DATA_CONSULTA DESC, P.ID_PRESCRICAO DESC
+        """
+        return Database.execute_query(query, (pet_id,), fetch_all=True, prepared=True)
+
+    @staticmethod
+    def find_by_cpf(cpf_cliente):
+        """Lista prescrições de um tutor (usa index IDX_PRESCRICAO_CPF)"""
+        query = """
+            SELECT * FROM PRESCRICAO
+            WHERE CPF_CLIENTE = %s
+            ORDER BY DATA_CONSULTA DESC, ID_PRESCRICAO DESC
+        """
+        return Database.execute_query(query, (cpf_cliente,), fetch_all=True)
+
+    @staticmethod
+    @Database.usar_pool(Config.POOL_BATCH)
+    def find_ativas_por_medicamento(nome_medicamento, limite, apos_id=None, data_inicio=None, data_fim=None):
+        """
+        Lista prescrições ativas que contêm o medicamento (usa o índice
+        invertido IDX_MEDICAMENTO_NOME). A paginação é por cursor: passe em
+        apos_id o último ID_PRESCRICAO da página anterior.
+        """
+        query = """
+            SELECT DISTINCT P.ID_PRESCRICAO, P.ID_PET, PT.NOME as NOME_PET, P.CPF_CLIENTE,
+                   P.VETERINARIO, P.DATA_CONSULTA, P.DIAGNOSTICO
+            FROM PRESCRICAO_MEDICAMENTO M
+            INNER JOIN PRESCRICAO P ON M.ID_PRESCRICAO = P.ID_PRESCRICAO
+            INNER JOIN PET PT ON P.ID_PET = PT.ID_PET
+            WHERE M.NOME_NORMALIZADO = %s AND P.STATUS = %s
+        """
+        params = [normalizar_medicamento(nome_medicamento), Prescricao.STATUS_ATIVA]
+
+        if apos_id is not None:
+            query += " AND M.ID_PRESCRICAO < %s"
+            params.append(apos_id)
+        if data_inicio:
+            query += " AND P.DATA_CONSULTA >= %s"
+            params.append(data_inicio)
+        if data_fim:
+            query += " AND P.DATA_CONSULTA <= %s"
+            params.append(data_fim)
+
+        query += " ORDER BY P.ID_PRESCRICAO DESC LIMIT %s"
+        params.append(limite)
+
+        return Database.execute_query(query, tuple(params), fetch_all=True)
+
+    @staticmethod
+    def update_status(prescricao_id, status):
+        """Atualiza o status da prescrição"""
+        query = "UPDATE PRESCRICAO SET STATUS = %s, UPDATED_AT = NOW() WHERE ID_PRESCRICAO = %s"
+        return Database.execute_query(query, (status, prescricao_id), commit=True)
+
+    @staticmethod
+    def delete(prescricao_id):
+        """Deleta prescrição (os medicamentos são removidos em cascata)"""
+        return delete_by_id('PRESCRICAO', 'ID_PRESCRICAO', prescricao_id)
+
 # ========== TIPOS DE VACINAS COMUNS ==========
 
 TIPOS_VACINAS = [
@@ -364,3 +791,9 @@ TIPOS_VACINAS = [
     'Antirrábica Felina',
     'FeLV (Leucemia Felina)',
 ]
+
+# Lista fixa servida por GET /vacinas/tipos (corpo JSON montado uma vez)
+CATALOGO_TIPOS_VACINAS = Catalogo(
+    'tipos_vacinas', lambda: TIPOS_VACINAS,
+    serializar=lambda tipos: {'total': len(tipos), 'tipos': tipos}
+)
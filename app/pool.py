@@ -0,0 +1,410 @@
+"""
+Pool - Pool de conexões MySQL com fila de espera e tamanho elástico
+
+Substitui o MySQLConnectionPool do mysql-connector, que tem tamanho fixo e
+levanta PoolError imediatamente quando todas as conexões estão em uso.
+Aqui o checkout espera (em uma fila limitada) até uma conexão ser devolvida
+ou o timeout vencer, o pool cresce até o tamanho máximo sob pressão e
+encolhe de volta ao mínimo fechando conexões ociosas há muito tempo.
+
+Para baratear o checkout, a sessão só é resetada na devolução quando foi
+de fato alterada (SET, USE, tabelas temporárias, procedures...); se houver
+apenas uma transação aberta, um ROLLBACK basta. Conexões ociosas por mais
+de `ping_apos_ocioso` segundos são validadas com um ping antes de voltar
+ao uso, e conexões mais velhas que `idade_maxima` são recicladas.
+
+As conexões são abertas pelo backend (app/backends), então o mesmo pool
+serve ao MySQL e ao SQLite embarcado.
+
+Cada conexão guarda um cache LRU de prepared statements do servidor
+(um cursor preparado por texto de query). O cache morre junto com a
+conexão e é esvaziado antes de um reset de sessão, que desaloca os
+statements no servidor.
+"""
+
+import re
+import threading
+import time
+import logging
+from collections import deque, OrderedDict
+
+from mysql.connector import Error
+from mysql.connector.errors import PoolError
+
+from app.backends.mysql import MySQLBackend
+
+logger = logging.getLogger(__name__)
+
+# Comandos que deixam estado na sessão e exigem reset antes de reutilizar a conexão
+_ALTERA_SESSAO = re.compile(
+    r'^\s*(SET|USE|LOCK|UNLOCK|PREPARE|CREATE\s+TEMPORARY|DROP\s+TEMPORARY|CALL)\b',
+    re.IGNORECASE
+)
+
+
+class _Entrada:
+    """Conexão real mais os metadados que o pool mantém sobre ela"""
+
+    __slots__ = ('cnx', 'criada_em', 'devolvida_em', 'sessao_alterada', 'statements', 'lock_wait',
+                 'incremento_id')
+
+    def __init__(self, cnx):
+        self.cnx = cnx
+        self.criada_em = time.monotonic()
+        self.devolvida_em = self.criada_em
+        self.sessao_alterada = False
+        self.statements = OrderedDict()
+        self.lock_wait = None  # innodb_lock_wait_timeout da sessão (None = padrão do servidor)
+        self.incremento_id = None  # auto_increment_increment da sessão (lido uma vez)
+
+    def limpar_statements(self):
+        """Fecha os cursores preparados (desaloca os statements no servidor)"""
+        while self.statements:
+            _, cursor = self.statements.popitem(last=False)
+            try:
+                cursor.close()
+            except Error:
+                pass
+
+
+class _CursorMonitorado:
+    """Cursor que avisa a entrada quando um comando altera a sessão"""
+
+    def __init__(self, cursor, entrada):
+        self._cursor = cursor
+        self._entrada = entrada
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, operation, *args, **kwargs):
+        if _ALTERA_SESSAO.match(operation):
+            self._entrada.sessao_alterada = True
+        return self._cursor.execute(operation, *args, **kwargs)
+
+    def executemany(self, operation, *args, **kwargs):
+        if _ALTERA_SESSAO.match(operation):
+            self._entrada.sessao_alterada = True
+        return self._cursor.executemany(operation, *args, **kwargs)
+
+    def callproc(self, *args, **kwargs):
+        # A procedure pode alterar variáveis de sessão
+        self._entrada.sessao_alterada = True
+        return self._cursor.callproc(*args, **kwargs)
+
+
+class ConexaoPool:
+    """
+    Conexão emprestada do pool. Repassa tudo para a conexão MySQL real;
+    close() devolve a conexão ao pool em vez de fechá-la.
+    """
+
+    def __init__(self, pool, entrada):
+        self._pool = pool
+        self._entrada = entrada
+
+    @property
+    def pool(self):
+        return self._pool
+
+    def __getattr__(self, nome):
+        if self._entrada is None:
+            raise PoolError("Conexão já foi devolvida ao pool")
+        return getattr(self._entrada.cnx, nome)
+
+    def cursor(self, *args, **kwargs):
+        return _CursorMonitorado(self._entrada.cnx.cursor(*args, **kwargs), self._entrada)
+
+    def cursor_preparado(self, query):
+        """
+        Retorna o cursor preparado para a query, reaproveitando o statement
+        já preparado nesta conexão quando houver (cache LRU por conexão)
+        """
+        statements = self._entrada.statements
+        cursor = statements.get(query)
+        if cursor is not None:
+            statements.move_to_end(query)
+            return cursor
+
+        cursor = self._entrada.cnx.cursor(prepared=True)
+        statements[query] = cursor
+        if len(statements) > self._pool.cache_statements:
+            _, antigo = statements.popitem(last=False)
+            try:
+                antigo.close()
+            except Error:
+                pass
+        return cursor
+
+    def descartar_statement(self, query):
+        """Remove do cache um statement que o servidor não reconhece mais"""
+        cursor = self._entrada.statements.pop(query, None)
+        if cursor is not None:
+            try:
+                cursor.close()
+            except Error:
+                pass
+
+    def ajustar_lock_wait(self, segundos):
+        """
+        Define o innodb_lock_wait_timeout da sessão (None volta ao padrão do
+        servidor). Só executa o SET quando o valor muda; como o próprio pool
+        controla essa variável, ela não força reset da sessão.
+        """
+        if self._entrada.lock_wait == segundos:
+            return
+        comando = self._pool.backend.sql_lock_wait(segundos)
+        if comando:
+            cursor = self._entrada.cnx.cursor()
+            try:
+                cursor.execute(comando)
+            finally:
+                cursor.close()
+        self._entrada.lock_wait = segundos
+
+    def incremento_id(self):
+        """
+        Passo entre os ids de AUTO_INCREMENT de um INSERT de várias linhas
+        (auto_increment_increment: maior que 1 em replicação multi-primário).
+        Lido do servidor uma vez por conexão
+        """
+        if self._entrada.incremento_id is None:
+            comando = self._pool.backend.sql_incremento_id()
+            incremento = 1
+            if comando:
+                cursor = self._entrada.cnx.cursor()
+                try:
+                    cursor.execute(comando)
+                    incremento = int(cursor.fetchone()[0])
+                finally:
+                    cursor.close()
+            self._entrada.incremento_id = incremento
+        return self._entrada.incremento_id
+
+    def marcar_sessao_alterada(self):
+        """Força o reset da sessão na devolução"""
+        self._entrada.sessao_alterada = True
+
+    def close(self):
+        entrada, self._entrada = self._entrada, None
+        if entrada is not None:
+            self._pool.devolver(entrada)
+
+
+class PoolConexoes:
+    """Pool de conexões com checkout bloqueante e tamanho entre min e max"""
+
+    def __init__(self, nome, db_config, tamanho_min, tamanho_max, timeout_checkout,
+                 max_espera, tempo_ocioso, reset_session=True, ping_apos_ocioso=30,
+                 idade_maxima=3600, cache_statements=32, backend=None):
+        if tamanho_min < 0 or tamanho_max < max(tamanho_min, 1):
+            raise ValueError("Tamanhos do pool inválidos")
+        self.nome = nome
+        self.db_config = db_config
+        self.tamanho_min = tamanho_min
+        self.tamanho_max = tamanho_max
+        self.timeout_checkout = timeout_checkout
+        self.max_espera = max_espera
+        self.tempo_ocioso = tempo_ocioso
+        self.reset_session = reset_session
+        self.ping_apos_ocioso = ping_apos_ocioso
+        self.idade_maxima = idade_maxima
+        self.cache_statements = cache_statements
+        self.backend = backend or MySQLBackend()
+
+        self._cond = threading.Condition()
+        self._ociosas = deque()  # entradas ordenadas da mais antiga para a mais recente
+        self._total = 0
+        self._esperando = 0
+        self.estatisticas = {
+            'checkouts': 0,
+            'esgotamentos': 0,
+            'timeouts': 0,
+            'fila_cheia': 0,
+            'criadas': 0,
+            'fechadas_ociosas': 0,
+            'resets': 0,
+            'rollbacks': 0,
+            'pings': 0,
+            'descartadas_ping': 0,
+            'recicladas': 0
+        }
+
+        # Conexões mínimas são abertas já na inicialização
+        for _ in range(tamanho_min):
+            self._total += 1
+            self._ociosas.append(self._criar())
+
+        # Encolhe o pool mesmo quando não há tráfego nenhum
+        if tempo_ocioso > 0:
+            threading.Thread(target=self._loop_encolher, name=f'encolher-{nome}', daemon=True).start()
+
+    def _loop_encolher(self):
+        while True:
+            time.sleep(self.tempo_ocioso / 2)
+            with self._cond:
+                fechar = self._encolher()
+            for entrada in fechar:
+                self._fechar(entrada)
+
+    def _criar(self):
+        try:
+            cnx = self.backend.conectar(self.db_config)
+        except Error:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+        self.estatisticas['criadas'] += 1
+        return _Entrada(cnx)
+
+    def _fechar(self, entrada):
+        try:
+            entrada.cnx.close()
+        except Error:
+            pass
+
+    def _descartar(self, entrada):
+        """Fecha uma conexão emprestada e libera sua vaga no pool"""
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+        self._fechar(entrada)
+
+    def _expirada(self, entrada, agora):
+        return self.idade_maxima and agora - entrada.criada_em > self.idade_maxima
+
+    def _encolher(self):
+        """Fecha conexões ociosas além do mínimo (chamado com o lock adquirido)"""
+        limite = time.monotonic() - self.tempo_ocioso
+        fechar = []
+        while self._ociosas and self._total > self.tamanho_min and self._ociosas[0].devolvida_em < limite:
+            fechar.append(self._ociosas.popleft())
+            self._total -= 1
+            self.estatisticas['fechadas_ociosas'] += 1
+        return fechar
+
+    def _reservar(self, limite):
+        """
+        Espera por uma conexão ociosa ou por uma vaga para criar uma nova.
+        Retorna a entrada ociosa, ou None quando a vaga deve ser preenchida
+        com uma conexão nova. Também devolve as conexões a fechar.
+        """
+        esgotou = False
+        with self._cond:
+            fechar = self._encolher()
+            while True:
+                if self._ociosas:
+                    # LIFO: reutiliza a conexão mais recente e deixa as antigas envelhecerem
+                    return self._ociosas.pop(), fechar
+                if self._total < self.tamanho_max:
+                    self._total += 1
+                    return None, fechar
+
+                if not esgotou:
+                    esgotou = True
+                    self.estatisticas['esgotamentos'] += 1
+                if self._esperando >= self.max_espera:
+                    self.estatisticas['fila_cheia'] += 1
+                    raise PoolError(f"Pool {self.nome} esgotado e fila de espera cheia")
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    self.estatisticas['timeouts'] += 1
+                    raise PoolError(f"Tempo esgotado aguardando conexão do pool {self.nome}")
+
+                self._esperando += 1
+                try:
+                    self._cond.wait(restante)
+                finally:
+                    self._esperando -= 1
+
+    def get_connection(self, timeout=None):
+        """
+        Empresta uma conexão. Se o pool estiver no máximo, espera na fila até
+        `timeout` segundos (padrão: timeout_checkout) antes de levantar PoolError.
+        """
+        timeout = self.timeout_checkout if timeout is None else timeout
+        limite = time.monotonic() + timeout
+
+        while True:
+            entrada, fechar = self._reservar(limite)
+            for antiga in fechar:
+                self._fechar(antiga)
+
+            if entrada is None:
+                entrada = self._criar()
+                break
+
+            agora = time.monotonic()
+            if self._expirada(entrada, agora):
+                self.estatisticas['recicladas'] += 1
+                self._descartar(entrada)
+                continue
+
+            if self.ping_apos_ocioso and agora - entrada.devolvida_em > self.ping_apos_ocioso:
+                self.estatisticas['pings'] += 1
+                try:
+                    entrada.cnx.ping(reconnect=False)
+                except Error as e:
+                    logger.info(f"Conexão ociosa do pool {self.nome} caiu ({e}), descartando")
+                    self.estatisticas['descartadas_ping'] += 1
+                    self._descartar(entrada)
+                    continue
+            break
+
+        self.estatisticas['checkouts'] += 1
+        return ConexaoPool(self, entrada)
+
+    def devolver(self, entrada):
+        """
+        Recebe a conexão de volta. Reset só se a sessão foi alterada,
+        ROLLBACK se sobrou transação aberta; conexões quebradas ou velhas
+        demais são fechadas.
+        """
+        cnx = entrada.cnx
+        try:
+            if cnx.unread_result:
+                cnx.get_rows()
+            if self.reset_session and entrada.sessao_alterada:
+                entrada.limpar_statements()
+                cnx.reset_session()
+                entrada.sessao_alterada = False
+                entrada.lock_wait = None
+                self.estatisticas['resets'] += 1
+            elif cnx.in_transaction:
+                cnx.rollback()
+                self.estatisticas['rollbacks'] += 1
+            reutilizavel = True
+        except Error as e:
+            logger.warning(f"Descartando conexão do pool {self.nome}: {e}")
+            reutilizavel = False
+
+        agora = time.monotonic()
+        if reutilizavel and self._expirada(entrada, agora):
+            self.estatisticas['recicladas'] += 1
+            reutilizavel = False
+
+        if not reutilizavel:
+            self._descartar(entrada)
+            return
+
+        entrada.devolvida_em = agora
+        with self._cond:
+            self._ociosas.append(entrada)
+            self._cond.notify()
+
+    def status(self):
+        """Retorna tamanho atual, ociosas, esperando e contadores"""
+        with self._cond:
+            return {
+                'nome': self.nome,
+                'tamanho': self._total,
+                'ociosas': len(self._ociosas),
+                'esperando': self._esperando,
+                'min': self.tamanho_min,
+                'max': self.tamanho_max,
+                **self.estatisticas
+            }
@@ -0,0 +1,94 @@
+"""
+Prazo - Prazo (deadline) por requisição para as operações no banco
+
+Toda requisição recebe o prazo padrão REQUEST_DEADLINE; rotas podem
+definir o próprio com o decorator com_prazo. O Database consulta o tempo
+restante para limitar a espera por conexão do pool, o MAX_EXECUTION_TIME
+dos SELECTs e o innodb_lock_wait_timeout das escritas. Estourar o prazo
+levanta PrazoEsgotado, respondida como JSON 503 (sem conexão a tempo) ou
+504 (consulta interrompida).
+
+Fora de uma requisição Flask (rotas assíncronas do modo ASGI, ver
+app/asgi.py) o prazo fica em uma ContextVar, que acompanha a tarefa e as
+chamadas feitas pelo AsyncDatabase.
+"""
+
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from flask import g, has_request_context, jsonify
+
+from app.config import Config
+
+_prazo = ContextVar('prazo', default=None)
+
+
+class PrazoEsgotado(Exception):
+    """
+    O prazo da requisição acabou. Como BancoIndisponivel, não herda de
+    mysql Error para não cair nos tratamentos de erro de SQL das rotas.
+    """
+
+    def __init__(self, mensagem, status=504):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def definir_prazo(segundos):
+    """Define o prazo da requisição atual (None ou 0 remove o prazo)"""
+    prazo = time.monotonic() + segundos if segundos else None
+    if has_request_context():
+        g._prazo = prazo
+    else:
+        _prazo.set(prazo)
+
+
+def tempo_restante():
+    """Segundos restantes do prazo da requisição, ou None se não houver prazo"""
+    prazo = g.get('_prazo') if has_request_context() else _prazo.get()
+    if prazo is None:
+        return None
+    return prazo - time.monotonic()
+
+
+def verificar_prazo():
+    """Levanta PrazoEsgotado se o prazo da requisição já acabou"""
+    restante = tempo_restante()
+    if restante is not None and restante <= 0:
+        raise PrazoEsgotado("Prazo da requisição esgotado")
+
+
+def com_prazo(segundos):
+    """
+    Decorator de rota que substitui o prazo padrão:
+
+        @app.route('/login', methods=['POST'])
+        @com_prazo(2.0)
+        def login(): ...
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            definir_prazo(segundos)
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
+
+
+def mensagem_prazo_esgotado(e):
+    return ('Servidor ocupado, tente novamente' if e.status == 503
+            else 'Tempo limite da requisição excedido')
+
+
+def _responder_prazo_esgotado(e):
+    return jsonify({'message': mensagem_prazo_esgotado(e)}), e.status
+
+
+def init_app(app):
+    """Aplica o prazo padrão a toda requisição e registra a resposta 503/504"""
+    @app.before_request
+    def _prazo_padrao():
+        definir_prazo(Config.REQUEST_DEADLINE)
+
+    app.register_error_handler(PrazoEsgotado, _responder_prazo_esgotado)
@@ -1,86 +1,83 @@
 """
-Sistema de armazenamento temporário para prescrições
-Enquanto a tabela PRESCRICAO não é criada no banco de dados
+Formato do antigo armazenamento de prescrições em arquivo
+Usado antes da criação das tabelas PRESCRICAO e PRESCRICAO_MEDICAMENTO;
+as rotas agora usam o modelo Prescricao e estes arquivos só são lidos pelo
+script migrar_prescricoes.py
+
+Há dois formatos: o prescricoes.json original (uma lista JSON de
+prescrições) e o log append-only prescricoes.log que o substituiu (uma
+operação JSON por linha: criar, status ou deletar). Os leitores abaixo
+percorrem o arquivo de forma incremental, a partir de um offset em bytes,
+sem carregá-lo inteiro na memória.
 """
+import codecs
 import json
 import os
-from datetime import datetime
 
 # Usar caminho absoluto baseado no diretório do arquivo
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 PRESCRICOES_FILE = os.path.join(BASE_DIR, 'prescricoes.json')
+PRESCRICOES_LOG = os.path.join(BASE_DIR, 'prescricoes.log')
+
+OP_CRIAR = 'criar'
+OP_STATUS = 'status'
+OP_DELETAR = 'deletar'
+
+TAMANHO_BLOCO = 64 * 1024
+
+
+def ler_array_json(arquivo, offset):
+    """
+    Percorre um arquivo no formato [ {...}, {...} ] um elemento por vez.
+    Gera (operação, offset em bytes logo após o elemento).
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    arquivo.seek(offset)
+    texto = ''
+    fim_arquivo = False
 
-class PrescricaoStorage:
-    """Gerencia prescrições em arquivo JSON"""
-    
-    @staticmethod
-    def _load_prescricoes():
-        """Carrega prescrições do arquivo"""
-        if os.path.exists(PRESCRICOES_FILE):
+    while True:
+        # Separadores entre elementos são ASCII: um byte por caractere
+        sem_separadores = texto.lstrip(' \t\r\n,[')
+        offset += len(texto) - len(sem_separadores)
+        texto = sem_separadores
+        if texto.startswith(']'):
+            return
+        if texto:
             try:
-                with open(PRESCRICOES_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
-    
-    @staticmethod
-    def _save_prescricoes(prescricoes):
-        """Salva prescrições no arquivo"""
-        with open(PRESCRICOES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(prescricoes, f, ensure_ascii=False, indent=2)
-    
-    @staticmethod
-    def criar_prescricao(data):
-        """Cria uma nova prescrição"""
-        prescricoes = PrescricaoStorage._load_prescricoes()
-        
-        # Gerar ID
-        novo_id = max([p.get('id', 0) for p in prescricoes], default=0) + 1
-        
-        # Criar prescrição
-        prescricao = {
-            'id': novo_id,
-            'cpf_cliente': data.get('cpf_cliente'),
-            'id_pet': data.get('id_pet'),
-            'veterinario': data.get('veterinario'),
-            'veterinario_id': data.get('veterinario_id'),
-            'data_consulta': data.get('data_consulta'),
-            'diagnostico': data.get('diagnostico'),
-            'medicamentos': data.get('medicamentos', []),
-            'orientacoes_gerais': data.get('orientacoes_gerais', ''),
-            'retorno': data.get('retorno'),
-            'status': 'ativa',
-            'created_at': datetime.now().isoformat()
-        }
-        
-        prescricoes.append(prescricao)
-        PrescricaoStorage._save_prescricoes(prescricoes)
-        
-        return prescricao
-    
-    @staticmethod
-    def listar_por_pet(id_pet):
-        """Lista prescrições de um pet"""
-        prescricoes = PrescricaoStorage._load_prescricoes()
-        return [p for p in prescricoes if p.get('id_pet') == id_pet]
-    
-    @staticmethod
-    def buscar_por_id(prescricao_id):
-        """Busca prescrição por ID"""
-        prescricoes = PrescricaoStorage._load_prescricoes()
-        for p in prescricoes:
-            if p.get('id') == prescricao_id:
-                return p
-        return None
-    
-    @staticmethod
-    def atualizar_status(prescricao_id, novo_status):
-        """Atualiza status da prescrição"""
-        prescricoes = PrescricaoStorage._load_prescricoes()
-        for p in prescricoes:
-            if p.get('id') == prescricao_id:
-                p['status'] = novo_status
-                PrescricaoStorage._save_prescricoes(prescricoes)
-                return p
-        return None
+                elemento, fim = decoder.raw_decode(texto)
+            except json.JSONDecodeError:
+                if fim_arquivo:
+                    raise
+            else:
+                consumido = texto[:fim]
+                texto = texto[fim:]
+                offset += len(consumido.encode('utf-8'))
+                yield {'op': OP_CRIAR, 'dados': elemento}, offset
+                continue
+        elif fim_arquivo:
+            return
+
+        bloco = arquivo.read(TAMANHO_BLOCO)
+        fim_arquivo = not bloco
+        texto += utf8.decode(bloco, final=fim_arquivo)
+
+
+def ler_log(arquivo, offset):
+    """Percorre o log append-only (uma operação JSON por linha)"""
+    arquivo.seek(offset)
+    for linha in arquivo:
+        if not linha.endswith(b'\n'):
+            return
+        offset += len(linha)
+        yield json.loads(linha), offset
+
+
+def abrir_leitor(arquivo, offset):
+    """Escolhe o leitor conforme o primeiro caractere do arquivo (aberto em modo binário)"""
+    arquivo.seek(0)
+    inicio = arquivo.read(TAMANHO_BLOCO).lstrip()
+    if inicio.startswith(b'['):
+        return ler_array_json(arquivo, offset)
+    return ler_log(arquivo, offset)
@@ -0,0 +1,155 @@
+"""
+Referência - dados de referência carregados na inicialização e servidos da memória
+
+Tabelas pequenas e quase imutáveis (grupos de usuário, diretório de
+veterinários) e listas fixas (tipos de vacinas) são catálogos: cada um é
+carregado uma vez por clínica e guardado com
+
+- as linhas, na ordem do carregamento
+- um índice dict pela coluna `chave`, para buscas O(1)
+- o corpo JSON já serializado (e o seu ETag) das rotas GET do catálogo
+
+Um catálogo lido do banco é recarregado quando um commit deste processo
+escreve em uma das suas `tabelas` (versões do cache de resultados, ver
+app/cache.py), quando passa de Config.REFERENCIA_TTL segundos (escritas de
+outros processos) ou por invalidar(). Enquanto uma thread recarrega, as
+demais continuam lendo a versão anterior; se a recarga falhar (banco fora
+do ar), a versão anterior segue em uso.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from app.config import Config
+from app.database import Database
+
+logger = logging.getLogger(__name__)
+
+# nome -> Catalogo
+_CATALOGOS = {}
+
+
+class _Estado:
+    """Um carregamento do catálogo em uma clínica"""
+
+    __slots__ = ('linhas', 'indice', 'corpo', 'etag', 'versoes', 'carregado_em')
+
+    def __init__(self, linhas, indice, corpo, versoes):
+        self.linhas = linhas
+        self.indice = indice
+        self.corpo = corpo
+        self.etag = hashlib.sha1(corpo).hexdigest()[:16]
+        self.versoes = versoes
+        self.carregado_em = time.monotonic()
+
+
+class Catalogo:
+    """
+    Catálogo de dados de referência
+
+    Args:
+        nome (str): nome único (invalidar(nome))
+        carregar (callable): retorna a lista de linhas (dicts ou objetos Linha)
+        chave (str): coluna do índice de buscar(); None sem índice
+        tabelas (tuple): tabelas lidas por `carregar`; vazio para listas fixas,
+            carregadas uma única vez e iguais em todas as clínicas
+        serializar (callable): linhas -> objeto do corpo JSON das rotas GET
+    """
+
+    __slots__ = ('nome', 'carregar', 'chave', 'tabelas', 'serializar', '_estados', '_lock')
+
+    def __init__(self, nome, carregar, chave=None, tabelas=(), serializar=None):
+        if nome in _CATALOGOS:
+            raise ValueError(f"Catálogo já registrado: {nome}")
+        self.nome = nome
+        self.carregar = carregar
+        self.chave = chave
+        self.tabelas = tuple(tabelas)
+        self.serializar = serializar or (lambda linhas: linhas)
+        self._estados = {}
+        self._lock = threading.Lock()
+        _CATALOGOS[nome] = self
+
+    def _clinica(self):
+        return Database.clinica_atual() if self.tabelas else None
+
+    def _valido(self, estado):
+        if not self.tabelas:
+            return True
+        return (estado.versoes == Database.versoes_tabelas(self.tabelas)
+                and time.monotonic() - estado.carregado_em <= Config.REFERENCIA_TTL)
+
+    def _recarregar(self, clinica):
+        # Versões de antes da leitura: um commit concorrente recarrega de novo
+        versoes = Database.versoes_tabelas(self.tabelas)
+        linhas = list(self.carregar())
+        indice = {}
+        if self.chave is not None:
+            for linha in linhas:
+                indice[linha[self.chave] if isinstance(linha, dict) else getattr(linha, self.chave)] = linha
+        corpo = json.dumps(self.serializar(linhas), ensure_ascii=False).encode('utf-8')
+        estado = self._estados[clinica] = _Estado(linhas, indice, corpo, versoes)
+        logger.info(f"Catálogo {self.nome} carregado ({clinica or 'todas as clínicas'}): {len(linhas)} linha(s)")
+        return estado
+
+    def estado(self):
+        """Carregamento válido da clínica atual (carrega ou recarrega se preciso)"""
+        clinica = self._clinica()
+        estado = self._estados.get(clinica)
+        if estado is not None and self._valido(estado):
+            return estado
+        # Já carregado: se outra thread está recarregando, serve a versão anterior
+        if not self._lock.acquire(blocking=estado is None):
+            return estado
+        try:
+            atual = self._estados.get(clinica)
+            if atual is not None and atual is not estado:
+                return atual  # recarregado enquanto esperávamos a trava
+            try:
+                return self._recarregar(clinica)
+            except Exception as e:
+                if estado is None:
+                    raise
+                logger.warning(f"Falha ao recarregar o catálogo {self.nome}, mantendo o anterior: {e}")
+                estado.carregado_em = time.monotonic()
+                return estado
+        finally:
+            self._lock.release()
+
+    def buscar(self, valor):
+        """Linha com chave == valor ou None (dicts são devolvidos em cópia)"""
+        linha = self.estado().indice.get(valor)
+        return dict(linha) if isinstance(linha, dict) else linha
+
+    def linhas(self):
+        """Todas as linhas (lista nova; dicts em cópia, objetos Linha são imutáveis)"""
+        return [dict(linha) if isinstance(linha, dict) else linha for linha in self.estado().linhas]
+
+    def invalidar(self):
+        """Descarta os carregamentos: o próximo acesso em cada clínica recarrega"""
+        self._estados.clear()
+
+
+def catalogo(nome):
+    """Catálogo registrado com esse nome"""
+    return _CATALOGOS[nome]
+
+
+def invalidar(nome=None):
+    """Invalida um catálogo (ou todos), ex.: após alterar a tabela por fora da aplicação"""
+    for item in ([_CATALOGOS[nome]] if nome else _CATALOGOS.values()):
+        item.invalidar()
+
+
+def carregar_todos():
+    """Carrega todos os catálogos em todas as clínicas (inicialização da aplicação)"""
+    for clinica in Database.clinicas():
+        with Database.usar_clinica(clinica):
+            for item in _CATALOGOS.values():
+                try:
+                    item.estado()
+                except Exception as e:
+                    logger.warning(f"⚠ Catálogo {item.nome} não carregado na clínica {clinica}: {e}")
@@ -0,0 +1,56 @@
+"""
+Respostas - Corpo JSON das rotas servidas tanto pelo Flask (app/routes.py)
+quanto pelas rotas assíncronas do modo ASGI (app/asgi.py)
+
+COLUNAS_* são as projeções que cada rota pede ao model: só as colunas
+usadas na resposta são lidas do banco (ver app/linhas.py)
+"""
+
+COLUNAS_CONSULTAS_DO_PET = ('ID_PROCEDIMENTO', 'DATA_CONSULTA', 'NOME_VET', 'CRMV', 'VALOR')
+COLUNAS_VACINAS_DO_PET = ('NOME', 'DOSE', 'DATA_APLICADO')
+
+
+def consultas_do_pet(pet_id, consultas):
+    """GET /consultas/<pet_id>"""
+    consultas_formatadas = []
+    for consulta in consultas:
+        consultas_formatadas.append({
+            'id': consulta.ID_PROCEDIMENTO,
+            'data_consulta': str(consulta.DATA_CONSULTA),
+            'veterinario': consulta.NOME_VET,
+            'crmv': consulta.CRMV,
+            'valor': float(consulta.VALOR) if consulta.VALOR else 0,
+            'status': 'agendada'
+        })
+
+    return {
+        'pet_id': pet_id,
+        'total_consultas': len(consultas_formatadas),
+        'consultas': consultas_formatadas
+    }
+
+
+def vacinas_do_pet(pet_id, vacinas):
+    """GET /historico/<pet_id>/vacinas"""
+    vacinas_formatadas = []
+    for vacina in vacinas:
+        vacinas_formatadas.append({
+            'nome_vacina': vacina.NOME,
+            'dose': vacina.DOSE,
+            'data_aplicacao': str(vacina.DATA_APLICADO)
+        })
+
+    return {
+        'pet_id': pet_id,
+        'total_vacinas': len(vacinas_formatadas),
+        'vacinas': vacinas_formatadas
+    }
+
+
+def consultas_do_dia(data_consulta, consultas):
+    """GET /consultas_dia/<data>"""
+    return {
+        'data': data_consulta,
+        'total': len(consultas),
+        'consultas': consultas
+    }
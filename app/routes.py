@@ -1,8 +1,11 @@
 from flask import render_template, request, jsonify, current_app as app, send_from_directory
-from app.models import Usuario, GrupoUsuario, Cliente, Pet, Veterinario, Consulta, Vacina
-from app.auth import create_token, token_required, require_vet, require_client, role_required
-from app.database import Database
-from app.prescricao_storage import PrescricaoStorage
+from app.models import (Usuario, GrupoUsuario, Cliente, Pet, Veterinario, Consulta, Vacina, Prescricao,
+                        RegistroDuplicado, VacinacaoInvalida)
+from app.auth import create_token, token_required, require_vet, require_client, require_admin, role_required
+from app.config import Config
+from app.database import Database, ColunaDesconhecida
+from app.prazo import com_prazo
+from app import referencia, respostas
 from mysql.connector import Error
 import logging
 
@@ -22,6 +25,7 @@ def serve_static(path):
 # ========== AUTENTICAÇÃO ==========
 
 @app.route('/login', methods=['POST'])
+@com_prazo(3.0)
 def login():
     """Login de usuário com autenticação JWT"""
     try:
@@ -52,16 +56,16 @@ def login():
         
         # Se for cliente, buscar dados do pet
         if usuario['TIPO_ACESSO'] == 'Cliente':
-            cliente = Cliente.find_by_id(usuario['ID_USUARIO'])
+            cliente = Cliente.find_by_id(usuario['ID_USUARIO'], ('ID_PET', 'CPF'))
             if cliente:
-                user_response['pet_id'] = cliente['ID_PET']
-                user_response['cpf'] = cliente['CPF']
+                user_response['pet_id'] = cliente.ID_PET
+                user_response['cpf'] = cliente.CPF
         
         # Se for veterinário, buscar CRMV
         elif usuario['TIPO_ACESSO'] == 'Veterinario':
-            vet = Veterinario.find_by_usuario_id(usuario['ID_USUARIO'])
+            vet = Veterinario.find_by_usuario_id(usuario['ID_USUARIO'], ('CRMV',))
             if vet:
-                user_response['crmv'] = vet['CRMV']
+                user_response['crmv'] = vet.CRMV
         
         return jsonify({
             'message': 'Login realizado com sucesso',
@@ -91,10 +95,6 @@ def cadastro():
         if data['senha'] != data['confirmar_senha']:
             return jsonify({'message': 'Senhas não coincidem'}), 400
         
-        # Verificar se email já existe
-        if Usuario.exists(data['email']):
-            return jsonify({'message': 'Email já cadastrado'}), 400
-        
         # Buscar grupo de usuário Cliente
         grupo_cliente = GrupoUsuario.find_by_tipo('Cliente')
         if not grupo_cliente:
@@ -109,28 +109,19 @@ def cadastro():
         except:
             idade = 0
         
-        # Criar pet primeiro (precisamos do ID para criar o cliente)
-        pet_id = Pet.create(
-            nome=data['nome_pet'],
-            raca=data['raca_pet'],
-            idade=idade,
-            observacoes=data.get('observacoes_pet', '')
-        )
-        
-        # Criar usuário (a senha será automaticamente hasheada pelo trigger)
-        usuario_id = Usuario.create(
+        # Usuário, pet e cliente em uma única transação; o email repetido é
+        # barrado pelo índice único UK_USUARIO_EMAIL (a senha é hasheada pelo trigger)
+        usuario_id, pet_id = Cliente.cadastrar(
             nome_completo=data['nome_tutor'],
             email=data['email'],
             senha=data['senha'],
-            grupo_usuario_id=grupo_cliente['ID_ACESSO']
-        )
-        
-        # Criar cliente
-        Cliente.create(
-            usuario_id=usuario_id,
-            telefone=data.get('telefone', ''),
+            grupo_usuario_id=grupo_cliente['ID_ACESSO'],
             cpf=data['cpf'].replace('.', '').replace('-', ''),
-            id_pet=pet_id
+            telefone=data.get('telefone', ''),
+            nome_pet=data['nome_pet'],
+            raca_pet=data['raca_pet'],
+            idade_pet=idade,
+            observacoes_pet=data.get('observacoes_pet', '')
         )
         
         return jsonify({
@@ -139,6 +130,8 @@ def cadastro():
             'pet_id': pet_id
         }), 201
         
+    except RegistroDuplicado as e:
+        return jsonify({'message': str(e)}), 400
     except Error as e:
         logger.error(f"Erro no cadastro: {e}")
         return jsonify({'message': f'Erro ao realizar cadastro: {str(e)}'}), 500
@@ -159,10 +152,6 @@ def cadastro_vet():
         if data['senha'] != data['confirmar_senha']:
             return jsonify({'message': 'Senhas não coincidem'}), 400
         
-        # Verificar se email já existe
-        if Usuario.exists(data['email']):
-            return jsonify({'message': 'Email já cadastrado'}), 400
-        
         # Buscar grupo de usuário Veterinário
         grupo_vet = GrupoUsuario.find_by_tipo('Veterinario')
         if not grupo_vet:
@@ -180,18 +169,14 @@ def cadastro_vet():
         except ValueError:
             return jsonify({'message': 'CRMV inválido'}), 400
         
-        # Criar usuário (a senha será automaticamente hasheada pelo trigger)
-        usuario_id = Usuario.create(
+        # Usuário e veterinário em uma única transação (email e CRMV
+        # repetidos são barrados pelas chaves únicas)
+        Veterinario.cadastrar(
             nome_completo=data['nome_completo'],
             email=data['email'],
             senha=data['senha'],
-            grupo_usuario_id=grupo_vet['ID_ACESSO']
-        )
-        
-        # Criar veterinário
-        Veterinario.create(
+            grupo_usuario_id=grupo_vet['ID_ACESSO'],
             crmv=crmv_int,
-            usuario_id=usuario_id,
             salario=data.get('salario'),
             turno=data.get('turno')
         )
@@ -201,11 +186,14 @@ def cadastro_vet():
             'crmv': data['crmv']
         }), 201
         
+    except RegistroDuplicado as e:
+        return jsonify({'message': str(e)}), 400
     except Error as e:
         logger.error(f"Erro no cadastro de veterinário: {e}")
         return jsonify({'message': f'Erro ao realizar cadastro: {str(e)}'}), 500
 
 @app.route('/esqueceu_senha', methods=['POST'])
+@com_prazo(3.0)
 def esqueceu_senha():
     """Redefinir senha do usuário"""
     try:
@@ -242,13 +230,13 @@ def buscar_pet_por_cpf(cpf):
     """Buscar dados do pet por CPF do cliente (para veterinários)"""
     try:
         # Buscar cliente por CPF
-        cliente = Cliente.find_by_cpf(cpf)
+        cliente = Cliente.find_by_cpf(cpf, ('ID_PET', 'NOME_COMPLETO', 'EMAIL', 'TELEFONE'))
         
         if not cliente:
             return jsonify({'message': 'Cliente não encontrado com este CPF'}), 404
         
         # Buscar dados completos do pet
-        pet = Pet.find_by_id(cliente['ID_PET'])
+        pet = Pet.find_by_id(cliente.ID_PET)
         
         if not pet:
             return jsonify({'message': 'Pet não encontrado'}), 404
@@ -256,22 +244,22 @@ def buscar_pet_por_cpf(cpf):
         # Calcular data de nascimento aproximada a partir da idade
         from datetime import datetime, timedelta
         datanascimento = None
-        if pet['IDADE']:
-            anos = int(pet['IDADE'])
-            dias = int((pet['IDADE'] - anos) * 365)
+        if pet.IDADE:
+            anos = int(pet.IDADE)
+            dias = int((pet.IDADE - anos) * 365)
             data_aproximada = datetime.now() - timedelta(days=(anos * 365 + dias))
             datanascimento = data_aproximada.strftime('%Y-%m-%d')
         
         pet_data = {
-            'id_pet': pet['ID_PET'],
-            'nome_pet': pet['NOME'],
-            'raca_pet': pet['RACA'],
-            'idade': float(pet['IDADE']) if pet['IDADE'] else 0,
+            'id_pet': pet.ID_PET,
+            'nome_pet': pet.NOME,
+            'raca_pet': pet.RACA,
+            'idade': float(pet.IDADE) if pet.IDADE else 0,
             'datanascimento': datanascimento,
-            'observacoes_pet': pet['OBSERVACOES'] if pet['OBSERVACOES'] else 'Nenhuma',
-            'tutor_nome': cliente['NOME_COMPLETO'],
-            'tutor_email': cliente['EMAIL'],
-            'tutor_telefone': cliente.get('TELEFONE', ''),
+            'observacoes_pet': pet.OBSERVACOES if pet.OBSERVACOES else 'Nenhuma',
+            'tutor_nome': cliente.NOME_COMPLETO,
+            'tutor_email': cliente.EMAIL,
+            'tutor_telefone': cliente.TELEFONE or '',
             'cpf': cpf
         }
         
@@ -295,34 +283,34 @@ def dados_pet():
             return jsonify({'message': 'Pet não encontrado'}), 404
         
         # Buscar consultas do pet
-        consultas = Consulta.find_by_pet(pet['ID_PET'])
+        consultas = Consulta.find_by_pet(pet.ID_PET, ('DATA_CONSULTA', 'NOME_VET', 'VALOR'))
         
         # Formatar consultas
         servicos_agendados = []
         for consulta in consultas:
             servicos_agendados.append({
                 'servico': 'Consulta Veterinária',
-                'data': str(consulta['DATA_CONSULTA']),
-                'veterinario': consulta['NOME_VET'],
-                'valor': float(consulta['VALOR']) if consulta['VALOR'] else 0
+                'data': str(consulta.DATA_CONSULTA),
+                'veterinario': consulta.NOME_VET,
+                'valor': float(consulta.VALOR) if consulta.VALOR else 0
             })
         
         # Calcular data de nascimento aproximada a partir da idade
         from datetime import datetime, timedelta
         datanascimento = None
-        if pet['IDADE']:
-            anos = int(pet['IDADE'])
-            dias = int((pet['IDADE'] - anos) * 365)
+        if pet.IDADE:
+            anos = int(pet.IDADE)
+            dias = int((pet.IDADE - anos) * 365)
             data_aproximada = datetime.now() - timedelta(days=(anos * 365 + dias))
             datanascimento = data_aproximada.strftime('%Y-%m-%d')
         
         pet_data = {
-            'id_pet': pet['ID_PET'],
-            'nome_pet': pet['NOME'],
-            'raca_pet': pet['RACA'],
-            'idade': float(pet['IDADE']) if pet['IDADE'] else 0,
+            'id_pet': pet.ID_PET,
+            'nome_pet': pet.NOME,
+            'raca_pet': pet.RACA,
+            'idade': float(pet.IDADE) if pet.IDADE else 0,
             'datanascimento': datanascimento,
-            'observacoes_pet': pet['OBSERVACOES'] if pet['OBSERVACOES'] else 'Nenhuma',
+            'observacoes_pet': pet.OBSERVACOES if pet.OBSERVACOES else 'Nenhuma',
             'servicos_agendados': servicos_agendados
         }
         
@@ -335,26 +323,14 @@ def dados_pet():
 @app.route('/consultas/<int:pet_id>', methods=['GET'])
 @token_required
 def listar_consultas_pet(pet_id):
-    """Listar consultas agendadas de um pet"""
+    """Listar consultas de um pet (?historico=completo inclui os anos arquivados)"""
     try:
-        consultas = Consulta.find_by_pet(pet_id)
-        
-        consultas_formatadas = []
-        for consulta in consultas:
-            consultas_formatadas.append({
-                'id': consulta['ID_PROCEDIMENTO'],
-                'data_consulta': str(consulta['DATA_CONSULTA']),
-                'veterinario': consulta['NOME_VET'],
-                'crmv': consulta['CRMV'],
-                'valor': float(consulta['VALOR']) if consulta['VALOR'] else 0,
-                'status': 'agendada'
-            })
+        consultas = Consulta.find_by_pet(
+            pet_id, respostas.COLUNAS_CONSULTAS_DO_PET,
+            historico_completo=request.args.get('historico') == 'completo'
+        )
         
-        return jsonify({
-            'pet_id': pet_id,
-            'total_consultas': len(consultas_formatadas),
-            'consultas': consultas_formatadas
-        }), 200
+        return jsonify(respostas.consultas_do_pet(pet_id, consultas)), 200
         
     except Error as e:
         logger.error(f"Erro ao listar consultas: {e}")
@@ -363,28 +339,40 @@ def listar_consultas_pet(pet_id):
 @app.route('/historico/<int:pet_id>/vacinas', methods=['GET'])
 @token_required
 def listar_vacinas_pet(pet_id):
-    """Ver histórico de vacinas do pet (usa VIEW HISTORICO_VACINA)"""
+    """Ver histórico de vacinas do pet (PET_VACINA)"""
     try:
-        vacinas = Vacina.get_historico_pet(pet_id)
-        
-        vacinas_formatadas = []
-        for vacina in vacinas:
-            vacinas_formatadas.append({
-                'nome_vacina': vacina['NOME'],
-                'dose': vacina['DOSE'],
-                'data_aplicacao': str(vacina['DATA_APLICADO'])
-            })
+        vacinas = Vacina.get_historico_pet(pet_id, respostas.COLUNAS_VACINAS_DO_PET)
         
-        return jsonify({
-            'pet_id': pet_id,
-            'total_vacinas': len(vacinas_formatadas),
-            'vacinas': vacinas_formatadas
-        }), 200
+        return jsonify(respostas.vacinas_do_pet(pet_id, vacinas)), 200
         
     except Error as e:
         logger.error(f"Erro ao listar vacinas: {e}")
         return jsonify({'message': 'Erro ao listar vacinas'}), 500
 
+def _resposta_catalogo(nome):
+    """Corpo JSON já serializado do catálogo, com ETag (304 se não mudou)"""
+    estado = referencia.catalogo(nome).estado()
+    resposta = app.response_class(estado.corpo, mimetype='application/json')
+    resposta.set_etag(estado.etag)
+    return resposta.make_conditional(request)
+
+@app.route('/vacinas/tipos', methods=['GET'])
+@token_required
+def listar_tipos_vacinas():
+    """Tipos de vacinas disponíveis (catálogo em memória)"""
+    return _resposta_catalogo('tipos_vacinas')
+
+@app.route('/veterinarios', methods=['GET'])
+@token_required
+def listar_veterinarios():
+    """Diretório de veterinários da clínica (catálogo em memória)"""
+    try:
+        return _resposta_catalogo('veterinarios')
+        
+    except Error as e:
+        logger.error(f"Erro ao listar veterinários: {e}")
+        return jsonify({'message': 'Erro ao listar veterinários'}), 500
+
 # ========== ROTAS DO VETERINÁRIO ==========
 
 @app.route('/agendamentos', methods=['POST'])
@@ -402,14 +390,14 @@ def criar_agendamento():
         
         # Buscar cliente por CPF
         cpf_limpo = data['cpf_cliente'].replace('.', '').replace('-', '')
-        cliente = Cliente.find_by_cpf(cpf_limpo)
+        cliente = Cliente.find_by_cpf(cpf_limpo, ('ID_PET', 'NOME_PET', 'NOME_COMPLETO'))
         
         if not cliente:
             return jsonify({'message': 'Cliente não encontrado'}), 404
         
         # Buscar veterinário logado
         usuario_id = request.user['user_id']
-        vet = Veterinario.find_by_usuario_id(usuario_id)
+        vet = Veterinario.find_by_usuario_id(usuario_id, ('CRMV',))
         
         if not vet:
             return jsonify({'message': 'Veterinário não encontrado'}), 404
@@ -418,16 +406,16 @@ def criar_agendamento():
         consulta_id = Consulta.create(
             data_consulta=data['data_agendamento'],
             valor=data['valor'],
-            id_pet=cliente['ID_PET'],
-            crmv=vet['CRMV']
+            id_pet=cliente.ID_PET,
+            crmv=vet.CRMV
         )
         
         return jsonify({
             'message': f'Agendamento criado com sucesso',
             'consulta_id': consulta_id,
             'data': data['data_agendamento'],
-            'pet': cliente['NOME_PET'],
-            'cliente': cliente['NOME_COMPLETO']
+            'pet': cliente.NOME_PET,
+            'cliente': cliente.NOME_COMPLETO
         }), 201
         
     except Error as e:
@@ -436,17 +424,14 @@ def criar_agendamento():
 
 @app.route('/consultas_dia/<data_consulta>', methods=['GET'])
 @require_vet
+@com_prazo(5.0)
 def consultas_do_dia(data_consulta):
     """Listar consultas do dia (usa PROCEDURE listar_consultas)"""
     try:
         # Chamar a procedure
         consultas = Database.call_procedure('listar_consultas', (data_consulta,))
         
-        return jsonify({
-            'data': data_consulta,
-            'total': len(consultas),
-            'consultas': consultas
-        }), 200
+        return jsonify(respostas.consultas_do_dia(data_consulta, consultas)), 200
         
     except Error as e:
         logger.error(f"Erro ao listar consultas do dia: {e}")
@@ -474,7 +459,7 @@ def criar_vacina():
         
         # Se foi informado o pet_id, vincular a vacina ao pet
         if data.get('pet_id'):
-            Pet.add_vacina(data['pet_id'], vacina_id)
+            Pet.add_vacina(data['pet_id'], vacina_id, data['data_aplicacao'])
         
         return jsonify({
             'message': 'Vacina registrada com sucesso',
@@ -485,6 +470,62 @@ def criar_vacina():
         logger.error(f"Erro ao criar vacina: {e}")
         return jsonify({'message': f'Erro ao criar vacina: {str(e)}'}), 500
 
+@app.route('/vacinas/lote', methods=['POST'])
+@require_vet
+def criar_vacinas_lote():
+    """
+    Registrar vacinas aplicadas em vários pets de uma vez (Veterinário)
+    
+    Body: {"vacinas": [{"nome_vacina", "dose", "data_aplicacao", "pet_ids": [...]}, ...]}
+    Todas as aplicações são gravadas em uma transação: se um pet não
+    existir, nada é registrado.
+    """
+    try:
+        data = request.get_json() or {}
+        vacinas = data.get('vacinas')
+        if not isinstance(vacinas, list) or not vacinas:
+            return jsonify({'message': 'Campo vacinas é obrigatório'}), 400
+        
+        # Validar cada vacina do lote
+        lote = []
+        campos_obrigatorios = ['nome_vacina', 'dose', 'data_aplicacao']
+        for indice, vacina in enumerate(vacinas):
+            if not isinstance(vacina, dict):
+                return jsonify({'message': f'Vacina {indice} inválida'}), 400
+            for campo in campos_obrigatorios:
+                if not vacina.get(campo):
+                    return jsonify({'message': f'Campo {campo} é obrigatório (vacina {indice})'}), 400
+            pet_ids = vacina.get('pet_ids')
+            if (not isinstance(pet_ids, list) or not pet_ids
+                    or not all(isinstance(pet_id, int) and not isinstance(pet_id, bool) for pet_id in pet_ids)):
+                return jsonify({'message': f'Campo pet_ids deve ser uma lista de ids (vacina {indice})'}), 400
+            lote.append({
+                'nome': vacina['nome_vacina'],
+                'dose': vacina['dose'],
+                'data_aplicado': vacina['data_aplicacao'],
+                'pet_ids': pet_ids
+            })
+        
+        total = sum(len(vacina['pet_ids']) for vacina in lote)
+        if total > Config.VACINAS_LOTE_MAX:
+            return jsonify({
+                'message': f'Máximo de {Config.VACINAS_LOTE_MAX} aplicações por requisição'
+            }), 400
+        
+        result = Vacina.registrar_lote(lote)
+        
+        return jsonify({
+            'message': 'Vacinas registradas com sucesso',
+            'vacina_ids': result['vacinas'],
+            'total_aplicacoes': result['aplicacoes']
+        }), 201
+        
+    except VacinacaoInvalida as e:
+        return jsonify({'message': str(e)}), 400
+    except Error as e:
+        logger.error(f"Erro ao registrar lote de vacinas: {e}")
+        return jsonify({'message': 'Erro ao registrar lote de vacinas'}), 500
+
 @app.route('/vacinas/<int:vacina_id>', methods=['GET'])
 @token_required
 def detalhes_vacina(vacina_id):
@@ -495,7 +536,7 @@ def detalhes_vacina(vacina_id):
         if not vacina:
             return jsonify({'message': 'Vacina não encontrada'}), 404
         
-        return jsonify(vacina), 200
+        return jsonify(vacina.como_dict()), 200
         
     except Error as e:
         logger.error(f"Erro ao buscar vacina: {e}")
@@ -520,6 +561,8 @@ def atualizar_vacina(vacina_id):
             'message': 'Vacina atualizada com sucesso'
         }), 200
         
+    except ColunaDesconhecida as e:
+        return jsonify({'message': f'Campo inválido: {e}'}), 400
     except Error as e:
         logger.error(f"Erro ao atualizar vacina: {e}")
         return jsonify({'message': 'Erro ao atualizar vacina'}), 500
@@ -539,7 +582,33 @@ def deletar_vacina(vacina_id):
         logger.error(f"Erro ao deletar vacina: {e}")
         return jsonify({'message': 'Erro ao deletar vacina'}), 500
 
-# ========== ROTAS DE PRESCRIÇÃO (Mantidas como estavam - podem ser expandidas depois) ==========
+# ========== ROTAS DE PRESCRIÇÃO ==========
+
+def _formatar_prescricao(prescricao, medicamentos):
+    """Monta a prescrição no formato JSON usado pelo front-end"""
+    return {
+        'id': prescricao['ID_PRESCRICAO'],
+        'cpf_cliente': str(prescricao['CPF_CLIENTE']),
+        'id_pet': prescricao['ID_PET'],
+        'veterinario': prescricao['VETERINARIO'],
+        'veterinario_id': prescricao['ID_VETERINARIO'],
+        'data_consulta': str(prescricao['DATA_CONSULTA']) if prescricao['DATA_CONSULTA'] else None,
+        'diagnostico': prescricao['DIAGNOSTICO'],
+        'medicamentos': [
+            {
+                'nome': med['NOME'],
+                'dosagem': med['DOSAGEM'],
+                'frequencia': med['FREQUENCIA'],
+                'duracao': med['DURACAO'],
+                'observacoes': med['OBSERVACOES']
+            }
+            for med in medicamentos
+        ],
+        'orientacoes_gerais': prescricao['ORIENTACOES_GERAIS'] or '',
+        'retorno': str(prescricao['RETORNO']) if prescricao['RETORNO'] else None,
+        'status': prescricao['STATUS'],
+        'created_at': prescricao['CREATED_AT'].isoformat() if prescricao['CREATED_AT'] else None
+    }
 
 @app.route('/prescricoes', methods=['POST'])
 @require_vet
@@ -558,21 +627,30 @@ def criar_prescricao():
         
         # Buscar cliente por CPF para pegar o ID do pet
         cpf_limpo = data['cpf_cliente'].replace('.', '').replace('-', '')
-        cliente = Cliente.find_by_cpf(cpf_limpo)
+        cliente = Cliente.find_by_cpf(cpf_limpo, ('ID_PET',))
         
         if not cliente:
             return jsonify({'error': 'Cliente não encontrado'}), 404
         
-        # Adicionar id_pet aos dados
-        data['id_pet'] = cliente['ID_PET']
-        data['veterinario_id'] = request.user.get('user_id')
-        
         # Salvar prescrição
-        prescricao = PrescricaoStorage.criar_prescricao(data)
+        prescricao_id = Prescricao.create(
+            id_pet=cliente.ID_PET,
+            cpf_cliente=cpf_limpo,
+            veterinario=data['veterinario'],
+            id_veterinario=request.user.get('user_id'),
+            data_consulta=data['data_consulta'],
+            diagnostico=data['diagnostico'],
+            medicamentos=data['medicamentos'],
+            orientacoes_gerais=data.get('orientacoes_gerais', ''),
+            retorno=data.get('retorno')
+        )
+        
+        prescricao = Prescricao.find_by_id(prescricao_id)
+        medicamentos = Prescricao.get_medicamentos(prescricao_id)
         
         return jsonify({
             'message': 'Prescrição criada com sucesso',
-            'prescricao': prescricao
+            'prescricao': _formatar_prescricao(prescricao, medicamentos)
         }), 201
         
     except Error as e:
@@ -584,18 +662,18 @@ def criar_prescricao():
 def listar_prescricoes_pet(pet_id):
     """Ver prescrições médicas do pet"""
     try:
-        prescricoes_raw = PrescricaoStorage.listar_por_pet(pet_id)
+        prescricoes = Prescricao.find_by_pet(pet_id)
         
         prescricoes_formatadas = []
-        for p in prescricoes_raw:
+        for p in prescricoes:
             prescricoes_formatadas.append({
-                'id': p['id'],
-                'diagnostico': p['diagnostico'],
-                'veterinario': p['veterinario'],
-                'data_consulta': p['data_consulta'],
-                'status': p['status'],
-                'medicamentos_count': len(p.get('medicamentos', [])),
-                'orientacoes_gerais': p.get('orientacoes_gerais', '')
+                'id': p['ID_PRESCRICAO'],
+                'diagnostico': p['DIAGNOSTICO'],
+                'veterinario': p['VETERINARIO'],
+                'data_consulta': str(p['DATA_CONSULTA']) if p['DATA_CONSULTA'] else None,
+                'status': p['STATUS'],
+                'medicamentos_count': p['TOTAL_MEDICAMENTOS'],
+                'orientacoes_gerais': p['ORIENTACOES_GERAIS'] or ''
             })
         
         return jsonify({
@@ -604,7 +682,7 @@ def listar_prescricoes_pet(pet_id):
             'prescricoes': prescricoes_formatadas
         }), 200
         
-    except Exception as e:
+    except Error as e:
         logger.error(f"Erro ao listar prescrições: {e}")
         return jsonify({'message': 'Erro ao listar prescrições'}), 500
 
@@ -613,14 +691,16 @@ def listar_prescricoes_pet(pet_id):
 def detalhes_prescricao(prescricao_id):
     """Ver detalhes de uma prescrição"""
     try:
-        prescricao = PrescricaoStorage.buscar_por_id(prescricao_id)
+        prescricao = Prescricao.find_by_id(prescricao_id)
         
         if not prescricao:
             return jsonify({'message': 'Prescrição não encontrada'}), 404
         
-        return jsonify(prescricao), 200
+        medicamentos = Prescricao.get_medicamentos(prescricao_id)
+        
+        return jsonify(_formatar_prescricao(prescricao, medicamentos)), 200
         
-    except Exception as e:
+    except Error as e:
         logger.error(f"Erro ao buscar prescrição: {e}")
         return jsonify({'message': 'Erro ao buscar prescrição'}), 500
 
@@ -634,20 +714,172 @@ def atualizar_prescricao(prescricao_id):
 @require_vet
 def finalizar_prescricao(prescricao_id):
     """Finalizar prescrição (Veterinário)"""
-    return jsonify({'message': 'Funcionalidade será implementada futuramente'}), 200
+    try:
+        if not Prescricao.find_by_id(prescricao_id):
+            return jsonify({'message': 'Prescrição não encontrada'}), 404
+        
+        Prescricao.update_status(prescricao_id, Prescricao.STATUS_FINALIZADA)
+        
+        prescricao = Prescricao.find_by_id(prescricao_id)
+        medicamentos = Prescricao.get_medicamentos(prescricao_id)
+        
+        return jsonify({
+            'message': 'Prescrição finalizada com sucesso',
+            'prescricao': _formatar_prescricao(prescricao, medicamentos)
+        }), 200
+        
+    except Error as e:
+        logger.error(f"Erro ao finalizar prescrição: {e}")
+        return jsonify({'message': 'Erro ao finalizar prescrição'}), 500
 
 @app.route('/prescricoes/<int:prescricao_id>', methods=['DELETE'])
 @require_vet
 def deletar_prescricao(prescricao_id):
     """Deletar prescrição (Veterinário)"""
-    return jsonify({'message': 'Funcionalidade será implementada futuramente'}), 200
+    try:
+        result = Prescricao.delete(prescricao_id)
+        
+        if result['affected_rows'] == 0:
+            return jsonify({'message': 'Prescrição não encontrada'}), 404
+        
+        return jsonify({
+            'message': f'Prescrição {prescricao_id} removida com sucesso'
+        }), 200
+        
+    except Error as e:
+        logger.error(f"Erro ao deletar prescrição: {e}")
+        return jsonify({'message': 'Erro ao deletar prescrição'}), 500
+
+@app.route('/medicamentos/<path:nome_medicamento>/prescricoes', methods=['GET'])
+@require_vet
+@com_prazo(30.0)
+def prescricoes_por_medicamento(nome_medicamento):
+    """
+    Listar prescrições ativas que contêm um medicamento (Veterinário)
+    Usado em recalls de lote e checagem de interações.
+    Parâmetros: limite, cursor (último id da página anterior), data_inicio, data_fim
+    """
+    try:
+        from datetime import datetime
+        
+        try:
+            limite = min(int(request.args.get('limite', 50)), 200)
+            cursor = request.args.get('cursor')
+            cursor = int(cursor) if cursor else None
+        except ValueError:
+            return jsonify({'message': 'limite e cursor devem ser números inteiros'}), 400
+        
+        if limite < 1:
+            return jsonify({'message': 'limite deve ser maior que zero'}), 400
+        
+        datas = {}
+        for campo in ('data_inicio', 'data_fim'):
+            valor = request.args.get(campo)
+            if valor:
+                try:
+                    datas[campo] = datetime.strptime(valor, '%Y-%m-%d').date()
+                except ValueError:
+                    return jsonify({'message': f'{campo} deve estar no formato AAAA-MM-DD'}), 400
+        
+        prescricoes = Prescricao.find_ativas_por_medicamento(
+            nome_medicamento,
+            limite=limite,
+            apos_id=cursor,
+            data_inicio=datas.get('data_inicio'),
+            data_fim=datas.get('data_fim')
+        )
+        
+        prescricoes_formatadas = []
+        for p in prescricoes:
+            prescricoes_formatadas.append({
+                'id': p['ID_PRESCRICAO'],
+                'id_pet': p['ID_PET'],
+                'nome_pet': p['NOME_PET'],
+                'cpf_cliente': str(p['CPF_CLIENTE']),
+                'veterinario': p['VETERINARIO'],
+                'data_consulta': str(p['DATA_CONSULTA']) if p['DATA_CONSULTA'] else None,
+                'diagnostico': p['DIAGNOSTICO']
+            })
+        
+        proximo_cursor = None
+        if len(prescricoes_formatadas) == limite:
+            proximo_cursor = prescricoes_formatadas[-1]['id']
+        
+        return jsonify({
+            'medicamento': nome_medicamento,
+            'total': len(prescricoes_formatadas),
+            'prescricoes': prescricoes_formatadas,
+            'proximo_cursor': proximo_cursor
+        }), 200
+        
+    except Error as e:
+        logger.error(f"Erro ao buscar prescrições por medicamento: {e}")
+        return jsonify({'message': 'Erro ao buscar prescrições por medicamento'}), 500
+
+# ========== ADMINISTRAÇÃO (TODAS AS CLÍNICAS) ==========
+
+@app.route('/admin/consultas_dia/<data_consulta>', methods=['GET'])
+@require_admin
+@com_prazo(10.0)
+def consultas_do_dia_todas_clinicas(data_consulta):
+    """Consultas do dia em todas as clínicas (consulta os shards em paralelo)"""
+    try:
+        consultas = Consulta.find_by_data_todas_clinicas(data_consulta)
+        
+        return jsonify({
+            'data': data_consulta,
+            'clinicas': Database.clinicas(),
+            'total': len(consultas),
+            'consultas': [consulta.como_dict() for consulta in consultas]
+        }), 200
+        
+    except Error as e:
+        logger.error(f"Erro ao listar consultas de todas as clínicas: {e}")
+        return jsonify({'message': 'Erro ao listar consultas de todas as clínicas'}), 500
+
+@app.route('/admin/veterinarios', methods=['GET'])
+@require_admin
+@com_prazo(10.0)
+def veterinarios_todas_clinicas():
+    """Veterinários de todas as clínicas"""
+    try:
+        veterinarios = Veterinario.get_all_todas_clinicas(('CRMV', 'NOME_COMPLETO', 'EMAIL', 'TURNO'))
+        
+        return jsonify({
+            'total': len(veterinarios),
+            'veterinarios': [
+                {
+                    'clinica': vet.CLINICA,
+                    'crmv': vet.CRMV,
+                    'nome': vet.NOME_COMPLETO,
+                    'email': vet.EMAIL,
+                    'turno': vet.TURNO
+                }
+                for vet in veterinarios
+            ]
+        }), 200
+        
+    except Error as e:
+        logger.error(f"Erro ao listar veterinários de todas as clínicas: {e}")
+        return jsonify({'message': 'Erro ao listar veterinários de todas as clínicas'}), 500
+
+# ========== SAÚDE ==========
+
+@app.route('/health/live', methods=['GET'])
+def liveness():
+    """Liveness: o processo está respondendo (não consulta o banco)"""
+    return jsonify({'status': 'ok'}), 200
 
-# ========== ROTA DE TESTE ==========
+@app.route('/health/ready', methods=['GET'])
+def readiness():
+    """Readiness: último estado de saúde do banco, verificado em segundo plano"""
+    saude = Database.saude()
+    return jsonify(saude), 200 if saude['pronto'] else 503
 
 @app.route('/test_db', methods=['GET'])
 def test_database():
-    """Testar conexão com banco de dados"""
-    if Database.test_connection():
+    """Testar conexão com banco de dados (usa o estado em cache de /health/ready)"""
+    if Database.saude()['pronto']:
         return jsonify({'message': 'Conexão com banco de dados OK'}), 200
     else:
         return jsonify({'message': 'Erro na conexão com banco de dados'}), 500
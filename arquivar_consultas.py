@@ -0,0 +1,60 @@
+"""
+Script para arquivar as consultas dos anos fechados (app/arquivo_consultas.py)
+
+Em cada clínica (shard), leva as consultas anteriores aos anos quentes
+(CONSULTAS_ANOS_QUENTES) para ARQUIVO_CONSULTAS_DIR/<clinica>/consultas_<ano>.zip
+e as remove de CONSULTA. No MySQL remove em seguida as partições que
+ficaram vazias e cria as do ano atual e do próximo: rode pelo menos uma
+vez por ano (ex.: cron em janeiro). Pode rodar com a aplicação no ar e ser
+repetido: se for interrompido, a próxima execução continua de onde parou.
+
+Uso:
+    python arquivar_consultas.py [--status]
+"""
+
+import argparse
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from app import arquivo_consultas
+from app.config import Config
+from app.database import Database
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Arquiva as consultas dos anos fechados')
+    parser.add_argument('--status', action='store_true', help='só lista os anos a arquivar e os arquivados')
+    args = parser.parse_args()
+
+    inicio = arquivo_consultas.inicio_quente()
+    print(f"🗄️  Anos quentes: a partir de {inicio.isoformat()}")
+    try:
+        # Arquivamento é carga batch: não disputa conexões com a aplicação
+        with Database.usar_pool(Config.POOL_BATCH):
+            for clinica in Database.clinicas():
+                with Database.usar_clinica(clinica):
+                    anos = arquivo_consultas.anos_fechados_no_banco()
+                    arquivados = sorted(arquivo_consultas.anos_arquivados())
+                    print(f"🔄 Clínica {clinica}: {len(anos)} ano(s) a arquivar "
+                          f"(já arquivados: {', '.join(map(str, arquivados)) or 'nenhum'})")
+                    if args.status:
+                        for ano in anos:
+                            print(f"   - {ano}")
+                        continue
+                    for ano in anos:
+                        total = arquivo_consultas.arquivar_ano(ano)
+                        print(f"   ✓ {ano}: {total} consulta(s) em {arquivo_consultas.caminho(ano)}")
+                    for comando in arquivo_consultas.manter_particoes():
+                        print(f"   ✓ {comando}")
+    except Exception as e:
+        print(f"\n❌ Arquivamento interrompido: {e}")
+        print("   Corrija a causa e rode o script novamente para continuar.")
+        sys.exit(1)
+
+    if not args.status:
+        print("\n✅ Consultas arquivadas")
+
+
+if __name__ == '__main__':
+    main()
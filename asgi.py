@@ -0,0 +1,6 @@
+from app import create_app
+from app.asgi import criar_app_asgi
+
+# Servidor ASGI (rotas de leitura mais acessadas no event loop):
+#     uvicorn asgi:app --host 0.0.0.0 --port 5000
+app = criar_app_asgi(create_app())
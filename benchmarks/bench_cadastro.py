@@ -0,0 +1,156 @@
+"""
+Benchmark: cadastros por segundo no POST /cadastro sob concorrência
+
+Várias threads cadastram tutores e pets ao mesmo tempo, cada cadastro
+dentro de um contexto de requisição Flask. Compara o fluxo antigo
+(verificação do email, pet, usuário e cliente em chamadas e commits
+separados) com o cadastro em uma única transação (Cliente.cadastrar),
+mostrando checkouts do pool, round trips (consultas + commits) por
+cadastro e a vazão.
+
+No fim, N threads tentam cadastrar o mesmo email ao mesmo tempo: com o
+índice único UK_USUARIO_EMAIL exatamente um cadastro deve ser aceito.
+
+Grava usuários de teste no banco configurado no .env: use um banco de
+teste (ou DB_BACKEND=sqlite DB_SQLITE_PATH=/tmp/bench.db) com os grupos
+de usuário já criados (populate_db.py).
+
+Uso:
+    python benchmarks/bench_cadastro.py --threads 16 --cadastros 50
+"""
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.database import Database
+from app.models import Usuario, GrupoUsuario, Cliente, Pet
+
+# CPFs distintos entre execuções (CPF é UNIQUE em CLIENTE)
+_cpfs = itertools.count(random.randrange(10 ** 10, 9 * 10 ** 10, 10 ** 6))
+_lock_cpfs = threading.Lock()
+
+
+def dados_cadastro(email=None):
+    with _lock_cpfs:
+        cpf = next(_cpfs)
+    return {
+        'nome_tutor': 'Tutor Benchmark',
+        'cpf': str(cpf),
+        'email': email or f"bench-{uuid.uuid4().hex}@petcare.test",
+        'senha': 'senha123',
+        'confirmar_senha': 'senha123',
+        'telefone': '11999999999',
+        'nome_pet': 'Rex',
+        'raca_pet': 'SRD',
+        'datanascimento': '2020-01-01'
+    }
+
+
+def cadastro_separado(data):
+    """Fluxo anterior do /cadastro: cada passo com o seu round trip e commit"""
+    if Usuario.exists(data['email']):
+        return 400
+    grupo_cliente = GrupoUsuario.find_by_tipo('Cliente')
+    pet_id = Pet.create(data['nome_pet'], data['raca_pet'], 0, '')
+    usuario_id = Usuario.create(data['nome_tutor'], data['email'], data['senha'], grupo_cliente['ID_ACESSO'])
+    Cliente.create(usuario_id, data['telefone'], data['cpf'], pet_id)
+    return 201
+
+
+def cadastro_transacao(data):
+    """Fluxo atual do /cadastro"""
+    grupo_cliente = GrupoUsuario.find_by_tipo('Cliente')
+    Cliente.cadastrar(data['nome_tutor'], data['email'], data['senha'], grupo_cliente['ID_ACESSO'],
+                      data['cpf'], data['telefone'], data['nome_pet'], data['raca_pet'], 0, '')
+    return 201
+
+
+def tutor(app, cadastrar, cadastros, status):
+    for _ in range(cadastros):
+        data = dados_cadastro()
+        with app.test_request_context('/cadastro', method='POST'):
+            try:
+                status.append(cadastrar(data))
+            except Exception:
+                status.append(500)
+            app.do_teardown_request()
+
+
+def medir(app, cadastrar, threads, cadastros):
+    Database.estatisticas.update(checkouts=0, consultas=0, commits=0)
+    status = []
+
+    inicio = time.perf_counter()
+    trabalhadores = [
+        threading.Thread(target=tutor, args=(app, cadastrar, cadastros, status))
+        for _ in range(threads)
+    ]
+    for t in trabalhadores:
+        t.start()
+    for t in trabalhadores:
+        t.join()
+    duracao = time.perf_counter() - inicio
+
+    total = threads * cadastros
+    e = Database.estatisticas
+    return {
+        'checkouts': e['checkouts'] / total,
+        'round_trips': (e['consultas'] + e['commits']) / total,
+        'cadastros_s': total / duracao,
+        'erros': sum(1 for s in status if s != 201)
+    }
+
+
+def corrida_email(app, threads):
+    """Mesmo email enviado ao POST /cadastro por várias threads ao mesmo tempo"""
+    email = f"corrida-{uuid.uuid4().hex}@petcare.test"
+    largada = threading.Barrier(threads)
+    status = []
+
+    def tentar():
+        cliente = app.test_client()
+        data = dados_cadastro(email)
+        largada.wait()
+        status.append(cliente.post('/cadastro', json=data).status_code)
+
+    trabalhadores = [threading.Thread(target=tentar) for _ in range(threads)]
+    for t in trabalhadores:
+        t.start()
+    for t in trabalhadores:
+        t.join()
+    return status.count(201), status.count(400), len(status)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do cadastro de tutor e pet')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--cadastros', type=int, default=50, help='cadastros por thread')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if not GrupoUsuario.find_by_tipo('Cliente'):
+            print("❌ Grupo Cliente não encontrado: execute populate_db.py antes")
+            sys.exit(1)
+
+    print(f"{'modo':<22}{'checkouts/cad':>14}{'round trips/cad':>17}{'cadastros/s':>13}{'erros':>7}")
+    for nome, cadastrar in (('chamadas separadas', cadastro_separado), ('transação única', cadastro_transacao)):
+        r = medir(app, cadastrar, args.threads, args.cadastros)
+        print(f"{nome:<22}{r['checkouts']:>14.2f}{r['round_trips']:>17.2f}{r['cadastros_s']:>13.0f}{r['erros']:>7}")
+
+    aceitos, recusados, total = corrida_email(app, args.threads)
+    resultado = '✅' if aceitos == 1 and recusados == total - 1 else '❌'
+    print(f"\n{resultado} Mesmo email em {total} cadastros simultâneos: {aceitos} aceito(s), {recusados} recusado(s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: conexão por chamada x conexão reutilizada durante a requisição
+
+Simula o fluxo do /login de um cliente (Usuario.authenticate seguido de
+Cliente.find_by_id) dentro de um contexto de requisição Flask, com e sem
+REQUEST_SCOPED_CONNECTION, e mostra checkouts do pool, consultas e
+round trips estimados por requisição.
+
+Cada checkout com POOL_RESET_SESSION = True custa um round trip extra
+(COM_RESET_CONNECTION) além das próprias consultas.
+
+Requer um cliente cadastrado no banco configurado no .env (MySQL, ou
+SQLite com DB_BACKEND=sqlite para rodar sem servidor).
+
+Uso:
+    python benchmarks/bench_conexao_requisicao.py --email cliente@email.com --senha senha123
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.config import Config
+from app.database import Database
+from app.models import Usuario, Cliente
+
+
+def fluxo_login(email, senha):
+    usuario = Usuario.authenticate(email, senha)
+    if usuario:
+        Cliente.find_by_id(usuario['ID_USUARIO'])
+    return usuario
+
+
+def medir(app, reutilizar, email, senha, requisicoes):
+    Config.REQUEST_SCOPED_CONNECTION = reutilizar
+    Database.estatisticas.update(checkouts=0, consultas=0)
+
+    inicio = time.perf_counter()
+    for _ in range(requisicoes):
+        with app.test_request_context('/login', method='POST'):
+            fluxo_login(email, senha)
+            app.do_teardown_request()
+    duracao = time.perf_counter() - inicio
+
+    checkouts = Database.estatisticas['checkouts'] / requisicoes
+    consultas = Database.estatisticas['consultas'] / requisicoes
+    resets = checkouts if Config.POOL_RESET_SESSION else 0
+    return {
+        'checkouts': checkouts,
+        'consultas': consultas,
+        'round_trips': consultas + resets,
+        'ms': duracao / requisicoes * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de reutilização de conexão por requisição')
+    parser.add_argument('--email', required=True)
+    parser.add_argument('--senha', required=True)
+    parser.add_argument('--requisicoes', type=int, default=500)
+    args = parser.parse_args()
+
+    app = create_app()
+    if not fluxo_login(args.email, args.senha):
+        print("❌ Credenciais inválidas para o benchmark")
+        sys.exit(1)
+
+    print(f"{'modo':<28}{'checkouts':>10}{'consultas':>11}{'round trips':>13}{'ms/req':>9}")
+    for nome, reutilizar in (('conexão por chamada', False), ('conexão por requisição', True)):
+        r = medir(app, reutilizar, args.email, args.senha, args.requisicoes)
+        print(f"{nome:<28}{r['checkouts']:>10.1f}{r['consultas']:>11.1f}{r['round_trips']:>13.1f}{r['ms']:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
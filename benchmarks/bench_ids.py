@@ -0,0 +1,103 @@
+"""
+Benchmark: vazão de INSERT com chaves CHAR(36) aleatórias x BINARY(16) ordenadas
+
+Cria duas tabelas de teste com o formato de USUARIO (chave primária UUID,
+uma coluna que referencia outro UUID com índice secundário e um nome) e
+insere as mesmas linhas em lotes (Database.execute_many):
+
+- CHAR(36): UUID v4 em texto, como os ids antigos do gera_id_dados_criticos()
+- BINARY(16): UUID v7 de app/identificadores.py
+
+Mostra linhas/s de cada formato, a vazão dos últimos lotes (quando a
+tabela já não cabe no buffer pool, o id aleatório passa a ler páginas
+espalhadas a cada INSERT) e, no MySQL, o tamanho dos dados e dos índices.
+As tabelas são removidas no fim.
+
+Use um banco de teste (ou DB_BACKEND=sqlite DB_SQLITE_PATH=/tmp/bench.db).
+
+Uso:
+    python benchmarks/bench_ids.py --linhas 200000 --lote 1000
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import Config
+from app.database import Database
+from app.identificadores import novo_id
+
+FORMATOS = {
+    'CHAR(36) v4': ('BENCH_ID_TEXTO', 'CHAR(36)', lambda: str(uuid.uuid4())),
+    'BINARY(16) v7': ('BENCH_ID_BINARIO', 'BINARY(16)', lambda: novo_id().bytes),
+}
+
+
+def criar_tabela(tabela, tipo):
+    Database.execute_query(f"DROP TABLE IF EXISTS {tabela}", commit=True)
+    Database.execute_query(f"""
+        CREATE TABLE {tabela}(
+            ID {tipo} PRIMARY KEY NOT NULL,
+            REFERENCIA {tipo} NOT NULL,
+            NOME VARCHAR(100)
+        )
+    """, commit=True)
+    Database.execute_query(f"CREATE INDEX IDX_{tabela}_REF ON {tabela}(REFERENCIA)", commit=True)
+
+
+def tamanho_mb(tabela):
+    """Dados + índices (MB) no MySQL; None no SQLite"""
+    if Config.DB_BACKEND == 'sqlite':
+        return None
+    Database.execute_query(f"ANALYZE TABLE {tabela}", fetch_all=True)
+    result = Database.execute_query("""
+        SELECT DATA_LENGTH + INDEX_LENGTH AS TAMANHO FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (tabela,), fetch_one=True)
+    return result['TAMANHO'] / (1024 * 1024)
+
+
+def medir(tabela, tipo, gerar, linhas, lote):
+    criar_tabela(tabela, tipo)
+    query = f"INSERT INTO {tabela} (ID, REFERENCIA, NOME) VALUES (%s, %s, %s)"
+    # Poucas referências distintas, como USUARIO.GRUPO_USUARIO
+    referencias = [gerar() for _ in range(16)]
+
+    tempos = []
+    for inicio in range(0, linhas, lote):
+        params = [(gerar(), referencias[i % 16], f"Usuário {i}")
+                  for i in range(inicio, min(inicio + lote, linhas))]
+        t0 = time.perf_counter()
+        Database.execute_many(query, params)
+        tempos.append((len(params), time.perf_counter() - t0))
+
+    ultimos = tempos[-max(1, len(tempos) // 10):]
+    resultado = {
+        'linhas_s': linhas / sum(t for _, t in tempos),
+        'final_s': sum(n for n, _ in ultimos) / sum(t for _, t in ultimos),
+        'tamanho': tamanho_mb(tabela)
+    }
+    Database.execute_query(f"DROP TABLE IF EXISTS {tabela}", commit=True)
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de INSERT com chaves CHAR(36) x BINARY(16)')
+    parser.add_argument('--linhas', type=int, default=200000)
+    parser.add_argument('--lote', type=int, default=1000, help='linhas por executemany')
+    args = parser.parse_args()
+
+    print(f"{'formato':<16}{'linhas/s':>11}{'últimos 10%':>14}{'tamanho (MB)':>15}")
+    with Database.usar_pool(Config.POOL_BATCH):
+        for nome, (tabela, tipo, gerar) in FORMATOS.items():
+            r = medir(tabela, tipo, gerar, args.linhas, args.lote)
+            tamanho = f"{r['tamanho']:.1f}" if r['tamanho'] is not None else '-'
+            print(f"{nome:<16}{r['linhas_s']:>11.0f}{r['final_s']:>14.0f}{tamanho:>15}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: linhas em dict (SELECT C.*) x Linha com __slots__ e projeção
+
+Cria um pet de teste com N consultas e lê a lista de consultas do pet
+(a leitura do GET /consultas/<pet_id>) de três formas, sem o cache de
+resultados:
+
+- dict C.*: a query anterior (C.*, U.NOME_COMPLETO, V.CRMV) com
+  cursor(dictionary=True)
+- Linha, todas: Consulta.find_by_pet sem projeção
+- Linha, projeção: Consulta.find_by_pet com respostas.COLUNAS_CONSULTAS_DO_PET
+
+Mostra o tempo por leitura e a memória alocada por linha (tracemalloc).
+Os dados de teste são removidos no fim.
+
+Use um banco de teste (ou DB_BACKEND=sqlite DB_SQLITE_PATH=/tmp/bench.db)
+com ao menos um veterinário cadastrado.
+
+Uso:
+    python benchmarks/bench_linhas.py --consultas 2000 --repeticoes 20
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, respostas
+from app.config import Config
+from app.database import Database
+from app.identificadores import novo_id
+from app.models import Consulta, Pet
+
+QUERY_DICT = """
+    SELECT C.*, U.NOME_COMPLETO as NOME_VET, V.CRMV
+    FROM CONSULTA C
+    INNER JOIN VETERINARIO V ON C.CRMV = V.CRMV
+    INNER JOIN USUARIO U ON V.ID_USUARIO = U.ID_USUARIO
+    WHERE C.ID_PET = %s
+    ORDER BY C.DATA_CONSULTA DESC
+"""
+
+
+def medir(ler, repeticoes, linhas):
+    ler()  # aquece statements e construtores
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        ler()
+    ms = (time.perf_counter() - inicio) * 1000 / repeticoes
+
+    tracemalloc.start()
+    resultado = ler()
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return ms, atual / linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de linhas dict x __slots__')
+    parser.add_argument('--consultas', type=int, default=2000)
+    parser.add_argument('--repeticoes', type=int, default=20)
+    args = parser.parse_args()
+
+    Config.QUERY_CACHE_ENABLED = False
+    app = create_app()
+    with app.test_request_context():
+        vet = Database.execute_query("SELECT CRMV FROM VETERINARIO LIMIT 1", fetch_one=True)
+        if not vet:
+            print("❌ Nenhum veterinário cadastrado: cadastre um antes (POST /cadastro_vet)")
+            sys.exit(1)
+
+        pet_id = Pet.create('Pet Benchmark', 'SRD', 1)
+        ano = date.today().year  # dentro dos anos quentes (find_by_pet)
+        Database.execute_many(
+            "INSERT INTO CONSULTA (ID_PROCEDIMENTO, DATA_CONSULTA, VALOR, ID_PET, CRMV) VALUES (%s, %s, %s, %s, %s)",
+            [(novo_id().bytes, f"{ano}-{1 + i % 12:02d}-{1 + i % 28:02d}", 100.0, pet_id, vet['CRMV'])
+             for i in range(args.consultas)]
+        )
+        try:
+            modos = (
+                ('dict C.*', lambda: Database.execute_query(QUERY_DICT, (pet_id,), fetch_all=True, prepared=True)),
+                ('Linha, todas', lambda: Consulta.find_by_pet(pet_id)),
+                ('Linha, projeção', lambda: Consulta.find_by_pet(pet_id, respostas.COLUNAS_CONSULTAS_DO_PET)),
+            )
+            print(f"{'modo':<18}{'ms/leitura':>12}{'bytes/linha':>13}")
+            for nome, ler in modos:
+                ms, por_linha = medir(ler, args.repeticoes, args.consultas)
+                print(f"{nome:<18}{ms:>12.2f}{por_linha:>13.0f}")
+        finally:
+            Database.execute_query("DELETE FROM CONSULTA WHERE ID_PET = %s", (pet_id,), commit=True)
+            Database.execute_query("DELETE FROM PET WHERE ID_PET = %s", (pet_id,), commit=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: aplicações de vacina por segundo em um dia de campanha
+
+Cria pets de teste e registra a mesma vacina em todos eles de duas formas:
+
+- uma por aplicação: o fluxo do POST /vacinas com pet_id (registro em
+  VACINAS e vínculo em PET_VACINA, cada um com o seu commit)
+- lote: o POST /vacinas/lote (Vacina.registrar_lote), com até
+  VACINAS_LOTE_MAX aplicações por requisição em um único executemany
+
+Mostra aplicações/s, round trips (consultas + commits) por aplicação e o
+tempo do histórico de um pet (leitura por faixa do IDX_PET_VACINA_DATA).
+Os pets e as vacinas de teste são removidos no fim.
+
+Use um banco de teste (ou DB_BACKEND=sqlite DB_SQLITE_PATH=/tmp/bench.db).
+
+Uso:
+    python benchmarks/bench_vacinas_lote.py --pets 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.config import Config
+from app.database import Database
+from app.models import Pet, Vacina
+
+
+def criar_pets(quantidade):
+    result = Database.execute_many(
+        "INSERT INTO PET (NOME, RACA, IDADE) VALUES (%s, %s, %s)",
+        [(f"Pet Benchmark {i}", 'SRD', 1) for i in range(quantidade)]
+    )
+    linhas = Database.execute_query(
+        "SELECT ID_PET FROM PET WHERE NOME LIKE 'Pet Benchmark %' ORDER BY ID_PET DESC LIMIT %s",
+        (result['affected_rows'],), fetch_all=True
+    )
+    return [linha['ID_PET'] for linha in linhas]
+
+
+def uma_por_aplicacao(pet_ids, data):
+    vacina_ids = []
+    for pet_id in pet_ids:
+        vacina_id = Vacina.create('V10 Benchmark', 1, data)
+        Pet.add_vacina(pet_id, vacina_id, data)
+        vacina_ids.append(vacina_id)
+    return vacina_ids
+
+
+def lote(pet_ids, data):
+    vacina_ids = []
+    for inicio in range(0, len(pet_ids), Config.VACINAS_LOTE_MAX):
+        result = Vacina.registrar_lote([{
+            'nome': 'V10 Benchmark', 'dose': 2, 'data_aplicado': data,
+            'pet_ids': pet_ids[inicio:inicio + Config.VACINAS_LOTE_MAX]
+        }])
+        vacina_ids.extend(result['vacinas'])
+    return vacina_ids
+
+
+def medir(registrar, pet_ids, data):
+    Database.estatisticas.update(consultas=0, commits=0)
+    inicio = time.perf_counter()
+    vacina_ids = registrar(pet_ids, data)
+    duracao = time.perf_counter() - inicio
+    e = Database.estatisticas
+    return vacina_ids, {
+        'aplicacoes_s': len(pet_ids) / duracao,
+        'round_trips': (e['consultas'] + e['commits']) / len(pet_ids)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do registro de vacinas em lote')
+    parser.add_argument('--pets', type=int, default=2000)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.test_request_context():
+        pet_ids = criar_pets(args.pets)
+        vacinas_criadas = []
+        try:
+            print(f"{'modo':<22}{'aplicações/s':>14}{'round trips/apl':>17}")
+            modos = (('uma por aplicação', uma_por_aplicacao, '2024-01-10'), ('lote', lote, '2024-02-10'))
+            for nome, registrar, data in modos:
+                vacina_ids, r = medir(registrar, pet_ids, data)
+                vacinas_criadas.extend(vacina_ids)
+                print(f"{nome:<22}{r['aplicacoes_s']:>14.0f}{r['round_trips']:>17.2f}")
+
+            inicio = time.perf_counter()
+            historico = Database.execute_query(
+                "SELECT V.NOME, V.DOSE, PV.DATA_APLICADO FROM PET_VACINA PV "
+                "INNER JOIN VACINAS V ON V.ID_VAC = PV.ID_VAC "
+                "WHERE PV.ID_PET = %s ORDER BY PV.DATA_APLICADO DESC",
+                (pet_ids[0],), fetch_all=True
+            )
+            ms = (time.perf_counter() - inicio) * 1000
+            print(f"\nHistórico do pet {pet_ids[0]}: {len(historico)} vacina(s) em {ms:.2f} ms")
+        finally:
+            # ON DELETE CASCADE remove as linhas de PET_VACINA
+            Database.execute_many("DELETE FROM VACINAS WHERE ID_VAC = %s", [(v,) for v in vacinas_criadas])
+            Database.execute_many("DELETE FROM PET WHERE ID_PET = %s", [(p,) for p in pet_ids])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: registro de vacinas com e sem a fila write-behind
+
+Simula um dia de campanha: várias threads (veterinários) registram vacinas
+como o POST /vacinas (Vacina.create seguido de Pet.add_vacina), cada uma
+dentro de um contexto de requisição Flask. Mostra commits e round trips
+(consultas + commits) por vacina e a vazão, com DB_WRITE_BEHIND desligado
+e ligado.
+
+Grava vacinas de teste no banco configurado no .env: use um banco de
+teste (ou DB_BACKEND=sqlite DB_SQLITE_PATH=:memory:) e informe um pet
+existente.
+
+Uso:
+    python benchmarks/bench_write_behind.py --pet-id 1 --threads 16 --vacinas 100
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.config import Config
+from app.database import Database
+from app.models import Vacina, Pet
+
+
+def veterinario(app, pet_id, vacinas, erros):
+    for i in range(vacinas):
+        with app.test_request_context('/vacinas', method='POST'):
+            try:
+                vacina_id = Vacina.create('Antirrábica', i % 3 + 1, '2024-06-01')
+                Pet.add_vacina(pet_id, vacina_id, '2024-06-01')
+            except Exception as e:
+                erros.append(e)
+            app.do_teardown_request()
+
+
+def medir(app, write_behind, pet_id, threads, vacinas):
+    Config.WRITE_BEHIND_ENABLED = write_behind
+    Database.estatisticas.update(checkouts=0, consultas=0, commits=0)
+    erros = []
+
+    inicio = time.perf_counter()
+    trabalhadores = [
+        threading.Thread(target=veterinario, args=(app, pet_id, vacinas, erros))
+        for _ in range(threads)
+    ]
+    for t in trabalhadores:
+        t.start()
+    for t in trabalhadores:
+        t.join()
+    duracao = time.perf_counter() - inicio
+
+    total = threads * vacinas
+    commits = Database.estatisticas['commits']
+    return {
+        'commits': commits / total,
+        'round_trips': (Database.estatisticas['consultas'] + commits) / total,
+        'vacinas_s': total / duracao,
+        'erros': len(erros)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da fila write-behind de vacinas')
+    parser.add_argument('--pet-id', type=int, required=True)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--vacinas', type=int, default=100, help='vacinas por thread')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if not Pet.find_by_id(args.pet_id):
+            print("❌ Pet não encontrado para o benchmark")
+            sys.exit(1)
+
+    print(f"{'modo':<22}{'commits/vac':>12}{'round trips/vac':>17}{'vacinas/s':>11}{'erros':>7}")
+    for nome, write_behind in (('commit por escrita', False), ('write-behind', True)):
+        r = medir(app, write_behind, args.pet_id, args.threads, args.vacinas)
+        print(f"{nome:<22}{r['commits']:>12.2f}{r['round_trips']:>17.2f}{r['vacinas_s']:>11.0f}{r['erros']:>7}")
+
+
+if __name__ == '__main__':
+    main()
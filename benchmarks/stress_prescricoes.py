@@ -0,0 +1,131 @@
+"""
+Teste de carga das prescrições com vários processos
+
+Cada processo (como um worker da aplicação) cria prescrições a partir de
+várias threads com Prescricao.create, cada uma dentro de um contexto de
+requisição Flask. No final o script relê do banco as prescrições do teste
+e confere que nenhuma foi perdida ou duplicada e que cada uma tem os seus
+medicamentos. Os dados de teste são removidos no fim.
+
+Use um banco de teste (ou DB_BACKEND=sqlite DB_SQLITE_PATH=/tmp/bench.db)
+com o pet informado já cadastrado.
+
+Uso:
+    python benchmarks/stress_prescricoes.py --pet-id 1 --processos 8 --threads 4 --por-thread 250
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.database import Database
+from app.models import Pet, Prescricao
+
+MEDICAMENTOS = [{'nome': 'Amoxicilina', 'dosagem': '250mg'}, {'nome': 'Dipirona', 'dosagem': '1 gota/kg'}]
+
+
+def _worker(pet_id, marca, threads, por_thread, indice_processo, fila_resultados):
+    app = create_app()
+    ids = []
+    erros = []
+
+    def escrever(indice_thread):
+        for i in range(por_thread):
+            with app.test_request_context('/prescricoes', method='POST'):
+                try:
+                    ids.append(Prescricao.create(
+                        pet_id, f'{indice_processo:05d}{indice_thread:03d}', 'Stress', None, '2024-06-01',
+                        f'{marca} {indice_processo}/{indice_thread}/{i}', MEDICAMENTOS
+                    ))
+                except Exception as e:
+                    erros.append(repr(e))
+                app.do_teardown_request()
+
+    workers = [threading.Thread(target=escrever, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    fila_resultados.put({'ids': ids, 'erros': erros})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pet-id', type=int, required=True)
+    parser.add_argument('--processos', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--por-thread', type=int, default=250)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if not Pet.find_by_id(args.pet_id):
+            print("❌ Pet não encontrado para o teste")
+            sys.exit(1)
+
+    # Identifica as prescrições desta execução (diagnóstico começa com a marca)
+    marca = f'stress-{uuid.uuid4().hex[:12]}'
+    esperado = args.processos * args.threads * args.por_thread
+
+    fila_resultados = multiprocessing.Queue()
+    processos = [
+        multiprocessing.Process(
+            target=_worker,
+            args=(args.pet_id, marca, args.threads, args.por_thread, p, fila_resultados)
+        )
+        for p in range(args.processos)
+    ]
+
+    inicio = time.perf_counter()
+    for p in processos:
+        p.start()
+    resultados = [fila_resultados.get() for _ in processos]
+    for p in processos:
+        p.join()
+    duracao = time.perf_counter() - inicio
+
+    retornados = [prescricao_id for r in resultados for prescricao_id in r['ids']]
+    erros = [erro for r in resultados for erro in r['erros']]
+
+    with app.app_context():
+        try:
+            # Relê do banco: cada prescrição do teste e quantos medicamentos tem
+            gravadas = Database.execute_query("""
+                SELECT P.ID_PRESCRICAO,
+                       (SELECT COUNT(*) FROM PRESCRICAO_MEDICAMENTO M
+                        WHERE M.ID_PRESCRICAO = P.ID_PRESCRICAO) AS TOTAL_MEDICAMENTOS
+                FROM PRESCRICAO P
+                WHERE P.ID_PET = %s AND P.DIAGNOSTICO LIKE %s
+            """, (args.pet_id, f'{marca} %'), fetch_all=True)
+        finally:
+            Database.execute_query(
+                "DELETE FROM PRESCRICAO WHERE ID_PET = %s AND DIAGNOSTICO LIKE %s",
+                (args.pet_id, f'{marca} %'), commit=True
+            )
+
+    ids = [linha['ID_PRESCRICAO'] for linha in gravadas]
+    incompletas = [linha['ID_PRESCRICAO'] for linha in gravadas if linha['TOTAL_MEDICAMENTOS'] != len(MEDICAMENTOS)]
+
+    print(f"Processos: {args.processos}  Threads/processo: {args.threads}")
+    print(f"Prescrições esperadas: {esperado}  gravadas: {len(ids)}  ids únicos: {len(set(ids))}  erros: {len(erros)}")
+    print(f"Tempo: {duracao:.2f}s  ({esperado / duracao:.0f} escritas/s)")
+    for erro in erros[:5]:
+        print(f"   {erro}")
+
+    if (erros or incompletas or len(ids) != esperado or len(set(ids)) != esperado
+            or sorted(ids) != sorted(retornados)):
+        print("❌ Prescrições perdidas, duplicadas ou sem medicamentos!")
+        sys.exit(1)
+    print("✅ Nenhuma prescrição perdida")
+
+
+if __name__ == '__main__':
+    main()
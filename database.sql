@@ -1,3 +1,6 @@
+-- Cria bancos novos já na versão mais recente do esquema. Bancos existentes
+-- recebem as mudanças pelas migrações versionadas: python migrar_schema.py
+
 SET SQL_SAFE_UPDATES = 0;
 
 CREATE DATABASE IF NOT EXISTS petCare;
@@ -5,22 +8,22 @@ CREATE DATABASE IF NOT EXISTS petCare;
 USE petCare;
 
 CREATE TABLE IF NOT EXISTS GRUPO_USUARIO(
-    ID_ACESSO CHAR(36) PRIMARY KEY NOT NULL,
+    ID_ACESSO BINARY(16) PRIMARY KEY NOT NULL,
     ROLE_MYSQL VARCHAR(50),
     TIPO_ACESSO VARCHAR(20),
     DESCRICAO VARCHAR(225)
 );
 
 CREATE TABLE IF NOT EXISTS USUARIO(
-    ID_USUARIO CHAR(36) PRIMARY KEY NOT NULL,
+    ID_USUARIO BINARY(16) PRIMARY KEY NOT NULL,
     NOME_COMPLETO VARCHAR(250) NOT NULL,
     EMAIL VARCHAR(225) NOT NULL,
     SENHA VARCHAR(64) NOT NULL,
-    GRUPO_USUARIO CHAR(36) NOT NULL
+    GRUPO_USUARIO BINARY(16) NOT NULL
 );
 
 CREATE TABLE IF NOT EXISTS CLIENTE(
-    ID_USUARIO CHAR(36) PRIMARY KEY NOT NULL,
+    ID_USUARIO BINARY(16) PRIMARY KEY NOT NULL,
     TELEFONE VARCHAR(11) NOT NULL,
     BAIRRO VARCHAR(30),
     RUA INT(3),
@@ -35,7 +38,7 @@ CREATE TABLE IF NOT EXISTS PET(
     RACA VARCHAR(100),
     IDADE FLOAT,
     OBSERVACOES TEXT(250),
-    ID_VACINAS INT
+    ID_VACINAS INT -- obsoleta: o histórico de vacinas fica em PET_VACINA
 );
 
 CREATE TABLE IF NOT EXISTS VACINAS(
@@ -45,19 +48,64 @@ CREATE TABLE IF NOT EXISTS VACINAS(
     DATA_APLICADO DATE
 );
 
+-- Vacinas aplicadas em cada pet (N:N entre PET e VACINAS)
+CREATE TABLE IF NOT EXISTS PET_VACINA(
+    ID_PET INT NOT NULL,
+    ID_VAC INT NOT NULL,
+    DATA_APLICADO DATE,
+    PRIMARY KEY (ID_PET, ID_VAC)
+);
+
 CREATE TABLE IF NOT EXISTS VETERINARIO(
     CRMV INT NOT NULL PRIMARY KEY,
-    ID_USUARIO CHAR(36) NOT NULL,
+    ID_USUARIO BINARY(16) NOT NULL,
     SALARIO DOUBLE(7,2),
     TURNO VARCHAR(30)
 );
 
+-- PARTICIONADA POR ANO DE DATA_CONSULTA: OS ANOS FECHADOS SÃO ARQUIVADOS E AS --
+-- PARTIÇÕES VAZIAS REMOVIDAS (arquivar_consultas.py). TABELA PARTICIONADA NÃO --
+-- TEM FKs E TODA CHAVE ÚNICA INCLUI DATA_CONSULTA --
+-- CRIADA SÓ COM A pfuturo: AS PARTIÇÕES DE CADA ANO SÃO CRIADAS NA --
+-- INICIALIZAÇÃO DA APLICAÇÃO (arquivo_consultas.criar_particoes_anuais) --
+
 CREATE TABLE IF NOT EXISTS CONSULTA(
-    ID_PROCEDIMENTO CHAR(36) PRIMARY KEY NOT NULL,
-    DATA_CONSULTA DATE,
+    ID_PROCEDIMENTO BINARY(16) NOT NULL,
+    DATA_CONSULTA DATE NOT NULL,
     VALOR DOUBLE(7,2),
     ID_PET INT NOT NULL,
-    CRMV INT NOT NULL
+    CRMV INT NOT NULL,
+    PRIMARY KEY (ID_PROCEDIMENTO, DATA_CONSULTA)
+)
+PARTITION BY RANGE COLUMNS(DATA_CONSULTA) (
+    PARTITION pfuturo VALUES LESS THAN (MAXVALUE)
+);
+
+CREATE TABLE IF NOT EXISTS PRESCRICAO(
+    ID_PRESCRICAO INT PRIMARY KEY AUTO_INCREMENT NOT NULL,
+    ID_PET INT NOT NULL,
+    CPF_CLIENTE BIGINT(11) NOT NULL,
+    VETERINARIO VARCHAR(250),
+    ID_VETERINARIO BINARY(16),
+    DATA_CONSULTA DATE,
+    DIAGNOSTICO TEXT,
+    ORIENTACOES_GERAIS TEXT,
+    RETORNO DATE,
+    STATUS VARCHAR(20) NOT NULL DEFAULT 'ativa',
+    CREATED_AT DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UPDATED_AT DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS PRESCRICAO_MEDICAMENTO(
+    ID_PRESCRICAO INT NOT NULL,
+    ORDEM INT NOT NULL,
+    NOME VARCHAR(100) NOT NULL,
+    NOME_NORMALIZADO VARCHAR(100) NOT NULL,
+    DOSAGEM VARCHAR(100),
+    FREQUENCIA VARCHAR(100),
+    DURACAO VARCHAR(100),
+    OBSERVACOES TEXT,
+    PRIMARY KEY (ID_PRESCRICAO, ORDEM)
 );
 
 /* CONSTRAINTS */
@@ -74,13 +122,23 @@ ALTER TABLE PET
 ADD CONSTRAINT FK_ID_VACINAS
 FOREIGN KEY (ID_VACINAS) REFERENCES VACINAS(ID_VAC);
 
-ALTER TABLE CONSULTA
-ADD CONSTRAINT FK_CONSULTA_PET
+ALTER TABLE PET_VACINA
+ADD CONSTRAINT FK_PET_VACINA_PET
+FOREIGN KEY (ID_PET) REFERENCES PET(ID_PET);
+
+ALTER TABLE PET_VACINA
+ADD CONSTRAINT FK_PET_VACINA_VACINA
+FOREIGN KEY (ID_VAC) REFERENCES VACINAS(ID_VAC) ON DELETE CASCADE;
+
+-- CONSULTA (PARTICIONADA) NÃO TEM FKs: Consulta.create SÓ GRAVA SE O PET E O VETERINÁRIO EXISTIREM --
+
+ALTER TABLE PRESCRICAO
+ADD CONSTRAINT FK_PRESCRICAO_PET
 FOREIGN KEY (ID_PET) REFERENCES PET(ID_PET);
 
-ALTER TABLE CONSULTA
-ADD CONSTRAINT FK_CRMV
-FOREIGN KEY (CRMV) REFERENCES VETERINARIO(CRMV);
+ALTER TABLE PRESCRICAO_MEDICAMENTO
+ADD CONSTRAINT FK_MEDICAMENTO_PRESCRICAO
+FOREIGN KEY (ID_PRESCRICAO) REFERENCES PRESCRICAO(ID_PRESCRICAO) ON DELETE CASCADE;
 
 -- VIEW QUE SERÁ UTILIZADA NA PÁGINA DO CLIENTE, MOSTRANDO AS INFORMAÇÕES DO SEU PET --
 
@@ -94,21 +152,22 @@ WHERE U.ID_USUARIO = C.ID_USUARIO AND P.ID_PET = C.ID_PET;
 -- VIEW QUE SERÁ UTILIZADA PARA VERIFICAR O HISTÓRICO DE VACINA DO PET --
 
 CREATE OR REPLACE VIEW HISTORICO_VACINA AS
-SELECT V.NOME, V.DOSE, V.DATA_APLICADO
-FROM VACINAS V
-INNER JOIN PET P
-WHERE V.ID_VAC = P.ID_VACINAS;
+SELECT PV.ID_PET, V.NOME, V.DOSE, PV.DATA_APLICADO
+FROM PET_VACINA PV
+INNER JOIN VACINAS V ON V.ID_VAC = PV.ID_VAC;
     
 /* FUNCTION */
 
--- FUNÇÃO QUE VAI GERAR UM UUID ALEATÓRIO PARA CADA DADOS CRÍTICOS INSERIDOS NO BANCO. AUXILIA NA SEGURANÇA CONTRA INVASORES --
+-- FUNÇÃO QUE VAI GERAR UM UUID PARA CADA DADOS CRÍTICOS INSERIDOS NO BANCO. AUXILIA NA SEGURANÇA CONTRA INVASORES --
+-- (a aplicação gera os ids em Python, ver app/identificadores.py; a função fica para inserts feitos
+--  direto no banco: UUID_TO_BIN com swap deixa o UUID v1 ordenado por tempo em BINARY(16))
 
 DELIMITER //
 CREATE FUNCTION IF NOT EXISTS gera_id_dados_criticos()
-RETURNS CHAR(36)
-DETERMINISTIC
+RETURNS BINARY(16)
+NOT DETERMINISTIC NO SQL
 BEGIN
-    RETURN UUID();
+    RETURN UUID_TO_BIN(UUID(), 1);
 END //
 DELIMITER ;
 
@@ -161,9 +220,37 @@ DELIMITER ;
 
 CREATE INDEX IF NOT EXISTS IDX_DATA_CONSULTA ON CONSULTA(DATA_CONSULTA);
 
--- INDEX PARA AUXILIAR NA BUSCA APÓS LOGIN --
+-- INDEX PARA A AGENDA DO DIA DE CADA VETERINÁRIO --
+
+CREATE INDEX IF NOT EXISTS IDX_CONSULTA_CRMV_DATA ON CONSULTA(CRMV, DATA_CONSULTA);
+
+-- INDEX PARA AS CONSULTAS DO PET: LEITURA POR FAIXA, JÁ NA ORDEM DA DATA --
+
+CREATE INDEX IF NOT EXISTS IDX_CONSULTA_PET_DATA ON CONSULTA(ID_PET, DATA_CONSULTA);
+
+-- INDEX PARA BUSCAR O VETERINÁRIO DO USUÁRIO LOGADO --
+
+CREATE INDEX IF NOT EXISTS IDX_VETERINARIO_USUARIO ON VETERINARIO(ID_USUARIO);
+
+-- INDEX ÚNICO PARA A BUSCA APÓS LOGIN E PARA BARRAR EMAIL REPETIDO NO CADASTRO --
+
+CREATE UNIQUE INDEX IF NOT EXISTS UK_USUARIO_EMAIL ON USUARIO(EMAIL);
+
+-- INDEX PARA O HISTÓRICO DE VACINAS DO PET: LEITURA POR FAIXA, JÁ NA ORDEM DA DATA --
+
+CREATE INDEX IF NOT EXISTS IDX_PET_VACINA_DATA ON PET_VACINA(ID_PET, DATA_APLICADO);
+
+-- INDEXES PARA O HISTÓRICO DE PRESCRIÇÕES DO PET, BUSCA POR TUTOR E FILTRO POR STATUS --
+
+CREATE INDEX IF NOT EXISTS IDX_PRESCRICAO_PET ON PRESCRICAO(ID_PET);
+
+CREATE INDEX IF NOT EXISTS IDX_PRESCRICAO_CPF ON PRESCRICAO(CPF_CLIENTE);
+
+CREATE INDEX IF NOT EXISTS IDX_PRESCRICAO_STATUS ON PRESCRICAO(STATUS);
+
+-- ÍNDICE INVERTIDO MEDICAMENTO -> PRESCRIÇÕES, PARA RECALL DE LOTES E INTERAÇÕES --
 
-CREATE INDEX IF NOT EXISTS IDX_USUARIO_EMAIL ON USUARIO(EMAIL);
+CREATE INDEX IF NOT EXISTS IDX_MEDICAMENTO_NOME ON PRESCRICAO_MEDICAMENTO(NOME_NORMALIZADO, ID_PRESCRICAO);
 
 /* ROLES */
 
@@ -182,7 +269,10 @@ GRANT ALL PRIVILEGES ON petCare.* TO 'ADM';
 GRANT SELECT, INSERT, UPDATE ON petCare.PET TO 'VET';
 GRANT SELECT, INSERT, UPDATE ON petCare.CONSULTA TO 'VET';
 GRANT SELECT, INSERT, UPDATE ON petCare.VACINAS TO 'VET';
+GRANT SELECT, INSERT, UPDATE ON petCare.PET_VACINA TO 'VET';
 GRANT SELECT, INSERT, UPDATE ON petCare.CLIENTE TO 'VET';
+GRANT SELECT, INSERT, UPDATE, DELETE ON petCare.PRESCRICAO TO 'VET';
+GRANT SELECT, INSERT, UPDATE, DELETE ON petCare.PRESCRICAO_MEDICAMENTO TO 'VET';
 
 GRANT SELECT ON petCare.USUARIO TO 'VET';
 GRANT SELECT ON petCare.VETERINARIO TO 'VET';
@@ -193,3 +283,4 @@ GRANT EXECUTE ON PROCEDURE petCare.listar_consultas TO 'VET';
 
 GRANT SELECT ON petCare.INFO_PET TO 'CLI';
 GRANT SELECT ON petCare.VACINAS TO 'CLI';
+GRANT SELECT ON petCare.PET_VACINA TO 'CLI';
@@ -0,0 +1,158 @@
+-- ESQUEMA DO petCare PARA O BACKEND SQLITE (DB_BACKEND=sqlite) --
+-- Mesmas tabelas, views e índices do database.sql; a function
+-- gera_id_dados_criticos, o SHA2 e a procedure listar_consultas são
+-- fornecidos pelo backend em app/backends/sqlite.py. Aplicado
+-- automaticamente na primeira conexão com um arquivo vazio.
+
+CREATE TABLE IF NOT EXISTS GRUPO_USUARIO(
+    ID_ACESSO BINARY(16) PRIMARY KEY NOT NULL,
+    ROLE_MYSQL VARCHAR(50),
+    TIPO_ACESSO VARCHAR(20),
+    DESCRICAO VARCHAR(225)
+);
+
+CREATE TABLE IF NOT EXISTS USUARIO(
+    ID_USUARIO BINARY(16) PRIMARY KEY NOT NULL,
+    NOME_COMPLETO VARCHAR(250) NOT NULL,
+    EMAIL VARCHAR(225) NOT NULL,
+    SENHA VARCHAR(64) NOT NULL,
+    GRUPO_USUARIO BINARY(16) NOT NULL REFERENCES GRUPO_USUARIO(ID_ACESSO)
+);
+
+CREATE TABLE IF NOT EXISTS VACINAS(
+    ID_VAC INTEGER PRIMARY KEY AUTOINCREMENT,
+    NOME VARCHAR(50),
+    DOSE INT,
+    DATA_APLICADO DATE
+);
+
+CREATE TABLE IF NOT EXISTS PET(
+    ID_PET INTEGER PRIMARY KEY AUTOINCREMENT,
+    NOME VARCHAR(100),
+    RACA VARCHAR(100),
+    IDADE FLOAT,
+    OBSERVACOES TEXT,
+    ID_VACINAS INT REFERENCES VACINAS(ID_VAC) -- obsoleta: histórico em PET_VACINA
+);
+
+-- WITHOUT ROWID: inserir aplicações não altera last_insert_rowid(), então
+-- LAST_INSERT_ID() continua apontando para a vacina em Vacina.registrar_lote
+CREATE TABLE IF NOT EXISTS PET_VACINA(
+    ID_PET INT NOT NULL REFERENCES PET(ID_PET),
+    ID_VAC INT NOT NULL REFERENCES VACINAS(ID_VAC) ON DELETE CASCADE,
+    DATA_APLICADO DATE,
+    PRIMARY KEY (ID_PET, ID_VAC)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS CLIENTE(
+    ID_USUARIO BINARY(16) PRIMARY KEY NOT NULL,
+    TELEFONE VARCHAR(11) NOT NULL,
+    BAIRRO VARCHAR(30),
+    RUA INT,
+    CIDADE VARCHAR(50),
+    CPF BIGINT UNIQUE NOT NULL,
+    ID_PET INT NOT NULL REFERENCES PET(ID_PET)
+);
+
+CREATE TABLE IF NOT EXISTS VETERINARIO(
+    CRMV INT NOT NULL PRIMARY KEY,
+    ID_USUARIO BINARY(16) NOT NULL,
+    SALARIO DOUBLE,
+    TURNO VARCHAR(30)
+);
+
+-- Sem as partições por ano do MySQL (e por isso com as FKs): os anos
+-- fechados só saem da tabela pelo arquivamento (arquivar_consultas.py)
+CREATE TABLE IF NOT EXISTS CONSULTA(
+    ID_PROCEDIMENTO BINARY(16) PRIMARY KEY NOT NULL,
+    DATA_CONSULTA DATE,
+    VALOR DOUBLE,
+    ID_PET INT NOT NULL REFERENCES PET(ID_PET),
+    CRMV INT NOT NULL REFERENCES VETERINARIO(CRMV)
+);
+
+CREATE TABLE IF NOT EXISTS PRESCRICAO(
+    ID_PRESCRICAO INTEGER PRIMARY KEY AUTOINCREMENT,
+    ID_PET INT NOT NULL REFERENCES PET(ID_PET),
+    CPF_CLIENTE BIGINT NOT NULL,
+    VETERINARIO VARCHAR(250),
+    ID_VETERINARIO BINARY(16),
+    DATA_CONSULTA DATE,
+    DIAGNOSTICO TEXT,
+    ORIENTACOES_GERAIS TEXT,
+    RETORNO DATE,
+    STATUS VARCHAR(20) NOT NULL DEFAULT 'ativa',
+    CREATED_AT DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UPDATED_AT DATETIME
+);
+
+-- WITHOUT ROWID: inserir medicamentos não altera last_insert_rowid(), então
+-- LAST_INSERT_ID() continua apontando para a prescrição em Prescricao.create
+CREATE TABLE IF NOT EXISTS PRESCRICAO_MEDICAMENTO(
+    ID_PRESCRICAO INT NOT NULL REFERENCES PRESCRICAO(ID_PRESCRICAO) ON DELETE CASCADE,
+    ORDEM INT NOT NULL,
+    NOME VARCHAR(100) NOT NULL,
+    NOME_NORMALIZADO VARCHAR(100) NOT NULL,
+    DOSAGEM VARCHAR(100),
+    FREQUENCIA VARCHAR(100),
+    DURACAO VARCHAR(100),
+    OBSERVACOES TEXT,
+    PRIMARY KEY (ID_PRESCRICAO, ORDEM)
+) WITHOUT ROWID;
+
+-- VIEWS --
+
+CREATE VIEW IF NOT EXISTS INFO_PET AS
+SELECT P.NOME, U.NOME_COMPLETO, RACA, OBSERVACOES
+FROM PET P
+INNER JOIN USUARIO U
+INNER JOIN CLIENTE C
+WHERE U.ID_USUARIO = C.ID_USUARIO AND P.ID_PET = C.ID_PET;
+
+CREATE VIEW IF NOT EXISTS HISTORICO_VACINA AS
+SELECT PV.ID_PET, V.NOME, V.DOSE, PV.DATA_APLICADO
+FROM PET_VACINA PV
+INNER JOIN VACINAS V ON V.ID_VAC = PV.ID_VAC;
+
+-- TRIGGERS: HASH DA SENHA (SHA2 É REGISTRADA PELO BACKEND) --
+-- O SQLite não altera NEW em BEFORE, então o hash é gravado por um UPDATE
+-- logo após a escrita; hash_atualiza ignora esse UPDATE do hash_senha
+
+CREATE TRIGGER IF NOT EXISTS hash_senha
+AFTER INSERT ON USUARIO
+FOR EACH ROW WHEN LENGTH(NEW.SENHA) < 60
+BEGIN
+    UPDATE USUARIO SET SENHA = SHA2(NEW.SENHA, 256) WHERE ID_USUARIO = NEW.ID_USUARIO;
+END;
+
+CREATE TRIGGER IF NOT EXISTS hash_atualiza
+AFTER UPDATE OF SENHA ON USUARIO
+FOR EACH ROW WHEN NEW.SENHA <> OLD.SENHA AND NEW.SENHA <> SHA2(OLD.SENHA, 256)
+BEGIN
+    UPDATE USUARIO SET SENHA = SHA2(NEW.SENHA, 256) WHERE ID_USUARIO = NEW.ID_USUARIO;
+END;
+
+-- INDEXES --
+
+CREATE INDEX IF NOT EXISTS IDX_DATA_CONSULTA ON CONSULTA(DATA_CONSULTA);
+
+CREATE INDEX IF NOT EXISTS IDX_CONSULTA_CRMV_DATA ON CONSULTA(CRMV, DATA_CONSULTA);
+
+CREATE INDEX IF NOT EXISTS IDX_CONSULTA_PET_DATA ON CONSULTA(ID_PET, DATA_CONSULTA);
+
+CREATE INDEX IF NOT EXISTS IDX_VETERINARIO_USUARIO ON VETERINARIO(ID_USUARIO);
+
+-- No MySQL a FK_ID_PET já indexa CLIENTE.ID_PET
+CREATE INDEX IF NOT EXISTS IDX_CLIENTE_PET ON CLIENTE(ID_PET);
+
+CREATE UNIQUE INDEX IF NOT EXISTS UK_USUARIO_EMAIL ON USUARIO(EMAIL);
+
+CREATE INDEX IF NOT EXISTS IDX_PET_VACINA_DATA ON PET_VACINA(ID_PET, DATA_APLICADO);
+
+CREATE INDEX IF NOT EXISTS IDX_PRESCRICAO_PET ON PRESCRICAO(ID_PET);
+
+CREATE INDEX IF NOT EXISTS IDX_PRESCRICAO_CPF ON PRESCRICAO(CPF_CLIENTE);
+
+CREATE INDEX IF NOT EXISTS IDX_PRESCRICAO_STATUS ON PRESCRICAO(STATUS);
+
+CREATE INDEX IF NOT EXISTS IDX_MEDICAMENTO_NOME ON PRESCRICAO_MEDICAMENTO(NOME_NORMALIZADO, ID_PRESCRICAO);
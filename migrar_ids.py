@@ -0,0 +1,140 @@
+"""
+Script para migrar as chaves UUID de CHAR(36) (texto) para BINARY(16)
+
+Converte GRUPO_USUARIO.ID_ACESSO, USUARIO.ID_USUARIO, CONSULTA.ID_PROCEDIMENTO
+e as colunas que guardam esses ids (ver COLUNAS) em todas as clínicas
+(shards). Os ids existentes mantêm o mesmo valor, então tokens já emitidos
+continuam válidos; só os ids novos (app/identificadores.py) são ordenados
+por tempo.
+
+- MySQL: remove a FK_GRUPO_USUARIO, passa cada coluna por VARBINARY(36),
+  converte o texto com UNHEX e termina em BINARY(16); recria a FK e a
+  function gera_id_dados_criticos. Cada passo pode ser repetido: se o
+  script for interrompido, basta rodá-lo de novo.
+- SQLite: o tipo declarado não muda (o SQLite guarda BLOB em qualquer
+  coluna); os valores em texto são convertidos em uma única transação.
+
+Rode com a aplicação parada (o ALTER TABLE bloqueia as tabelas e o cache
+de resultados dos processos em execução guardaria ids em texto).
+
+Uso:
+    python migrar_ids.py
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from app.config import Config
+from app.database import Database
+from app.identificadores import id_binario
+
+# (tabela, coluna, NOT NULL)
+COLUNAS = [
+    ('GRUPO_USUARIO', 'ID_ACESSO', True),
+    ('USUARIO', 'ID_USUARIO', True),
+    ('USUARIO', 'GRUPO_USUARIO', True),
+    ('CLIENTE', 'ID_USUARIO', True),
+    ('VETERINARIO', 'ID_USUARIO', True),
+    ('CONSULTA', 'ID_PROCEDIMENTO', True),
+    ('PRESCRICAO', 'ID_VETERINARIO', False),
+]
+
+FUNCAO_ID = """
+    CREATE FUNCTION gera_id_dados_criticos()
+    RETURNS BINARY(16)
+    NOT DETERMINISTIC NO SQL
+    RETURN UUID_TO_BIN(UUID(), 1)
+"""
+
+# ---------- MySQL ----------
+
+def _tipo_coluna(tabela, coluna):
+    result = Database.execute_query("""
+        SELECT COLUMN_TYPE AS TIPO FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (tabela, coluna), fetch_one=True)
+    return result['TIPO'].lower() if result else None
+
+
+def _fk_grupo_existe():
+    result = Database.execute_query("""
+        SELECT COUNT(*) AS TOTAL FROM information_schema.TABLE_CONSTRAINTS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'USUARIO'
+          AND CONSTRAINT_NAME = 'FK_GRUPO_USUARIO'
+    """, fetch_one=True)
+    return result['TOTAL'] > 0
+
+
+def migrar_mysql():
+    pendentes = [(t, c, nn) for t, c, nn in COLUNAS if _tipo_coluna(t, c) != 'binary(16)']
+    if not pendentes:
+        print("   ✓ Colunas já estão em BINARY(16)")
+
+    # A FK exige o mesmo tipo nas duas colunas: sai durante a conversão
+    if pendentes and _fk_grupo_existe():
+        Database.execute_query("ALTER TABLE USUARIO DROP FOREIGN KEY FK_GRUPO_USUARIO", commit=True)
+
+    for tabela, coluna, not_null in pendentes:
+        nulo = ' NOT NULL' if not_null else ''
+        Database.execute_query(f"ALTER TABLE {tabela} MODIFY {coluna} VARBINARY(36){nulo}", commit=True)
+        result = Database.execute_query(
+            f"UPDATE {tabela} SET {coluna} = UNHEX(REPLACE({coluna}, '-', '')) WHERE LENGTH({coluna}) = 36",
+            commit=True
+        )
+        Database.execute_query(f"ALTER TABLE {tabela} MODIFY {coluna} BINARY(16){nulo}", commit=True)
+        print(f"   ✓ {tabela}.{coluna}: {result['affected_rows']} ids convertidos")
+
+    if not _fk_grupo_existe():
+        Database.execute_query("""
+            ALTER TABLE USUARIO ADD CONSTRAINT FK_GRUPO_USUARIO
+            FOREIGN KEY (GRUPO_USUARIO) REFERENCES GRUPO_USUARIO(ID_ACESSO)
+        """, commit=True)
+    Database.execute_query("DROP FUNCTION IF EXISTS gera_id_dados_criticos", commit=True)
+    Database.execute_query(FUNCAO_ID, commit=True)
+
+# ---------- SQLite ----------
+
+def migrar_sqlite():
+    # As FKs (USUARIO.GRUPO_USUARIO) são verificadas só no commit
+    queries = [{'query': 'PRAGMA defer_foreign_keys = ON'}]
+    for tabela, coluna, _ in COLUNAS:
+        valores = Database.execute_query(
+            f"SELECT DISTINCT {coluna} AS VALOR FROM {tabela} WHERE typeof({coluna}) = 'text'",
+            fetch_all=True
+        )
+        convertidos = 0
+        for linha in valores:
+            try:
+                binario = id_binario(linha['VALOR'])
+            except ValueError:
+                print(f"   ⚠️  {tabela}.{coluna}: '{linha['VALOR']}' não é um UUID, mantido")
+                continue
+            queries.append({
+                'query': f"UPDATE {tabela} SET {coluna} = %s WHERE {coluna} = %s",
+                'params': (binario, linha['VALOR'])
+            })
+            convertidos += 1
+        print(f"   ✓ {tabela}.{coluna}: {convertidos} ids convertidos")
+    Database.execute_transaction(queries)
+
+
+def main():
+    migrar = migrar_sqlite if Config.DB_BACKEND == 'sqlite' else migrar_mysql
+    try:
+        # Migração é carga batch: não disputa conexões com a aplicação
+        with Database.usar_pool(Config.POOL_BATCH):
+            for clinica in Database.clinicas():
+                print(f"🔄 Migrando ids da clínica {clinica}...")
+                with Database.usar_clinica(clinica):
+                    migrar()
+    except Exception as e:
+        print(f"\n❌ Migração interrompida: {e}")
+        print("   Rode o script novamente para continuar.")
+        sys.exit(1)
+
+    print("\n✅ Migração concluída")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Script para migrar as prescrições do armazenamento em arquivo para as
+tabelas PRESCRICAO e PRESCRICAO_MEDICAMENTO
+
+Aceita tanto o antigo prescricoes.json (lista JSON) quanto o log
+append-only prescricoes.log. O arquivo é lido de forma incremental, sem
+carregá-lo inteiro na memória, e as prescrições são inseridas em lotes com
+Database.execute_many. O progresso (offset em bytes) é salvo após cada
+lote em <arquivo>.migracao; se o script for interrompido, basta rodá-lo de
+novo para continuar de onde parou.
+
+Uso:
+    python migrar_prescricoes.py [--origem prescricoes.log] [--lote 1000] [--recomecar]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from app.config import Config
+from app.database import Database
+from app.identificadores import id_binario
+from app.models import normalizar_medicamento
+from app.prescricao_storage import PRESCRICOES_FILE, PRESCRICOES_LOG, OP_CRIAR, OP_STATUS, OP_DELETAR, abrir_leitor
+
+QUERY_PRESCRICAO = """
+    INSERT INTO PRESCRICAO (ID_PRESCRICAO, ID_PET, CPF_CLIENTE, VETERINARIO, ID_VETERINARIO,
+                            DATA_CONSULTA, DIAGNOSTICO, ORIENTACOES_GERAIS, RETORNO,
+                            STATUS, CREATED_AT, UPDATED_AT)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE ID_PRESCRICAO = ID_PRESCRICAO
+"""
+
+QUERY_MEDICAMENTO = """
+    INSERT INTO PRESCRICAO_MEDICAMENTO (ID_PRESCRICAO, ORDEM, NOME, NOME_NORMALIZADO, DOSAGEM,
+                                        FREQUENCIA, DURACAO, OBSERVACOES)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE ORDEM = ORDEM
+"""
+
+# ---------- Conversão e gravação ----------
+
+def _texto_ou_none(valor):
+    return valor if valor not in ('', None) else None
+
+
+def _id_ou_none(valor):
+    """Id do veterinário em BINARY(16); ids inválidos do arquivo ficam nulos"""
+    try:
+        return id_binario(_texto_ou_none(valor))
+    except ValueError:
+        return None
+
+
+def converter(prescricao):
+    """Converte a prescrição do arquivo nas linhas de PRESCRICAO e PRESCRICAO_MEDICAMENTO"""
+    cpf = re.sub(r'[^0-9]', '', str(prescricao.get('cpf_cliente') or ''))
+    if not cpf or prescricao.get('id_pet') is None:
+        return None, []
+
+    linha = (
+        prescricao['id'],
+        prescricao['id_pet'],
+        int(cpf),
+        prescricao.get('veterinario'),
+        _id_ou_none(prescricao.get('veterinario_id')),
+        _texto_ou_none(prescricao.get('data_consulta')),
+        prescricao.get('diagnostico'),
+        prescricao.get('orientacoes_gerais') or '',
+        _texto_ou_none(prescricao.get('retorno')),
+        prescricao.get('status') or 'ativa',
+        prescricao.get('created_at'),
+        prescricao.get('updated_at'),
+    )
+    medicamentos = [
+        (prescricao['id'], ordem, med.get('nome') or '', normalizar_medicamento(med.get('nome')),
+         med.get('dosagem'), med.get('frequencia'), med.get('duracao'), med.get('observacoes'))
+        for ordem, med in enumerate(prescricao.get('medicamentos') or [])
+    ]
+    return linha, medicamentos
+
+
+def gravar_lote(prescricoes, medicamentos):
+    """Insere um lote (reexecutar o mesmo lote não duplica registros)"""
+    if prescricoes:
+        Database.execute_many(QUERY_PRESCRICAO, prescricoes)
+    if medicamentos:
+        Database.execute_many(QUERY_MEDICAMENTO, medicamentos)
+
+
+def carregar_progresso(caminho):
+    if os.path.exists(caminho):
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {'offset': 0, 'migradas': 0, 'ignoradas': 0}
+
+
+def salvar_progresso(caminho, progresso):
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(progresso, f)
+    os.replace(temporario, caminho)
+
+
+def migrar(origem, tamanho_lote, recomecar=False):
+    caminho_progresso = origem + '.migracao'
+    progresso = {'offset': 0, 'migradas': 0, 'ignoradas': 0} if recomecar else carregar_progresso(caminho_progresso)
+
+    if progresso['offset']:
+        print(f"↪️  Retomando a partir do byte {progresso['offset']} ({progresso['migradas']} já migradas)")
+
+    prescricoes, medicamentos = [], []
+    offset_lote = progresso['offset']
+
+    def confirmar_lote():
+        gravar_lote(prescricoes, medicamentos)
+        progresso['migradas'] += len(prescricoes)
+        progresso['offset'] = offset_lote
+        salvar_progresso(caminho_progresso, progresso)
+        prescricoes.clear()
+        medicamentos.clear()
+        print(f"   ... {progresso['migradas']} prescrições migradas")
+
+    with open(origem, 'rb') as arquivo:
+        for registro, offset in abrir_leitor(arquivo, progresso['offset']):
+            op = registro.get('op')
+
+            if op == OP_CRIAR:
+                linha, meds = converter(registro['dados'])
+                if linha is None:
+                    progresso['ignoradas'] += 1
+                    print(f"⚠️  Prescrição {registro['dados'].get('id')} sem CPF ou pet, ignorada")
+                else:
+                    prescricoes.append(linha)
+                    medicamentos.extend(meds)
+                offset_lote = offset
+                if len(prescricoes) >= tamanho_lote:
+                    confirmar_lote()
+                continue
+
+            # Status e remoções do log precisam ser aplicados depois das
+            # inserções anteriores, então o lote pendente é gravado antes
+            if prescricoes:
+                confirmar_lote()
+            if op == OP_STATUS:
+                Database.execute_query(
+                    "UPDATE PRESCRICAO SET STATUS = %s, UPDATED_AT = %s WHERE ID_PRESCRICAO = %s",
+                    (registro['status'], registro.get('updated_at'), registro['id']),
+                    commit=True
+                )
+            elif op == OP_DELETAR:
+                Database.execute_query(
+                    "DELETE FROM PRESCRICAO WHERE ID_PRESCRICAO = %s", (registro['id'],), commit=True
+                )
+            offset_lote = offset
+            progresso['offset'] = offset_lote
+            salvar_progresso(caminho_progresso, progresso)
+
+    if prescricoes:
+        confirmar_lote()
+    else:
+        progresso['offset'] = offset_lote
+        salvar_progresso(caminho_progresso, progresso)
+
+    print(f"\n✅ Migração concluída: {progresso['migradas']} prescrições migradas, "
+          f"{progresso['ignoradas']} ignoradas")
+
+
+def main():
+    origem_padrao = PRESCRICOES_LOG if os.path.exists(PRESCRICOES_LOG) else PRESCRICOES_FILE
+
+    parser = argparse.ArgumentParser(description='Migra prescrições do arquivo para o MySQL')
+    parser.add_argument('--origem', default=origem_padrao, help='prescricoes.json ou prescricoes.log')
+    parser.add_argument('--lote', type=int, default=1000, help='prescrições por lote de INSERT')
+    parser.add_argument('--recomecar', action='store_true', help='ignora o progresso salvo')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.origem):
+        print(f"❌ Arquivo {args.origem} não encontrado")
+        sys.exit(1)
+
+    print(f"🔄 Migrando prescrições de {args.origem}...")
+    try:
+        # Migração é carga batch: não disputa conexões com a aplicação
+        with Database.usar_pool(Config.POOL_BATCH):
+            migrar(args.origem, args.lote, args.recomecar)
+    except Exception as e:
+        print(f"\n❌ Migração interrompida: {e}")
+        print("   Rode o script novamente para continuar do último lote gravado.")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
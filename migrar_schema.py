@@ -0,0 +1,53 @@
+"""
+Script para aplicar as migrações versionadas do esquema (app/migracoes.py)
+
+Aplica, em todas as clínicas (shards), as migrações ainda não registradas
+em SCHEMA_VERSAO, na ordem da versão. No MySQL os índices são criados
+online (ALGORITHM=INPLACE, LOCK=NONE), então o script pode rodar com a
+aplicação no ar. Se uma migração falhar, as anteriores continuam
+registradas: corrija a causa e rode o script de novo.
+
+Uso:
+    python migrar_schema.py [--status]
+"""
+
+import argparse
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from app import migracoes
+from app.config import Config
+from app.database import Database
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Aplica as migrações versionadas do esquema')
+    parser.add_argument('--status', action='store_true', help='só lista as migrações pendentes')
+    args = parser.parse_args()
+
+    try:
+        # Migração é carga batch: não disputa conexões com a aplicação
+        with Database.usar_pool(Config.POOL_BATCH):
+            for clinica in Database.clinicas():
+                with Database.usar_clinica(clinica):
+                    pendentes = migracoes.pendentes()
+                    print(f"🔄 Clínica {clinica}: {len(pendentes)} migração(ões) pendente(s)")
+                    for migracao in pendentes:
+                        if args.status:
+                            print(f"   - {migracao.versao}: {migracao.descricao}")
+                            continue
+                        executada = migracoes.aplicar(migracao)
+                        situacao = 'aplicada' if executada else 'já presente no esquema, registrada'
+                        print(f"   ✓ {migracao.versao}: {migracao.descricao} ({situacao})")
+    except Exception as e:
+        print(f"\n❌ Migração interrompida: {e}")
+        print("   Corrija a causa e rode o script novamente para continuar.")
+        sys.exit(1)
+
+    if not args.status:
+        print("\n✅ Esquema atualizado")
+
+
+if __name__ == '__main__':
+    main()
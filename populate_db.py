@@ -7,7 +7,8 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
-from app.database import Database, gerar_uuid
+from app.database import Database
+from app.identificadores import novo_id
 
 def popular_grupos_usuario():
     """Insere os grupos de usuário padrão no banco de dados"""
@@ -29,19 +30,19 @@ def popular_grupos_usuario():
         # Dados dos grupos
         grupos = [
             {
-                'id_acesso': gerar_uuid(),
+                'id_acesso': novo_id().bytes,
                 'role_mysql': 'ADM',
                 'tipo_acesso': 'Administrador',
                 'descricao': 'Acesso total ao sistema, pode gerenciar usuários e configurações'
             },
             {
-                'id_acesso': gerar_uuid(),
+                'id_acesso': novo_id().bytes,
                 'role_mysql': 'VET',
                 'tipo_acesso': 'Veterinario',
                 'descricao': 'Acesso para veterinários: criar consultas, vacinas e prescrições'
             },
             {
-                'id_acesso': gerar_uuid(),
+                'id_acesso': novo_id().bytes,
                 'role_mysql': 'CLI',
                 'tipo_acesso': 'Cliente',
                 'descricao': 'Acesso para clientes: visualizar dados do pet e histórico'
@@ -0,0 +1,114 @@
+"""
+Script para verificar se as queries dos models usam índices
+
+Lê app/models.py, encontra cada SQL (SELECT, UPDATE e DELETE escritos nos
+métodos, os SELECTs das Projecao, com todas as colunas, e as buscas por id
+dos helpers find_by_id/update_by_id/delete_by_id) e roda EXPLAIN no banco
+configurado. Falha (código de saída 1) se alguma
+query ler uma tabela inteira, exceto as varreduras esperadas listadas em
+VARREDURA_PERMITIDA. SQL montado com f-string é listado como não verificado.
+
+No MySQL o plano depende das estatísticas: rode contra um banco com volume
+parecido com o de produção. No SQLite (DB_BACKEND=sqlite) o plano só
+depende dos índices, o que serve de verificação rápida no CI.
+
+Uso:
+    python verificar_indices.py
+"""
+
+import ast
+import os
+import re
+import sys
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from app.database import Database, compilar
+
+MODELS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app', 'models.py')
+
+# Varreduras completas esperadas: método -> tabelas (ou aliases) que ele lê inteiras
+VARREDURA_PERMITIDA = {
+    'Veterinario._TODOS': {'VETERINARIO', 'V'},  # lista todos os veterinários (get_all)
+    'GrupoUsuario._CATALOGO': {'GRUPO_USUARIO'},  # 3 linhas, carregadas na memória (app/referencia.py)
+}
+
+HELPERS_POR_ID = {'find_by_id', 'update_by_id', 'delete_by_id'}
+
+_SQL = re.compile(r'^\s*(SELECT|UPDATE|DELETE|WITH)\b', re.IGNORECASE)
+_LIMITE = re.compile(r'\b(?:LIMIT|OFFSET)\s*$', re.IGNORECASE)
+
+
+def queries_dos_models(caminho=MODELS):
+    """Gera (método, sql ou None se dinâmico) para cada query de app/models.py"""
+    with open(caminho, 'r', encoding='utf-8') as f:
+        arvore = ast.parse(f.read())
+
+    def visitar(no, nome):
+        for filho in ast.iter_child_nodes(no):
+            if isinstance(filho, ast.ClassDef):
+                yield from visitar(filho, filho.name)
+            elif isinstance(filho, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                yield from visitar(filho, f"{nome}.{filho.name}" if nome else filho.name)
+            elif (isinstance(no, ast.ClassDef) and isinstance(filho, ast.Assign)
+                  and len(filho.targets) == 1 and isinstance(filho.targets[0], ast.Name)):
+                # Projecao em atributo de classe: Consulta._POR_PET
+                yield from visitar(filho, f"{nome}.{filho.targets[0].id}")
+            elif isinstance(filho, ast.Constant) and isinstance(filho.value, str) and _SQL.match(filho.value):
+                yield nome, filho.value.replace('{colunas}', '*')
+            elif isinstance(filho, ast.JoinedStr):
+                partes = ''.join(p.value for p in filho.values if isinstance(p, ast.Constant))
+                if _SQL.match(partes):
+                    yield nome, None
+                else:
+                    yield from visitar(filho, nome)
+            elif isinstance(filho, ast.Call) and _helper_por_id(filho):
+                tabela, coluna = (arg.value for arg in filho.args[:2])
+                yield f"{nome} ({filho.func.id})", compilar('select', tabela, coluna_id=coluna)
+            else:
+                yield from visitar(filho, nome)
+
+    yield from visitar(arvore, '')
+
+
+def _helper_por_id(chamada):
+    return (isinstance(chamada.func, ast.Name) and chamada.func.id in HELPERS_POR_ID
+            and len(chamada.args) >= 2
+            and all(isinstance(arg, ast.Constant) and isinstance(arg.value, str) for arg in chamada.args[:2]))
+
+
+def parametros_exemplo(sql):
+    """Um valor para cada %s: inteiro em LIMIT/OFFSET, texto (data) no resto"""
+    partes = sql.split('%s')
+    return tuple(1 if _LIMITE.search(parte) else '2024-01-01' for parte in partes[:-1])
+
+
+def verificar():
+    """Roda EXPLAIN em cada query; retorna o número de queries com varredura completa"""
+    backend = Database.backend()
+    falhas = 0
+    for metodo, sql in queries_dos_models():
+        if sql is None:
+            print(f"   ?  {metodo}: SQL dinâmico (f-string), não verificado")
+            continue
+        plano = Database.execute_query(backend.sql_explain(sql), parametros_exemplo(sql) or None, fetch_all=True)
+        permitidas = VARREDURA_PERMITIDA.get(metodo.split(' ')[0], set())
+        varridas = [t for t in backend.varreduras(plano) if t.upper() not in permitidas]
+        if varridas:
+            falhas += 1
+            print(f"   ❌ {metodo}: varredura completa em {', '.join(varridas)}")
+        else:
+            print(f"   ✓  {metodo}")
+    return falhas
+
+
+def main():
+    print("🔎 Verificando o uso de índices nas queries de app/models.py...")
+    falhas = verificar()
+    if falhas:
+        print(f"\n❌ {falhas} query(s) com varredura completa de tabela")
+        sys.exit(1)
+    print("\n✅ Todas as queries usam índices")
+
+
+if __name__ == '__main__':
+    main()